@@ -0,0 +1,74 @@
+"""
+10 - What changed between two versions?
+
+Each side can be
+- a backup file written by 7_HW-Listening.py (.json / .jsonl.gz / .jsonl.zst / .spkb)
+- store:<versionId or timestamp>  a version in the deduplicated backup store
+- a server version id of --project (objects are fetched only where ids differ
+  and kept in the local object cache)
+
+Examples:
+    python 10_VersionDiff.py speckle_backups/2026-02-12_17-03-25.json speckle_backups/2026-02-12_17-03-35.json
+    python 10_VersionDiff.py store:275536cebf store:e67731eeca
+    python 10_VersionDiff.py 275536cebf e67731eeca --project 128262a20c --json diff.json
+"""
+
+import argparse
+import json
+import os
+
+from speckle_tools.diff import ServerSource, TreeSource, diff_sources
+from speckle_tools.formats import read_backup
+from speckle_tools.metrics import add_arguments, instrument
+from speckle_tools.store import BackupStore
+
+PROJECT_ID = "128262a20c"
+BACKUP_DIRNAME = "speckle_backups"
+
+_cache = []
+
+
+def _object_cache():
+    """Local object cache, opened only if a server version is asked for."""
+    if not _cache:
+        from speckle_tools.cache import ObjectCache
+        _cache.append(ObjectCache())
+    return _cache[0]
+
+
+def open_source(spec: str, args):
+    if os.path.isfile(spec):
+        return TreeSource(read_backup(spec)["object"]["data"])
+    if spec.startswith("store:"):
+        return TreeSource(BackupStore(args.store).restore(spec[len("store:"):])["object"]["data"])
+
+    from speckle_tools.client import connect
+    from speckle_tools.queries import get_version_ref_obj_id
+
+    session = connect()
+    root_id = get_version_ref_obj_id(session, args.project, spec)
+    return ServerSource(session.server_url, args.project, session.token, root_id, _object_cache())
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Diff two Speckle versions / backups by content hash.")
+    parser.add_argument("old", help="backup file, store:<version> or server version id")
+    parser.add_argument("new", help="backup file, store:<version> or server version id")
+    parser.add_argument("--project", default=PROJECT_ID, help="project of server version ids")
+    parser.add_argument("--store", default=os.path.join(script_dir, BACKUP_DIRNAME), help="backup store root")
+    parser.add_argument("--json", help="also write the diff to this JSON file")
+    add_arguments(parser)
+    args = parser.parse_args()
+    instrument(args)  # metrics / profile, if asked for; stopped at exit
+
+    diff = diff_sources(open_source(args.old, args), open_source(args.new, args))
+    diff.print()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(diff.to_dict(), f, indent=2, ensure_ascii=False, default=str)
+        print(f"✓ Diff written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+11 - Export a flat, columnar object index of a model
+
+Replaces hand-made dumps like model_objects.json (one record per object with a
+nested copy of its properties) with a table: one row per object, one column per
+field (id, parent_id, depth, type, units, area, volume, bbox, Designer, Module, ...).
+
+Examples:
+    python 11_ExportObjectIndex.py --out model_index.parquet
+    python 11_ExportObjectIndex.py --backup speckle_backups/2026-02-13_12-04-31.json --out tower.csv
+    python 11_ExportObjectIndex.py --out model_index.parquet --designer "Maria Sanchez" --sum-by Module
+"""
+
+import argparse
+
+from speckle_tools.index import ObjectIndex
+from speckle_tools.metrics import add_arguments, instrument
+
+PROJECT_ID = "128262a20c"
+MODEL_ID = "a1014e4b32"
+
+
+def load_root(args):
+    if args.backup:
+        from speckle_tools.formats import read_backup
+        return read_backup(args.backup)["object"]["data"]
+
+    from speckle_tools.cache import cached_receive
+    from speckle_tools.client import connect
+    from speckle_tools.queries import get_latest_ref_obj_id
+
+    session = connect()
+    return cached_receive(get_latest_ref_obj_id(session, args.project, args.model), session.transport(args.project))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a columnar index (Parquet / Arrow / CSV) of a Speckle model.")
+    parser.add_argument("--project", default=PROJECT_ID)
+    parser.add_argument("--model", default=MODEL_ID, help="latest version of this model is indexed")
+    parser.add_argument("--backup", help="index a backup file instead of the server model")
+    parser.add_argument("--out", default="model_index.parquet", help=".parquet / .arrow / .feather / .csv")
+    parser.add_argument("--designer", help="print the objects of this Designer")
+    parser.add_argument("--sum-by", help="print total volume per value of this column (e.g. Module)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    instrument(args)  # metrics / profile, if asked for; stopped at exit
+
+    index = ObjectIndex.from_object(load_root(args))
+    path = index.write(args.out)
+    print(f"✓ Indexed {len(index)} objects x {len(index.names)} columns -> {path}")
+
+    if args.designer:
+        rows = index.where(Designer=args.designer)
+        print(f"{len(rows)} object(s) by {args.designer}:")
+        for obj_id, st, name in zip(rows["id"], rows["speckle_type"], rows["name"]):
+            print(f"    {obj_id}  {st}  {name or ''}")
+    if args.sum_by:
+        if args.sum_by not in index.names:
+            print(f"ERROR: no column '{args.sum_by}'")
+            return
+        for key, total in index.group_sum(args.sum_by, "volume").items():
+            print(f"    {args.sum_by} {key}: volume {total:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+12 - Back up many Speckle projects from one process
+
+- Reads the projects to watch from a JSON config (see listeners.example.json):
+  per project a backup directory, format and optional filters
+  (only some models, only commit messages matching a regex)
+- Multiplexes the projectVersionsUpdated subscriptions over a few shared
+  websockets and feeds every version into one backup worker pool
+  (speckle_tools.fanin)
+- Same long-running behaviour as 7_HW-Listening.py: reconnects, and catches up
+  on versions created while it was down, with one checkpoint file per project
+
+Usage:
+    python 12_MultiProjectListener.py --config listeners.json
+    python 12_MultiProjectListener.py --config listeners.json --metrics-port 9464 --metrics-log metrics.jsonl
+"""
+
+import argparse
+import asyncio
+import os
+
+from dotenv import load_dotenv
+
+from speckle_tools.fanin import DEFAULT_PER_CONNECTION, FanInListener, load_listener_config
+from speckle_tools.metrics import add_arguments, instrument
+
+# -----------------------
+# Config
+# -----------------------
+load_dotenv()
+
+SPECKLE_SERVER_WS = "wss://app.speckle.systems/graphql"
+YOUR_TOKEN = os.environ.get("SPECKLE_TOKEN")
+
+CHECKPOINT_DIRNAME = ".listener_checkpoints"
+FETCH_WORKERS = 8        # shared by all projects
+QUEUE_SIZE = 256
+REPORT_EVERY_S = 60
+KEEP_ALIVE_TIMEOUT_S = 60
+RECONNECT_MAX_DELAY_S = 300
+
+# -----------------------
+# Main
+# -----------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up every version of many Speckle projects")
+    parser.add_argument("--config", required=True, help="JSON file listing the projects to watch")
+    parser.add_argument("--per-connection", type=int, default=DEFAULT_PER_CONNECTION,
+                        help=f"subscriptions per websocket (default {DEFAULT_PER_CONNECTION})")
+    parser.add_argument("--resolve-children", action="store_true", help="download full object trees")
+    parser.add_argument("--projection", default=None,
+                        help='"metadata" (no displayValue / mesh buffers) or members to keep, e.g. "properties,area"; '
+                             'needs a file "format" (not "store") for every project')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if not YOUR_TOKEN:
+        raise RuntimeError("Missing SPECKLE_TOKEN in your environment (.env).")
+    projects = load_listener_config(args.config)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    fanin = FanInListener(
+        projects,
+        ws_url=SPECKLE_SERVER_WS,
+        token=YOUR_TOKEN,
+        checkpoint_dir=os.path.join(script_dir, CHECKPOINT_DIRNAME),
+        per_connection=args.per_connection,
+        fetch_workers=FETCH_WORKERS,
+        queue_size=QUEUE_SIZE,
+        report_every=REPORT_EVERY_S,
+        resolve_children=args.resolve_children,
+        projection=args.projection,
+        keep_alive_timeout=KEEP_ALIVE_TIMEOUT_S,
+        backoff_max=RECONNECT_MAX_DELAY_S,
+        heartbeat_every=REPORT_EVERY_S,
+    )
+    print("Press Ctrl+C to stop\n")
+    with instrument(args):
+        try:
+            asyncio.run(fanin.run())
+        except KeyboardInterrupt:
+            print("\n Subscriptions stopped by user")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,59 @@
 """
-01 - Create a Speckle Model inside an existing Project and Folder
+01 - Create Speckle Models inside an existing Project and Folder
+
+- One model:   python 1_CreateModel.py
+               python 1_CreateModel.py "homework/session04/team_01.1"
+- Many models: python 1_CreateModel.py --manifest cohort.csv
+               (CSV with name,description columns, or a JSON list)
+
+Models that already exist are skipped (one paginated listing); the rest are
+created concurrently with a rate limit and retries.
 
 NOTE: Project workspace in this case is: 128262a20c
 """
-from specklepy.api.client import SpeckleClient
-from specklepy.api.credentials import get_default_account
-from specklepy.core.api.inputs.model_inputs import CreateModelInput
-
-def main():
-    account = get_default_account()
+import argparse
 
-    # IMPORTANT: connect to the same server as the account
-    client = SpeckleClient(host=account.serverInfo.url)
-    client.authenticate_with_account(account)
+from speckle_tools.client import resolve_account
+from speckle_tools.metrics import add_arguments, instrument
+from speckle_tools.provision import DEFAULT_CONCURRENCY, DEFAULT_RATE, load_manifest, provision_models
 
-    project_id = "128262a20c"
+PROJECT_ID = "128262a20c"
+MODEL_NAME = "homework/session03/team_01.1checkk"
+MODEL_DESCRIPTION = "Model created in homework/session03"
 
-    model_name = "homework/session03/team_01.1checkk"
 
-    model = client.model.create(
-        CreateModelInput(
-            project_id=project_id,
-            name=model_name,
-            description="Model created in homework/session03"
-        )
-    )
+def main():
+    parser = argparse.ArgumentParser(description="Create one or many models in a Speckle project.")
+    parser.add_argument("names", nargs="*", help=f"model names (default: {MODEL_NAME})")
+    parser.add_argument("--manifest", help="CSV / JSON list of models to create")
+    parser.add_argument("--description", default=MODEL_DESCRIPTION, help="description for models named on the command line")
+    parser.add_argument("--project", default=PROJECT_ID)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="create requests in flight")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="max create requests per second")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be created")
+    add_arguments(parser)
+    args = parser.parse_args()
+    instrument(args)  # metrics / profile, if asked for; stopped at exit
+
+    models = load_manifest(args.manifest) if args.manifest else []
+    names = args.names or ([] if models else [MODEL_NAME])
+    models += [{"name": n, "description": args.description} for n in names]
 
-    print("✅ Model created")
-    print("Server:", account.serverInfo.url)
-    print("Project:", project_id)
-    print("Model:", model.name)
-    print("Model ID:", model.id)
-    print(f"URL: {account.serverInfo.url}/projects/{project_id}/models/{model.id}")
+    # IMPORTANT: connect to the same server as the account
+    server_url, token, _ = resolve_account()
+    report = provision_models(server_url, token, args.project, models,
+                              concurrency=args.concurrency, rate=args.rate, dry_run=args.dry_run)
+
+    print("Server:", server_url)
+    print("Project:", args.project)
+    for m in report["existing"]:
+        print(f"• exists   {m['name']}  {server_url}/projects/{args.project}/models/{m['id']}")
+    for m in report["created"]:
+        if m["id"]:
+            print(f"✅ created  {m['name']}  {server_url}/projects/{args.project}/models/{m['id']}")
+        else:
+            print(f"• would create {m['name']}")
+    print(f"{len(report['created'])} created, {len(report['existing'])} already there, {len(report['failed'])} failed")
 
 if __name__ == "__main__":
     main()
-
@@ -3,52 +3,59 @@ Export Speckle Object Data to JSON using GraphQL
 
 This script connects to Speckle's GraphQL API and fetches object data
 from a specified project and object ID, then saves it to a JSON file.
+
+With RESOLVE_CHILDREN on, every child listed in the object's __closure is
+downloaded too (batched, parallel REST requests) and the reference stubs are
+replaced by the real objects, so the JSON holds the full tree.
+
+PROJECTION trims what is fetched: "metadata" leaves out displayValue and the
+mesh buffers (the children below them are never downloaded), a list of
+members keeps only those (plus ids / types and the child objects).
+
+STREAM_EXPORT writes the object and its whole closure to a .jsonl.gz file one
+object at a time, straight off the server's streamed response, so even a
+multi-GB model is exported in bounded memory (speckle_tools.stream).
 """
 
 import json
 import os
-from specklepy.api.client import SpeckleClient
-from specklepy.api.credentials import get_default_account
-from gql import gql
+
+from speckle_tools.client import connect
+from speckle_tools.formats import JsonlWriter
+from speckle_tools.projection import Projection
+from speckle_tools.queries import Q_OBJECT_DATA
+from speckle_tools.resolve import resolve_object
+from speckle_tools.stream import server_records
 
 
 # TODO: Replace with your project and object IDs
 PROJECT_ID = "08c875bbe4" # HB01 Program Model
 OBJECT_ID = "e8f99c85381ab75aecba9c741f8a21c2" #Object id for one of the meshes
 
+# Resolve {"speckle_type": "reference"} stubs into the full object tree
+RESOLVE_CHILDREN = True
+FETCH_BATCH_SIZE = 500   # object ids per download request
+FETCH_CONCURRENCY = 4    # download requests in flight
+# None = everything, "metadata" = no geometry, or e.g. "properties,area,volume"
+PROJECTION = None
+# Stream every object to object_data.jsonl.gz instead of building the tree in memory
+STREAM_EXPORT = False
 
-def query_object_data_graphql(client, project_id: str, object_id: str) -> dict:
+
+def query_object_data_graphql(session, project_id: str, object_id: str) -> dict:
     """
     Query object data from Speckle using GraphQL API.
     
     Args:
-        client: Authenticated SpeckleClient instance
+        session: SpeckleSession from speckle_tools.client
         project_id: The Speckle project ID
         object_id: The Speckle object ID
     
     Returns:
         Dictionary containing the query result
     """
-    query = gql("""
-    query GetObjectDataJSON($objectId: String!, $projectId: String!) {
-        project(id: $projectId) {
-            object(id: $objectId) {
-                id
-                speckleType
-                data
-            }
-        }
-    }
-    """)
-    
-    variables = {
-        "projectId": project_id,
-        "objectId": object_id
-    }
-    
-    # Execute GraphQL query using the client's HTTP session
-    result = client.httpclient.execute(query, variable_values=variables)
-    return result
+    # Parsed once in speckle_tools.queries, executed on the shared keep-alive session
+    return session.execute(Q_OBJECT_DATA, projectId=project_id, objectId=object_id)
 
 
 def main():
@@ -56,29 +63,64 @@ def main():
     Main function to fetch object data and save to JSON file.
     """
     # Authenticate with Speckle
-    account = get_default_account()
-    client = SpeckleClient(host=account.serverInfo.url)
-    client.authenticate_with_account(account)
+    session = connect()
     print(f"✓ Authenticated with Speckle")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    if STREAM_EXPORT:
+        output_file = os.path.join(script_dir, "object_data.jsonl.gz")
+        header = {"projectId": PROJECT_ID, "objectId": OBJECT_ID, "resolved": True, "object": {"id": OBJECT_ID}}
+        count = 0
+        try:
+            with JsonlWriter(output_file) as w:
+                for rec in server_records(session, PROJECT_ID, OBJECT_ID, header):
+                    w.write(rec)
+                    count += rec["type"] == "object"
+        except Exception as e:
+            print(f"⚠ Streaming export failed: {e}")
+            return
+        print(f"✓ Streamed {count} objects to {output_file}")
+        return
     
     # Execute GraphQL query
     try:
-        graphql_result = query_object_data_graphql(client, PROJECT_ID, OBJECT_ID)
+        graphql_result = query_object_data_graphql(session, PROJECT_ID, OBJECT_ID)
         print(f"✓ GraphQL query executed successfully")
     except Exception as e:
         print(f"⚠ GraphQL query failed: {e}")
         return
     
+    data = graphql_result["project"]["object"]["data"]
+    projection = Projection.parse(PROJECTION)
+    if RESOLVE_CHILDREN:
+        closure_size = len(data.get("__closure") or {})
+        try:
+            data = resolve_object(
+                session.server_url, PROJECT_ID, session.token, data,
+                batch_size=FETCH_BATCH_SIZE, concurrency=FETCH_CONCURRENCY, projection=projection,
+            )
+            if projection is None:
+                print(f"✓ Resolved {closure_size} child objects")
+            else:
+                print(f"✓ Resolved the child objects kept by the projection (closure has {closure_size})")
+        except Exception as e:
+            print(f"⚠ Resolving child objects failed: {e}")
+            return
+    elif projection is not None:
+        data = projection.apply(data)
+
     # Prepare output data
     output = {
         "projectId": PROJECT_ID,
         "objectId": OBJECT_ID,
-        "data": graphql_result["project"]["object"]["data"]
+        "resolved": RESOLVE_CHILDREN,
+        "projection": projection.to_dict() if projection is not None else None,
+        "data": data
     }
     
     # Save to JSON file in the same directory as this script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_file = os.path.join(script_dir, "object_data.json")
+    filename = "object_data_resolved.json" if RESOLVE_CHILDREN else "object_data.json"
+    output_file = os.path.join(script_dir, filename)
     
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(output, f, indent=2, default=str)
@@ -3,6 +3,10 @@
 
 This script demonstrates how to subscribe to real-time updates from a Speckle project ("project_id")
 using GraphQL subscriptions over WebSocket.
+
+With LONG_RUNNING on, speckle_tools.listener keeps the subscription alive instead:
+it reconnects with backoff when the connection drops and prints the versions that
+were pushed in the meantime.
 """
 
 import asyncio
@@ -11,12 +15,16 @@ from gql.transport.websockets import WebsocketsTransport
 import os
 from dotenv import load_dotenv
 
+from speckle_tools.listener import VersionListener
+
 # Load environment variables
 load_dotenv()
 
 # Your Speckle token
 YOUR_TOKEN =  os.environ.get("SPECKLE_TOKEN")
 PROJECT_ID = "08c875bbe4"  # HB01 Program Model
+SPECKLE_SERVER_WS = "wss://app.speckle.systems/graphql"
+LONG_RUNNING = True  # reconnect + catch up instead of exiting when the WebSocket drops
 
 # Define the subscription query
 subscription_query = gql("""
@@ -34,13 +42,45 @@ subscription_query = gql("""
     }
 """)
 
+def print_update(data):
+    print(f"ID: {data.get('id')}")
+    print(f"Model ID: {data.get('modelId')}")
+    print(f"Type: {data.get('type')}")
+
+    version = data.get('version')
+    if version:
+        print(f"\nVersion Details:")
+        print(f"  - Version ID: {version.get('id')}")
+        print(f"  - Message: {version.get('message')}")
+        print(f"  - Created At: {version.get('createdAt')}")
+
+    print("\n")
+
+async def listen_long_running():
+    """
+    Same output, but survives disconnects (see speckle_tools.listener)
+    """
+    async def on_version(evt, received_at):
+        print("=" * 50)
+        print("📦 New Update Received!" if evt.get("type") != "catch_up" else "📦 Missed Update (caught up)")
+        print("=" * 50)
+        print_update(evt)
+        listener.done(evt)
+
+    listener = VersionListener(PROJECT_ID, SPECKLE_SERVER_WS, YOUR_TOKEN, on_version)
+    print("Press Ctrl+C to stop\n")
+    try:
+        await listener.run()
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n\n👋 Subscription stopped by user")
+
 async def subscribe_to_project_updates():
     """
     Subscribe to project version updates using WebSocket
     """
     # Create WebSocket transport with authentication
     transport = WebsocketsTransport(
-        url="wss://app.speckle.systems/graphql",
+        url=SPECKLE_SERVER_WS,
         init_payload={
             "Authorization": f"Bearer {YOUR_TOKEN}"
         }
@@ -70,18 +110,7 @@ async def subscribe_to_project_updates():
                     
                     data = result.get("projectVersionsUpdated")
                     if data:
-                        print(f"ID: {data.get('id')}")
-                        print(f"Model ID: {data.get('modelId')}")
-                        print(f"Type: {data.get('type')}")
-                        
-                        version = data.get('version')
-                        if version:
-                            print(f"\nVersion Details:")
-                            print(f"  - Version ID: {version.get('id')}")
-                            print(f"  - Message: {version.get('message')}")
-                            print(f"  - Created At: {version.get('createdAt')}")
-                        
-                        print("\n")
+                        print_update(data)
                     
             except asyncio.CancelledError:
                 print("\n\n👋 Subscription cancelled")
@@ -99,6 +128,12 @@ async def subscribe_to_project_updates():
         await transport.close()
         print("🔌 Connection closed properly")
 
-if __name__ == "__main__":
+def main():
     # Run the subscription
-    asyncio.run(subscribe_to_project_updates())
+    try:
+        asyncio.run(listen_long_running() if LONG_RUNNING else subscribe_to_project_updates())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
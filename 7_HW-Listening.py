@@ -2,21 +2,40 @@
 07 - Listen for Speckle project updates and backup JSON snapshots
 
 - Subscribe to projectVersionsUpdated (WS)
-- On each update:
+- On each update (handed to speckle_tools.backup.BackupPipeline so the
+  subscription never waits on HTTP or disk):
   - fetch version.referencedObject (HTTP GraphQL)
   - fetch object.data (HTTP GraphQL)
-  - write a timestamped JSON file to disk
+  - write it to the deduplicated backup store (each object once, plus a small
+    per-version manifest; see 9_BackupStore.py to restore) or one timestamped
+    file per version in the BACKUP_FORMAT of choice (json / jsonl.gz /
+    jsonl.zst / spkb, see speckle_tools.formats)
+- Runs for weeks: reconnects with exponential backoff when the websocket drops,
+  and backfills every version created while it was down (or stopped), using a
+  checkpoint file next to this script (speckle_tools.listener)
+- Instrumented (speckle_tools.metrics): stage timings, event / byte counters,
+  queue depth and createdAt -> backup lag, as a Prometheus endpoint
+  (METRICS_PORT) and / or a JSON-lines log (METRICS_LOG_FILENAME); PROFILE
+  records a cProfile / py-spy profile of the whole run
+- Optional incremental recompute (speckle_tools.incremental): with
+  INCREMENTAL_TARGET_MODEL_ID set, every new version is also tagged from
+  INCREMENTAL_TABLE and committed to that model, processing only the modules
+  that changed since the previous version; the checkpoint only moves once both
+  the backup and the derived version exist
 """
 
 import asyncio
-import json
 import os
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 
 from dotenv import load_dotenv
-from gql import gql, Client
-from gql.transport.websockets import WebsocketsTransport
-from gql.transport.requests import RequestsHTTPTransport
+
+from speckle_tools.backup import BackupPipeline, make_writer
+from speckle_tools.client import SpeckleSession
+from speckle_tools.incremental import IncrementalRecompute, tag_properties
+from speckle_tools.listener import Checkpoint, StageJoin, VersionListener
+from speckle_tools.metrics import instrument
+from speckle_tools.tower import load_property_table
 
 # -----------------------
 # Config
@@ -31,208 +50,137 @@ PROJECT_ID = "128262a20c"  # Test model to generate easy versions for the listen
 
 # Where backups go (relative to this script)
 BACKUP_DIRNAME = "speckle_backups"
-
-# -----------------------
-# GraphQL documents
-# -----------------------
-
-SUB_PROJECT_VERSIONS_UPDATED = gql("""
-subscription ProjectVersionsUpdated($projectId: String!) {
-  projectVersionsUpdated(id: $projectId) {
-    id
-    modelId
-    type
-    version {
-      id
-      message
-      createdAt
-    }
-  }
-}
-""")
-
-# We fetch referencedObject from the Version/Commit.
-# (Speckle schema calls it "Commit" in some references, but "Version" in UI; field is referencedObject.)
-Q_VERSION_REFERENCED_OBJECT = """
-query GetVersionRootObject($projectId: String!, $versionId: String!) {
-  project(id: $projectId) {
-    version(id: $versionId) {
-      id
-      referencedObject
-      message
-      createdAt
-      authorUser {
-        id
-        name
-      }
-    }
-  }
-}
-"""
-
-Q_OBJECT_DATA = """
-query GetObjectData($projectId: String!, $objectId: String!) {
-  project(id: $projectId) {
-    object(id: $objectId) {
-      id
-      speckleType
-      data
-    }
-  }
-}
-"""
+# "store" = deduplicated objects + manifests, or one file per version:
+# "json" (pretty JSON), "jsonl.gz" / "jsonl.zst" (compressed JSON lines), "spkb" (binary arrays, mmap-able)
+BACKUP_FORMAT = "store"
+
+# Backup pipeline
+FETCH_WORKERS = 4        # concurrent HTTP fetches
+QUEUE_SIZE = 64          # pending versions before the intake waits
+ON_QUEUE_FULL = "wait"   # or "drop_oldest"
+REPORT_EVERY_S = 60      # print per-stage latency stats (0 = only on exit)
+RESOLVE_CHILDREN = False # also download every child object (full tree instead of reference stubs)
+# None = whole objects, "metadata" = skip displayValue / mesh buffers (never downloaded; needs a file BACKUP_FORMAT),
+# or a comma-separated list of members to keep, e.g. "properties,area,volume"
+BACKUP_PROJECTION = None
+
+# Long-running mode
+CHECKPOINT_FILENAME = f".listener_checkpoint_{PROJECT_ID}.json"  # last backed-up version, for catch-up after restarts
+KEEP_ALIVE_TIMEOUT_S = 60     # reconnect if the server sends no keep-alive for this long
+RECONNECT_MAX_DELAY_S = 300   # exponential backoff cap
+
+# Instrumentation (all off by default)
+METRICS_PORT = None           # e.g. 9464 -> Prometheus text on http://127.0.0.1:9464/metrics
+METRICS_LOG_FILENAME = None   # e.g. "listener_metrics.jsonl" (next to this script), one line per REPORT_EVERY_S
+PROFILE = None                # "cprofile" or "py-spy"
+
+# Incremental recompute (off by default)
+INCREMENTAL_TARGET_MODEL_ID = None            # model that receives the derived versions
+INCREMENTAL_TABLE = "tower_properties.csv"    # properties set on every module (next to this script)
+INCREMENTAL_KEY = "tower-properties-v1"       # change when the table / processing changes
+INCREMENTAL_STATE_DIRNAME = ".incremental"    # per-model results of the previous version
 
 # -----------------------
 # Helpers (copilot thought of these and they're very useful to know what's wrong in case something fails)
 # -----------------------
 
-def _safe_timestamp(dt: datetime) -> str:
-    """Filesystem-safe timestamp."""
-    return dt.strftime("%Y-%m-%d_%H-%M-%S")
-
-def _ensure_backup_dir(script_dir: str) -> str:
-    path = os.path.join(script_dir, BACKUP_DIRNAME)
-    os.makedirs(path, exist_ok=True)
-    return path
-
-def _write_backup_json(script_dir: str, payload: dict, received_at: datetime) -> str:
-    backup_dir = _ensure_backup_dir(script_dir)
-    # Convert UTC to CET (UTC+1)
-    cet = timezone(timedelta(hours=1))
-    received_at_cet = received_at.astimezone(cet)
-    filename = f"{_safe_timestamp(received_at_cet)}.json"
-    filepath = os.path.join(backup_dir, filename)
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
-
-    return filepath
-
-def _speckle_http_client() -> Client:
-    if not YOUR_TOKEN:
-        raise RuntimeError("Missing SPECKLE_TOKEN in your environment (.env).")
-
-    transport = RequestsHTTPTransport(
-        url=f"{SPECKLE_SERVER_HTTP}/graphql",
-        headers={"Authorization": f"Bearer {YOUR_TOKEN}"},
-    )
-    return Client(transport=transport, fetch_schema_from_transport=False)
-
-def _get_version_root_object_and_author(http_client: Client, project_id: str, version_id: str) -> dict:
-    query = gql(Q_VERSION_REFERENCED_OBJECT)
-    res = http_client.execute(
-        query,
-        variable_values={"projectId": project_id, "versionId": version_id},
-    )
-    ver = res["project"]["version"]
-    if not ver or not ver.get("referencedObject"):
-        raise RuntimeError(f"Could not resolve referencedObject for version {version_id}")
-    return ver
-
-def _get_object_data(http_client: Client, project_id: str, object_id: str) -> dict:
-    query = gql(Q_OBJECT_DATA)
-    res = http_client.execute(
-        query,
-        variable_values={"projectId": project_id, "objectId": object_id},
-    )
-    obj = res["project"]["object"]
-    if not obj or "data" not in obj:
-        raise RuntimeError(f"Could not fetch object.data for object {object_id}")
-    return obj
+async def _on_version(pipeline: BackupPipeline, evt: dict, received_at: datetime,
+                      recompute: IncrementalRecompute = None) -> bool:
+    #Pulls out the useful bits from whatever Speckle sent: the version ID, model ID, message, etc.
+    ver_meta = evt.get("version") or {}
+    print("=" * 60)
+    print("Update received" + (" (catch-up)" if evt.get("type") == "catch_up" else ""))
+    print(f"  - modelId: {evt.get('modelId')}")
+    print(f"  - versionId: {ver_meta.get('id')}")
+    print(f"  - type: {evt.get('type')}")
+    print(f"  - message: {ver_meta.get('message')}")
+    print(f"  - createdAt: {ver_meta.get('createdAt')}")
+
+    #The subscription only sends lightweight metadata; the pipeline does the two follow-up HTTP requests and the file write in the background.
+    taken = await pipeline.submit(evt, received_at)
+    if not taken:
+        print("  (already backed up / no version id, skipped)")
+    # a replayed version may be backed up already but still lack its derived version
+    if recompute is not None:
+        await recompute.submit(evt, received_at)
+    return taken
 
 # -----------------------
 # Main async loop
 # -----------------------
 
 async def subscribe_and_backup():
-    #Figures out where the script is saved on disk (so it knows where to write the backup files), and creates the HTTP client for making GraphQL queries.
+    #Figures out where the script is saved on disk (so it knows where to write the backup files), and starts the backup pipeline (async HTTP workers + file writer).
+    if not YOUR_TOKEN:
+        raise RuntimeError("Missing SPECKLE_TOKEN in your environment (.env).")
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    http_client = _speckle_http_client()
-
-    print("✓ HTTP client authenticated")
-
-    transport = WebsocketsTransport(
-        url=SPECKLE_SERVER_WS,
-        init_payload={"Authorization": f"Bearer {YOUR_TOKEN}"},
+    writer = make_writer(os.path.join(script_dir, BACKUP_DIRNAME), BACKUP_FORMAT)
+
+    pipeline = BackupPipeline(
+        project_id=PROJECT_ID,
+        graphql_url=f"{SPECKLE_SERVER_HTTP}/graphql",
+        token=YOUR_TOKEN,
+        writer=writer,
+        fetch_workers=FETCH_WORKERS,
+        queue_size=QUEUE_SIZE,
+        on_full=ON_QUEUE_FULL,
+        report_every=REPORT_EVERY_S,
+        resolve_children=RESOLVE_CHILDREN,
+        projection=BACKUP_PROJECTION,
     )
-
-    ws_client = Client(transport=transport, fetch_schema_from_transport=False)
-        #Sets up and opens a persistent WebSocket connection to Speckle. async with means it will automatically close the connection when the script stops.
+    await pipeline.start()
+    print(f"✓ HTTP client ready ({FETCH_WORKERS} fetch workers)")
+
+    recompute = None
+    if INCREMENTAL_TARGET_MODEL_ID:
+        recompute = IncrementalRecompute(
+            SpeckleSession(SPECKLE_SERVER_HTTP, YOUR_TOKEN),
+            PROJECT_ID,
+            tag_properties(load_property_table(os.path.join(script_dir, INCREMENTAL_TABLE))),
+            target_model_id=INCREMENTAL_TARGET_MODEL_ID,
+            state_dir=os.path.join(script_dir, INCREMENTAL_STATE_DIRNAME),
+            key=INCREMENTAL_KEY,
+        )
+        await recompute.start()
+        print(f"✓ Incremental recompute -> model {INCREMENTAL_TARGET_MODEL_ID}")
+
+    listener = VersionListener(
+        project_id=PROJECT_ID,
+        ws_url=SPECKLE_SERVER_WS,
+        token=YOUR_TOKEN,
+        handler=lambda evt, received_at: _on_version(pipeline, evt, received_at, recompute),
+        checkpoint=Checkpoint(os.path.join(script_dir, CHECKPOINT_FILENAME)),
+        keep_alive_timeout=KEEP_ALIVE_TIMEOUT_S,
+        backoff_max=RECONNECT_MAX_DELAY_S,
+        heartbeat_every=REPORT_EVERY_S,
+    )
+    # a version only moves the checkpoint once its backup is on disk (and its derived version exists)
+    if recompute is not None:
+        join = StageJoin(listener.done, ("backup", "recompute"))
+        pipeline.on_written = join.reporter("backup")
+        recompute.on_done = join.reporter("recompute")
+    else:
+        pipeline.on_written = listener.done
+    print("Press Ctrl+C to stop\n")
     try:
-        async with ws_client as session:
-            print(f"Connected (WS) to {SPECKLE_SERVER_WS}")
-            print(f"Listening for updates on project: {PROJECT_ID}")
-            print("Press Ctrl+C to stop\n")
-
-            async for result in session.subscribe(
-                #Sits and waits. Every time Speckle sends a new version update, the code inside this loop runs once for that update.
-                SUB_PROJECT_VERSIONS_UPDATED,
-                variable_values={"projectId": PROJECT_ID},
-            ):
-                received_at = datetime.now(timezone.utc)
-
-                evt = (result or {}).get("projectVersionsUpdated") or {}
-                ver_meta = evt.get("version") or {}
-
-                version_id = ver_meta.get("id")
-                message = ver_meta.get("message")
-                created_at = ver_meta.get("createdAt")
-                model_id = evt.get("modelId")
-                event_type = evt.get("type")
-                #Pulls out the useful bits from whatever Speckle sent: the version ID, model ID, message, etc.
-
-                print("=" * 60)
-                print("Update received")
-                print(f"  - modelId: {model_id}")
-                print(f"  - versionId: {version_id}")
-                print(f"  - type: {event_type}")
-                print(f"  - message: {message}")
-                print(f"  - createdAt: {created_at}")
-
-                try:
-                    # 1) Resolve the root object for this version
-                    version_info = _get_version_root_object_and_author(http_client, PROJECT_ID, version_id)
-                    root_object_id = version_info["referencedObject"]
-                    author = version_info.get("authorUser") or {}
-
-                    # 2) Fetch object.data
-                    obj = _get_object_data(http_client, PROJECT_ID, root_object_id)
-                    #The subscription only sends lightweight metadata, so here it makes two follow-up HTTP requests to get the actual object data for that version.
-
-                    # 3) Build backup payload
-                    backup_payload = {
-                        "projectId": PROJECT_ID,
-                        "modelId": model_id,
-                        "versionId": version_id,
-                        "rootObjectId": root_object_id,
-                        "commitMessage": message,
-                        "createdAt": created_at,
-                        "receivedAt": received_at.isoformat(),
-                        "author": {
-                            "id": author.get("id"),
-                            "name": author.get("name"),
-                        },
-                        "object": {
-                            "id": obj.get("id"),
-                            "speckleType": obj.get("speckleType"),
-                            "data": obj.get("data"),
-                        },
-                    }
-                    #Bundles everything into one dict and writes it to a timestamped JSON file on disk.¡
-
-                    # 4) Write timestamped file
-                    outpath = _write_backup_json(script_dir, backup_payload, received_at)
-                    print(f"✅ Backup written: {outpath}")
-
-                except Exception as e:
-                    print(f"❌ Backup failed for version {version_id}: {e}")
-                    #If anything in steps 5 or 6 goes wrong, it prints the error and then just continues waiting for the next update, it doesn't crash the whole script.
-
-    except KeyboardInterrupt:
+        # Runs for as long as the script does: reconnects with backoff and backfills missed versions
+        await listener.run()
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n Subscription stopped by user")
     finally:
-        await transport.close()
+        await pipeline.stop()
+        if recompute is not None:
+            await recompute.stop()
         print("Connection closed")
 
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    with instrument(port=METRICS_PORT, every=REPORT_EVERY_S, profile=PROFILE,
+                    log_path=os.path.join(script_dir, METRICS_LOG_FILENAME) if METRICS_LOG_FILENAME else None):
+        try:
+            asyncio.run(subscribe_and_backup())
+        except KeyboardInterrupt:
+            pass
+
 if __name__ == "__main__":
-    asyncio.run(subscribe_and_backup())
+    main()
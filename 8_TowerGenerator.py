@@ -0,0 +1,136 @@
+"""
+08 - Parametric Tower Generator
+
+- Load the template geometry from the source model (same as 3_HomeworkSession03.py)
+- Stack N copy-on-write modules with a spacing / twist rule
+- Tag each module from a CSV / JSON property table (Designer, Collection, ...)
+- Optionally compact the meshes (weld vertices, drop degenerate / duplicate faces, quantize)
+- Measure every module's meshes (bbox, area, volume, centroid) into its properties
+- Optionally report modules whose bounding boxes overlap (speckle_tools.spatial)
+- Upload the whole "Tower" collection in resumable batches with progress
+  (speckle_tools.upload) and create a version on the target model
+
+Example:
+    python 8_TowerGenerator.py --count 200 --spacing 16000 --properties tower_properties.csv
+    python 8_TowerGenerator.py --count 50 --spacing 9000 --check-clashes --dry-run
+    python 8_TowerGenerator.py --count 200 --compact --quantize 0.1
+    python 8_TowerGenerator.py --count 200 --profile cprofile --metrics-log tower_metrics.jsonl
+"""
+
+import argparse
+import os
+
+from specklepy.core.api.inputs.version_inputs import CreateVersionInput
+
+from speckle_tools.cache import cached_receive
+from speckle_tools.client import connect
+from speckle_tools.compact import compact
+from speckle_tools.geometry import analyze
+from speckle_tools.metrics import add_arguments, instrument
+from speckle_tools.queries import find_model_by_name, get_latest_ref_obj_id
+from speckle_tools.spatial import SpatialIndex, index_ids, label
+from speckle_tools.tower import build_tower, load_property_table, stack_rule
+from speckle_tools.upload import DEFAULT_BATCH_MB, DEFAULT_WORKERS, upload
+
+PROJECT_ID = "128262a20c"
+SOURCE_MODEL_ID = "a1014e4b32"
+TARGET_GEOMETRY_ID = "c859d4998f1f91f9afe2e5c0af23d94c"
+TARGET_MODEL_NAME = "team_01.1checkk"
+Z_OFFSET = 16000
+UPLOAD_JOURNAL_DIRNAME = ".upload_journal"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a stacked tower from one template module.")
+    parser.add_argument("--count", type=int, default=3, help="number of modules")
+    parser.add_argument("--spacing", type=float, default=Z_OFFSET, help="Z distance between modules (model units)")
+    parser.add_argument("--twist", type=float, default=0.0, help="rotation about Z per module, degrees")
+    parser.add_argument("--properties", help="CSV/JSON table, one row per module (rows repeat)")
+    parser.add_argument("--project", default=PROJECT_ID)
+    parser.add_argument("--source-model", default=SOURCE_MODEL_ID)
+    parser.add_argument("--geometry-id", default=TARGET_GEOMETRY_ID)
+    parser.add_argument("--target-model", default=TARGET_MODEL_NAME, help="target model name (substring match)")
+    parser.add_argument("--tower-tag", default="Team-01.1")
+    parser.add_argument("--message", help="version message")
+    parser.add_argument("--upload-workers", type=int, default=DEFAULT_WORKERS, help="batches uploaded in parallel")
+    parser.add_argument("--batch-mb", type=float, default=DEFAULT_BATCH_MB, help="upload batch size (MB of JSON)")
+    parser.add_argument("--dry-run", action="store_true", help="build the tower but don't send it")
+    parser.add_argument("--no-analyze", action="store_true",
+                        help="don't measure the meshes (bbox / area / volume / centroid written as properties)")
+    parser.add_argument("--compact", action="store_true",
+                        help="weld vertices and drop degenerate / duplicate faces before sending")
+    parser.add_argument("--weld-tolerance", type=float, default=None,
+                        help="weld distance in model units (default: 1 micron)")
+    parser.add_argument("--quantize", type=float, default=None,
+                        help="with --compact, round coordinates to this step in model units, e.g. 0.1")
+    parser.add_argument("--check-clashes", action="store_true",
+                        help="list modules whose bounding boxes overlap (touching doesn't count)")
+    parser.add_argument("--clash-tolerance", type=float, default=0.0,
+                        help="ignore overlaps up to this depth (model units)")
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def report_clashes(root, tolerance: float, limit: int = 20) -> int:
+    index = SpatialIndex.from_object(root)
+    pairs = index.overlaps(tolerance)
+    if not pairs:
+        print(f"✓ No overlapping modules ({len(index)} elements checked)")
+        return 0
+    print(f"⚠ {len(pairs)} overlapping pair(s) among {len(index)} elements:")
+    for a, b in pairs[:limit]:
+        print(f"    {label(a)} × {label(b)}")
+    if len(pairs) > limit:
+        print(f"    ... {len(pairs) - limit} more")
+    return len(pairs)
+
+
+def main():
+    args = parse_args()
+    instrument(args)  # metrics / profile, if asked for; stopped at exit
+    table = load_property_table(args.properties) if args.properties else None
+
+    session = connect()
+
+    target_model_id, target_model_name = find_model_by_name(session, args.project, args.target_model)
+    if not target_model_id:
+        print(f"ERROR: Model '{args.target_model}' not found")
+        return
+
+    transport = session.transport(args.project)
+    source_base = cached_receive(get_latest_ref_obj_id(session, args.project, args.source_model), transport)
+
+    template = index_ids(source_base).get(args.geometry_id)
+    if template is None:
+        print(f"ERROR: Geometry {args.geometry_id} not found")
+        return
+
+    root = build_tower(
+        template, args.count, stack_rule(args.spacing, args.twist), table,
+        tower_tag=args.tower_tag, units=getattr(template, "units", None) or "mm",
+    )
+    print(f"✓ Built {args.count} modules in {len(root.elements)} collection(s): "
+          + ", ".join(f"{c.name} ({len(c.elements)})" for c in root.elements))
+    if args.compact:
+        compact(root, tolerance=args.weld_tolerance, quantize=args.quantize).print()
+    if not args.no_analyze:
+        analyze(root).print()
+    if args.check_clashes:
+        report_clashes(root, args.clash_tolerance)
+    if args.dry_run:
+        return
+
+    # a failed upload can simply be run again: confirmed batches are skipped
+    journal_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), UPLOAD_JOURNAL_DIRNAME)
+    new_obj_id = upload(root, session, args.project, workers=args.upload_workers, batch_mb=args.batch_mb,
+                        journal_dir=journal_dir)
+    new_version = session.client.version.create(CreateVersionInput(
+        project_id=args.project, model_id=target_model_id, object_id=new_obj_id,
+        message=args.message or f"Tower generator: {args.count} modules, spacing {args.spacing:g}, twist {args.twist:g}°"
+    ))
+
+    print(f"Success! URL: {session.server_url}/projects/{args.project}/models/{target_model_id}@{new_version.id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+09 - Inspect / restore the deduplicated backup store written by 7_HW-Listening.py
+
+- list:    show every backed-up version with how much it added to the store
+- restore: rebuild the full JSON snapshot of one version
+- import:  move full-snapshot backup files (any format) into the store
+- inspect: summarise a backup file without loading all of it
+- convert: rewrite a backup file in another format (json / jsonl.gz / jsonl.zst / spkb)
+
+import and convert-to-jsonl stream one object at a time (speckle_tools.stream),
+so multi-GB backups don't have to fit in memory.
+
+Examples:
+    python 9_BackupStore.py list
+    python 9_BackupStore.py restore 52e9c2d133 --out restored.json
+    python 9_BackupStore.py import speckle_backups/*.json
+    python 9_BackupStore.py convert speckle_backups/2026-02-13_12-04-31.json --format jsonl.zst
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+from speckle_tools.formats import FORMATS, JsonlWriter, describe, detect_format, extension, read_backup, write_backup
+from speckle_tools.store import BackupStore
+from speckle_tools.stream import iter_backup_records
+
+BACKUP_DIRNAME = "speckle_backups"
+
+
+def cmd_list(store: BackupStore, args) -> None:
+    versions = store.list_versions()
+    if not versions:
+        print(f"No versions in {store.versions_dir}")
+        return
+    for path in versions:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        stats = manifest.get("store") or {}
+        print(f"{os.path.basename(path)[:-5]:<40} model {manifest.get('modelId')}  "
+              f"objects {stats.get('objects', '?'):>5}  new {stats.get('written', '?'):>5}  "
+              f"+{stats.get('bytes', 0) / 1024:.1f} KB  {manifest.get('commitMessage') or ''}")
+
+
+def cmd_restore(store: BackupStore, args) -> None:
+    payload = store.restore(args.version)
+    out = args.out or f"{payload.get('versionId')}_restored.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+    print(f"✓ Restored version {payload.get('versionId')} to {out}")
+
+
+def cmd_import(store: BackupStore, args) -> None:
+    for path in args.files:
+        stamp = os.path.basename(path)[:19]
+        try:
+            received_at = datetime.strptime(stamp, "%Y-%m-%d_%H-%M-%S")
+        except ValueError:
+            received_at = None
+        manifest = store.put_records(iter_backup_records(path), received_at)
+        print(f"✓ {path} -> {manifest}")
+
+
+def cmd_inspect(store: BackupStore, args) -> None:
+    for path in args.files:
+        info = describe(path)
+        extra = "  ".join(f"{k} {v}" for k, v in info.items() if k not in ("path", "format", "bytes"))
+        print(f"{path:<50} {info['format']:<9} {info['bytes'] / 1024:8.1f} KB  {extra}")
+
+
+def cmd_convert(store: BackupStore, args) -> None:
+    for path in args.files:
+        src_fmt = detect_format(path)
+        out = path[:-len(extension(src_fmt))] + extension(args.format)
+        if out == path:
+            print(f"- {path} is already {args.format}")
+            continue
+        if args.format.startswith("jsonl"):
+            with JsonlWriter(out) as w:
+                for rec in iter_backup_records(path):
+                    w.write(rec)
+        else:
+            write_backup(read_backup(path), out, args.format)
+        before, after = os.path.getsize(path), os.path.getsize(out)
+        print(f"✓ {path} -> {out} ({before / 1024:.1f} KB -> {after / 1024:.1f} KB, {after / before:.0%})")
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Deduplicated Speckle backup store.")
+    parser.add_argument("--store", default=os.path.join(script_dir, BACKUP_DIRNAME), help="store root directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="list backed-up versions").set_defaults(func=cmd_list)
+
+    p = sub.add_parser("restore", help="rebuild one version's full snapshot")
+    p.add_argument("version", help="versionId, timestamp prefix or manifest path")
+    p.add_argument("--out", help="output JSON file (default: <versionId>_restored.json)")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("import", help="add full-snapshot JSON backups to the store")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("inspect", help="summarise backup files")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_inspect)
+
+    p = sub.add_parser("convert", help="rewrite backup files in another format")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--format", choices=FORMATS, required=True)
+    p.set_defaults(func=cmd_convert)
+
+    args = parser.parse_args()
+    args.func(BackupStore(args.store), args)
+
+
+if __name__ == "__main__":
+    main()
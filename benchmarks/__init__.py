@@ -0,0 +1,5 @@
+"""
+Offline benchmarks for the speckle_tools helpers.
+
+Run from the repository root, e.g. `python -m benchmarks.bench_transform`.
+"""
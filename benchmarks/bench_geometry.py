@@ -0,0 +1,99 @@
+"""
+Benchmark: bulk NumPy geometry stats vs. a per-face Python loop
+
+Builds N displayValue meshes (wavy quad grids, optionally mixed with
+triangles) and times
+  - analyze(): decode faces, bbox / area / volume / centroid for every mesh
+  - the straightforward per-face loop over the faces list
+
+    python -m benchmarks.bench_geometry --meshes 100 --faces 10000
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+from specklepy.objects.base import Base
+from specklepy.objects.geometry.mesh import Mesh
+
+from speckle_tools.geometry import analyze
+
+
+def grid_mesh(n_faces: int, offset: float, ngons: bool) -> Mesh:
+    side = max(1, int(math.sqrt(n_faces)))
+    xs, ys = np.meshgrid(np.arange(side + 1, dtype=np.float64), np.arange(side + 1, dtype=np.float64))
+    z = np.sin(xs / 7.0) * np.cos(ys / 5.0)
+    vertices = np.stack([xs + offset, ys, z], axis=-1).reshape(-1, 3)
+    i = np.arange(side)[:, None] * (side + 1) + np.arange(side)[None, :]
+    quads = np.stack([i, i + 1, i + side + 2, i + side + 1], axis=-1).reshape(-1, 4)
+    if not ngons:
+        faces = np.hstack([np.full((len(quads), 1), 4), quads]).ravel()
+    else:
+        # every other quad as two triangles: a mixed n-gon list
+        parts = []
+        for k, q in enumerate(quads.tolist()):
+            parts.extend([4, *q] if k % 2 else [3, q[0], q[1], q[2], 3, q[0], q[2], q[3]])
+        faces = np.asarray(parts)
+    return Mesh(vertices=vertices.ravel().tolist(), faces=faces.tolist(), units="m")
+
+
+def loop_stats(meshes):
+    """Per-face Python baseline: bbox, area and signed volume for each mesh."""
+    out = []
+    for mesh in meshes:
+        v = mesh.vertices
+        pts = [(v[k], v[k + 1], v[k + 2]) for k in range(0, len(v), 3)]
+        lo = [min(p[a] for p in pts) for a in range(3)]
+        hi = [max(p[a] for p in pts) for a in range(3)]
+        area = volume = 0.0
+        f = mesh.faces
+        i = 0
+        while i < len(f):
+            n = f[i]
+            loop = f[i + 1:i + 1 + n]
+            for j in range(1, n - 1):
+                a, b, c = pts[loop[0]], pts[loop[j]], pts[loop[j + 1]]
+                ab = [b[t] - a[t] for t in range(3)]
+                ac = [c[t] - a[t] for t in range(3)]
+                cr = (ab[1] * ac[2] - ab[2] * ac[1], ab[2] * ac[0] - ab[0] * ac[2], ab[0] * ac[1] - ab[1] * ac[0])
+                area += 0.5 * math.sqrt(cr[0] ** 2 + cr[1] ** 2 + cr[2] ** 2)
+                bc = (b[1] * c[2] - b[2] * c[1], b[2] * c[0] - b[0] * c[2], b[0] * c[1] - b[1] * c[0])
+                volume += (a[0] * bc[0] + a[1] * bc[1] + a[2] * bc[2]) / 6.0
+            i += n + 1
+        out.append((lo, hi, area, volume))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--meshes", type=int, default=100)
+    parser.add_argument("--faces", type=int, default=10_000, help="faces per mesh")
+    parser.add_argument("--ngons", action="store_true", help="mixed triangles / quads instead of all quads")
+    parser.add_argument("--skip-loop", action="store_true", help="only time the NumPy pass")
+    args = parser.parse_args()
+
+    meshes = [grid_mesh(args.faces, 1.5 * i * math.sqrt(args.faces), args.ngons) for i in range(args.meshes)]
+    root = Base()
+    root.elements = []
+    for m in meshes:
+        el = Base()
+        el.displayValue = [m]
+        root.elements.append(el)
+    print(f"{args.meshes} meshes, ~{args.faces:,} quads each" + (" (half split into triangles)" if args.ngons else ""))
+
+    t = time.perf_counter()
+    report = analyze(root)
+    t_numpy = time.perf_counter() - t
+    print(f"analyze()       {t_numpy:8.3f} s   ({report.total.triangles:,} triangles, area {report.total.area:,.1f})")
+
+    if not args.skip_loop:
+        t = time.perf_counter()
+        baseline = loop_stats(meshes)
+        t_loop = time.perf_counter() - t
+        area = sum(b[2] for b in baseline)
+        print(f"per-face loop   {t_loop:8.3f} s   (area {area:,.1f})  -> {t_loop / t_numpy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
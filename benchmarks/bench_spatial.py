@@ -0,0 +1,77 @@
+"""
+Benchmark: bbox clash candidates with SpatialIndex vs. all pairs
+
+Scatters N boxes (a tower's worth of stacked modules plus random fittings)
+and times
+  - SpatialIndex build + overlaps() (sort-and-sweep)
+  - the straightforward check of every pair (O(n²), Python loop)
+  - 1000 box queries and nearest-neighbour lookups on the index
+
+    python -m benchmarks.bench_spatial --boxes 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from speckle_tools.spatial import SpatialIndex
+
+
+def make_boxes(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    lo = rng.uniform(0, 1000, (n, 3)) * np.array([1.0, 1.0, 10.0])
+    hi = lo + rng.uniform(1, 20, (n, 3))
+    return lo, hi
+
+
+def pairwise(lo, hi):
+    out = []
+    boxes = list(zip(lo.tolist(), hi.tolist()))
+    for i, (alo, ahi) in enumerate(boxes):
+        for j in range(i + 1, len(boxes)):
+            blo, bhi = boxes[j]
+            if all(alo[k] < bhi[k] and blo[k] < ahi[k] for k in range(3)):
+                out.append((i, j))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boxes", type=int, default=20_000)
+    parser.add_argument("--skip-pairs", action="store_true", help="don't run the O(n²) baseline")
+    args = parser.parse_args()
+
+    lo, hi = make_boxes(args.boxes)
+    print(f"{args.boxes:,} boxes")
+
+    t = time.perf_counter()
+    index = SpatialIndex(lo, hi)
+    t_build = time.perf_counter() - t
+    t = time.perf_counter()
+    pairs = index.overlap_indices()
+    t_sweep = time.perf_counter() - t
+    print(f"build           {t_build:8.3f} s")
+    print(f"overlaps()      {t_sweep:8.3f} s   ({len(pairs):,} pairs)")
+
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, 1000, (1000, 3)) * np.array([1.0, 1.0, 10.0])
+    t = time.perf_counter()
+    hits = sum(len(index.query_indices(p, p + 50.0)) for p in points)
+    t_query = time.perf_counter() - t
+    t = time.perf_counter()
+    for p in points:
+        index.nearest(p, k=5)
+    t_nearest = time.perf_counter() - t
+    print(f"1000 queries    {t_query:8.3f} s   ({hits:,} hits)")
+    print(f"1000 nearest(5) {t_nearest:8.3f} s")
+
+    if not args.skip_pairs:
+        t = time.perf_counter()
+        baseline = pairwise(lo, hi)
+        t_pairs = time.perf_counter() - t
+        print(f"all pairs       {t_pairs:8.3f} s   ({len(baseline):,} pairs)  -> {t_pairs / (t_build + t_sweep):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
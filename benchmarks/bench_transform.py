@@ -0,0 +1,118 @@
+"""
+Benchmark: batched NumPy transform vs. the old per-element shift_z_recursive loop
+
+Builds a synthetic BrepX-like object (one Base with N displayValue meshes) and
+times
+  - a pure Z shift: old shift_z_recursive vs. apply_transform (translation
+    fast path: only the z slice is rebuilt, in place when the buffer isn't
+    shared; still one new float per vertex, so expect ~1.5x, not the matmul gain)
+  - a rotate + move: the same per-element loop style applied to a full 4x4
+    matrix vs. apply_transform
+
+    python -m benchmarks.bench_transform --meshes 50 --vertices 20000
+"""
+
+import argparse
+import time
+
+from specklepy.objects.base import Base
+from specklepy.objects.geometry.mesh import Mesh
+
+from speckle_tools.transform import apply_transform, compose, rotation_z, translation
+
+
+def legacy_shift_z(obj, dz, seen=None):
+    """The loop that used to live in 3_HomeworkSession03.py (kept as the baseline)."""
+    if seen is None:
+        seen = set()
+    if obj is None or id(obj) in seen:
+        return
+    seen.add(id(obj))
+
+    if hasattr(obj, "displayValue") and obj.displayValue:
+        meshes = obj.displayValue if isinstance(obj.displayValue, list) else [obj.displayValue]
+        for m in meshes:
+            if hasattr(m, "vertices") and m.vertices:
+                verts = list(m.vertices)
+                for i in range(2, len(verts), 3):
+                    verts[i] += dz
+                m.vertices = verts
+
+    if isinstance(obj, list):
+        for item in obj:
+            legacy_shift_z(item, dz, seen)
+    elif hasattr(obj, "get_dynamic_member_names"):
+        for name in obj.get_dynamic_member_names():
+            try: legacy_shift_z(getattr(obj, name), dz, seen)
+            except: pass
+
+
+def legacy_affine(obj, m):
+    """Per-element loop generalised to a 4x4 matrix, for the rotation case."""
+    for mesh in obj.displayValue:
+        verts = list(mesh.vertices)
+        for i in range(0, len(verts), 3):
+            x, y, z = verts[i], verts[i + 1], verts[i + 2]
+            verts[i] = m[0][0] * x + m[0][1] * y + m[0][2] * z + m[0][3]
+            verts[i + 1] = m[1][0] * x + m[1][1] * y + m[1][2] * z + m[1][3]
+            verts[i + 2] = m[2][0] * x + m[2][1] * y + m[2][2] * z + m[2][3]
+        mesh.vertices = verts
+
+
+def make_brep(n_meshes: int, n_vertices: int) -> Base:
+    brep = Base()
+    brep.displayValue = [
+        Mesh(
+            vertices=[float(i % 997) for i in range(n_vertices * 3)],
+            faces=[3, 0, 1, 2] * max(1, n_vertices // 3),
+            units="mm",
+        )
+        for _ in range(n_meshes)
+    ]
+    return brep
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--meshes", type=int, default=20)
+    parser.add_argument("--vertices", type=int, default=50_000, help="vertices per mesh")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    a = make_brep(args.meshes, args.vertices)
+    b = make_brep(args.meshes, args.vertices)
+    total = args.meshes * args.vertices
+    print(f"vertices: {total:,}")
+
+    shift = translation(dz=16000)
+    _report("z shift",
+            _time(lambda: legacy_shift_z(a, 16000), args.repeat),
+            _time(lambda: apply_transform(b, shift), args.repeat),
+            total)
+
+    turn = compose(rotation_z(15), translation(dz=16000))
+    rows = turn.tolist()
+    _report("rotate + move",
+            _time(lambda: legacy_affine(a, rows), args.repeat),
+            _time(lambda: apply_transform(b, turn), args.repeat),
+            total)
+
+
+def _report(label: str, t_loop: float, t_numpy: float, total: int) -> None:
+    print(f"\n[{label}]")
+    print(f"  per-element loop: {t_loop * 1000:9.1f} ms  ({total / t_loop / 1e6:.1f} M vert/s)")
+    print(f"  apply_transform:  {t_numpy * 1000:9.1f} ms  ({total / t_numpy / 1e6:.1f} M vert/s)")
+    print(f"  speedup:          {t_loop / t_numpy:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
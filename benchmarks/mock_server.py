@@ -0,0 +1,595 @@
+"""
+Local stand-in for a Speckle server, for offline benchmarks
+
+    with MockSpeckleServer() as server:                  # http://127.0.0.1:<port>, any token works
+        root_id = server.seed_base(PROJECT, tower)       # or seed_json / seed_objects / seed_fixtures
+        model_id = server.add_model(PROJECT, "towers")
+        server.add_version(PROJECT, model_id, root_id)   # also pushed to live subscriptions
+
+Serves, on one port (so ws_url -> http_url works as in speckle_tools.listener):
+- POST /graphql                  the queries / mutations in speckle_tools.queries,
+                                 executed with graphql-core against a small schema
+- GET  /graphql (websocket)      projectVersionsUpdated subscriptions, graphql-ws and
+                                 graphql-transport-ws protocols, with keep-alives
+- POST /api/getobjects/{p}       id<TAB>json lines
+- GET  /objects/{p}/{id}         the object and its closure, one line each
+- GET  /objects/{p}/{id}/single  one object
+- POST /api/diff/{p}             which ids exist
+- POST /objects/{p}              multipart upload, plain or gzipped JSON arrays
+
+`latency` adds a fixed delay to every request, `requests` counts them per route.
+Standard library + graphql-core only.
+"""
+
+import base64
+import email
+import gzip
+import hashlib
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from graphql import build_schema, execute, graphql_sync, parse
+
+SCHEMA = build_schema("""
+scalar JSONObject
+
+type Query {
+  project(id: String!): Project
+  activeUser: User
+  serverInfo: ServerInfo
+}
+type Mutation {
+  modelMutations: ModelMutations
+  versionMutations: VersionMutations
+}
+type Subscription {
+  projectVersionsUpdated(id: String!): ProjectVersionsUpdatedMessage
+}
+
+type ServerInfo { name: String, version: String }
+type User { id: String, name: String }
+type Project {
+  id: String!
+  name: String
+  model(id: String!): Model
+  models(limit: Int, cursor: String, filter: ModelsFilter): ModelCollection
+  version(id: String!): Version
+  object(id: String!): SpeckleObject
+}
+input ModelsFilter { search: String, onlyWithVersions: Boolean }
+type ModelCollection { totalCount: Int, cursor: String, items: [Model] }
+type Model {
+  id: String!
+  name: String
+  description: String
+  versions(limit: Int, cursor: String): VersionCollection
+}
+type VersionCollection { totalCount: Int, cursor: String, items: [Version] }
+type Version {
+  id: String!
+  message: String
+  createdAt: String
+  referencedObject: String
+  sourceApplication: String
+  authorUser: User
+}
+type SpeckleObject { id: String, speckleType: String, data: JSONObject }
+type ProjectVersionsUpdatedMessage { id: String, modelId: String, type: String, version: Version }
+
+type ModelMutations { create(input: CreateModelInput!): Model }
+input CreateModelInput { projectId: String!, name: String!, description: String }
+type VersionMutations { create(input: CreateVersionInput!): Version }
+input CreateVersionInput {
+  projectId: String!
+  modelId: String!
+  objectId: String!
+  message: String
+  sourceApplication: String
+  totalChildrenCount: Int
+  parents: [String]
+}
+""")
+
+USER = {"id": "mock-user", "name": "Benchmark User"}
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+KEEP_ALIVE_S = 5.0
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _page(items: list, limit: Optional[int], cursor: Optional[str]) -> dict:
+    """Offset pagination: the cursor is the index of the next item."""
+    start = int(cursor or 0)
+    limit = len(items) if limit is None else limit
+    page = items[start:start + limit]
+    more = start + limit < len(items)
+    return {"totalCount": len(items), "cursor": str(start + limit) if more else None, "items": page}
+
+# -----------------------
+# GraphQL resolvers (graphql-core calls methods with (info, **args))
+# -----------------------
+
+class _Model:
+    def __init__(self, model: dict):
+        self.id, self.name, self.description = model["id"], model["name"], model.get("description")
+        self._versions = model["versions"]
+
+    def versions(self, info, limit=None, cursor=None):
+        return _page(self._versions, limit, cursor)
+
+
+class _Project:
+    def __init__(self, server: "MockSpeckleServer", project_id: str):
+        self._server = server
+        self._data = server.project(project_id)
+        self.id, self.name = project_id, self._data["name"]
+
+    def model(self, info, id):
+        model = self._data["models"].get(id)
+        return _Model(model) if model else None
+
+    def models(self, info, limit=None, cursor=None, filter=None):
+        models = list(self._data["models"].values())
+        filter = filter or {}
+        if filter.get("search"):
+            models = [m for m in models if filter["search"].lower() in m["name"].lower()]
+        if filter.get("onlyWithVersions"):
+            models = [m for m in models if m["versions"]]
+        page = _page(models, limit, cursor)
+        page["items"] = [_Model(m) for m in page["items"]]
+        return page
+
+    def version(self, info, id):
+        return self._data["versions"].get(id)
+
+    def object(self, info, id):
+        text = self._data["objects"].get(id)
+        if text is None:
+            return None
+        data = json.loads(text)
+        return {"id": id, "speckleType": data.get("speckle_type"), "data": data}
+
+
+class _Mutations:
+    def __init__(self, server: "MockSpeckleServer"):
+        self._server = server
+
+    def create(self, info, input):
+        if info.parent_type.name == "ModelMutations":
+            model_id = self._server.add_model(input["projectId"], input["name"], input.get("description"))
+            return _Model(self._server.project(input["projectId"])["models"][model_id])
+        return self._server.add_version(input["projectId"], input["modelId"], input["objectId"],
+                                        input.get("message"), input.get("sourceApplication"))
+
+
+class _Root:
+    def __init__(self, server: "MockSpeckleServer"):
+        self._server = server
+        self.activeUser = USER
+        self.serverInfo = {"name": "Mock Speckle", "version": "2.x-mock"}
+        self.modelMutations = self.versionMutations = _Mutations(server)
+
+    def project(self, info, id):
+        return _Project(self._server, id)
+
+# -----------------------
+# Websocket (RFC 6455, just what graphql-ws needs)
+# -----------------------
+
+class _WebSocket:
+    def __init__(self, conn: socket.socket, rfile, wfile):
+        self.conn, self.rfile, self.wfile = conn, rfile, wfile
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def send(self, message: dict) -> None:
+        data = json.dumps(message).encode()
+        n = len(data)
+        header = bytes([0x81, n]) if n < 126 else (
+            struct.pack("!BBH", 0x81, 126, n) if n < 65536 else struct.pack("!BBQ", 0x81, 127, n))
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                self.wfile.write(header + data)
+                self.wfile.flush()
+            except OSError:
+                self.closed = True
+
+    def close(self) -> None:
+        """Close frame, then drop the TCP connection."""
+        try:
+            self._control(8)
+        except OSError:
+            pass
+        self.closed = True
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _control(self, opcode: int, payload: bytes = b"") -> None:
+        with self._lock:
+            if not self.closed:
+                self.wfile.write(bytes([0x80 | opcode, len(payload)]) + payload)
+                self.wfile.flush()
+
+    def receive(self) -> Optional[dict]:
+        """Next text message, or None once the client has closed."""
+        while True:
+            head = self.rfile.read(2)
+            if len(head) < 2:
+                return None
+            opcode, n = head[0] & 0x0F, head[1] & 0x7F
+            if n == 126:
+                n = struct.unpack("!H", self.rfile.read(2))[0]
+            elif n == 127:
+                n = struct.unpack("!Q", self.rfile.read(8))[0]
+            mask = self.rfile.read(4) if head[1] & 0x80 else b"\0\0\0\0"
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self.rfile.read(n)))
+            if opcode == 8:
+                self._control(8)
+                return None
+            if opcode == 9:
+                self._control(10, payload)
+            elif opcode in (1, 2):
+                return json.loads(payload)
+
+# -----------------------
+# HTTP
+# -----------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockSpeckle/1.0"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    @property
+    def mock(self) -> "MockSpeckleServer":
+        return self.server.mock
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _reply(self, status: int, body=b"", content_type: str = "application/json") -> None:
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str) -> None:
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        route = f"{method} /{'/'.join(parts[:2] if parts[0] == 'api' else parts[:1])}"
+        self.mock.requests[route] += 1
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        if parts[0] == "graphql":
+            if method == "GET" and self.headers.get("Upgrade", "").lower() == "websocket":
+                return self._websocket()
+            return self._graphql()
+        if parts[:2] == ["api", "getobjects"] and method == "POST":
+            ids = json.loads(parse_qs(self._body().decode())["objects"][0])
+            objects = self.mock.project(parts[2])["objects"]
+            return self._reply(200, "".join(f"{i}\t{objects[i]}\n" for i in ids if i in objects), "text/plain")
+        if parts[:2] == ["api", "diff"] and method == "POST":
+            ids = json.loads(parse_qs(self._body().decode())["objects"][0])
+            objects = self.mock.project(parts[2])["objects"]
+            return self._reply(200, {i: i in objects for i in ids})
+        if parts[0] == "objects" and method == "POST" and len(parts) == 2:
+            return self._upload(parts[1])
+        if parts[0] == "objects" and method == "GET" and len(parts) >= 3:
+            return self._download(parts[1], parts[2], single=parts[3:] == ["single"])
+        self._reply(404, {"error": f"no route for {method} {self.path}"})
+
+    def do_GET(self) -> None:
+        self._route("GET")
+
+    def do_POST(self) -> None:
+        self._route("POST")
+
+    # -- REST --
+
+    def _download(self, project_id: str, obj_id: str, single: bool) -> None:
+        objects = self.mock.project(project_id)["objects"]
+        root = objects.get(obj_id)
+        if root is None:
+            return self._reply(404, {"error": f"object {obj_id} not found"})
+        if single:
+            return self._reply(200, root)
+        ids = [obj_id] + [i for i in (json.loads(root).get("__closure") or {}) if i in objects]
+        if "json" in (self.headers.get("Accept") or ""):
+            return self._reply(200, "[" + ",".join(objects[i] for i in ids) + "]")
+        self._reply(200, "".join(f"{i}\t{objects[i]}\n" for i in ids), "text/plain")
+
+    def _upload(self, project_id: str) -> None:
+        body = self._body()
+        msg = email.message_from_bytes(b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body)
+        count = 0
+        for part in msg.walk():
+            if part.is_multipart():
+                continue
+            data = part.get_payload(decode=True) or b""
+            if data[:2] == b"\x1f\x8b":
+                data = gzip.decompress(data)
+            for obj in json.loads(data):
+                self.mock.project(project_id)["objects"][obj["id"]] = json.dumps(obj)
+                count += 1
+        self.mock.uploaded += count
+        self._reply(201, b"", "text/plain")
+
+    # -- GraphQL --
+
+    def _graphql(self) -> None:
+        req = json.loads(self._body() or b"{}")
+        result = graphql_sync(SCHEMA, req.get("query", ""), root_value=_Root(self.mock),
+                              variable_values=req.get("variables"), operation_name=req.get("operationName"))
+        out = {"data": result.data}
+        if result.errors:
+            out["errors"] = [e.formatted for e in result.errors]
+        self._reply(200, out)
+
+    def _websocket(self) -> None:
+        offered = [p.strip() for p in (self.headers.get("Sec-WebSocket-Protocol") or "").split(",") if p.strip()]
+        protocol = "graphql-ws" if "graphql-ws" in offered or not offered else offered[0]
+        accept = base64.b64encode(hashlib.sha1((self.headers["Sec-WebSocket-Key"] + WS_GUID).encode()).digest())
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept.decode())
+        if offered:
+            self.send_header("Sec-WebSocket-Protocol", protocol)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        self.mock.serve_subscriptions(_WebSocket(self.connection, self.rfile, self.wfile), protocol)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+# -----------------------
+# Server
+# -----------------------
+
+class MockSpeckleServer:
+    """
+    Args:
+        host / port: where to listen (port 0 = any free port)
+        latency: seconds added to every request
+        keep_alive: seconds between websocket keep-alive messages
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 keep_alive: float = KEEP_ALIVE_S):
+        self.latency = latency
+        self.keep_alive = keep_alive
+        self.requests: Counter = Counter()
+        self.uploaded = 0
+        self.projects: Dict[str, dict] = {}
+        self._subs: Dict[str, list] = {}  # project id -> [(socket, operation id, protocol, document, variables)]
+        self._lock = threading.RLock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def ws_url(self) -> str:
+        return self.url.replace("http://", "ws://", 1) + "/graphql"
+
+    def start(self) -> "MockSpeckleServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-speckle", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.close_subscriptions()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockSpeckleServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # -- state --
+
+    def project(self, project_id: str) -> dict:
+        with self._lock:
+            if project_id not in self.projects:
+                self.projects[project_id] = {"name": f"Project {project_id}", "models": {}, "versions": {},
+                                             "objects": {}}
+            return self.projects[project_id]
+
+    def add_model(self, project_id: str, name: str, description: Optional[str] = None,
+                  model_id: Optional[str] = None) -> str:
+        with self._lock:
+            models = self.project(project_id)["models"]
+            for m in models.values():
+                if m["name"] == name:
+                    return m["id"]
+            model_id = model_id or uuid.uuid4().hex[:10]
+            models[model_id] = {"id": model_id, "name": name, "description": description, "versions": []}
+            return model_id
+
+    def add_version(self, project_id: str, model_id: str, object_id: str, message: Optional[str] = None,
+                    source_application: Optional[str] = None, version_id: Optional[str] = None) -> dict:
+        """Create a version (newest first in its model) and push it to the project's subscribers."""
+        with self._lock:
+            project = self.project(project_id)
+            if model_id not in project["models"]:
+                self.add_model(project_id, model_id, model_id=model_id)
+            version = {"id": version_id or uuid.uuid4().hex[:10], "message": message, "createdAt": _now(),
+                       "referencedObject": object_id, "sourceApplication": source_application,
+                       "authorUser": USER}
+            project["versions"][version["id"]] = version
+            project["models"][model_id]["versions"].insert(0, version)
+            subs = list(self._subs.get(project_id, ()))
+        event = {"projectVersionsUpdated": {"id": version["id"], "modelId": model_id, "type": "CREATED",
+                                            "version": version}}
+        for ws, op_id, protocol, document, variables in subs:
+            data = execute(SCHEMA, document, root_value=event, variable_values=variables).data
+            ws.send({"type": "data" if protocol == "graphql-ws" else "next", "id": op_id, "payload": {"data": data}})
+        return version
+
+    def seed_objects(self, project_id: str, objects: Dict[str, object]) -> None:
+        """Store server-format objects (dicts or JSON text) by id."""
+        store = self.project(project_id)["objects"]
+        for obj_id, obj in objects.items():
+            store[obj_id] = obj if isinstance(obj, str) else json.dumps(obj)
+
+    def seed_base(self, project_id: str, base) -> str:
+        """Serialize a specklepy Base the way a send would and store every object; returns the root id."""
+        from specklepy.serialization.base_object_serializer import BaseObjectSerializer
+        from specklepy.transports.memory import MemoryTransport
+
+        memory = MemoryTransport()
+        root_id, _ = BaseObjectSerializer(write_transports=[memory]).write_json(base)
+        self.seed_objects(project_id, memory.objects)
+        return root_id
+
+    def seed_json(self, project_id: str, data: dict) -> str:
+        """
+        Store a resolved JSON tree (e.g. a backup's object.data) as server objects:
+        every nested object with an id becomes its own object behind a reference
+        stub, with `__closure` depths filled in. Returns the root id.
+        """
+        objects: Dict[str, dict] = {}
+
+        def detach(value, closure: Dict[str, int], depth: int):
+            if isinstance(value, list):
+                if value and isinstance(value[0], (int, float)):
+                    return value
+                return [detach(v, closure, depth) for v in value]
+            if not isinstance(value, dict):
+                return value
+            if value.get("speckle_type") == "reference":
+                closure.setdefault(value["referencedId"], depth)
+                return value
+            if "id" in value and depth > 0:
+                store(value, closure, depth)
+                return {"speckle_type": "reference", "referencedId": value["id"], "__closure": None}
+            return {k: detach(v, closure, depth) for k, v in value.items()}
+
+        def store(obj: dict, parent_closure: Dict[str, int], depth: int) -> None:
+            parent_closure[obj["id"]] = min(parent_closure.get(obj["id"], depth), depth)
+            own: Dict[str, int] = {}
+            body = {k: detach(v, own, 1) for k, v in obj.items() if k != "__closure"}
+            body.setdefault("speckle_type", "Base")
+            if own:
+                body["__closure"] = own
+                body["totalChildrenCount"] = len(own)
+                for child, d in own.items():
+                    parent_closure.setdefault(child, depth + d)
+            objects[obj["id"]] = body
+
+        store(data, {}, 0)
+        self.seed_objects(project_id, objects)
+        return data["id"]
+
+    def seed_fixtures(self, root: str) -> List[dict]:
+        """
+        Load the fixtures shipped in the repository (object_data.json, model_objects.json,
+        speckle_backups/*.json) as projects, models and versions. Returns the versions.
+        """
+        versions = []
+        path = os.path.join(root, "object_data.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                doc = json.load(f)
+            self.seed_objects(doc["projectId"], {doc["objectId"]: doc["data"]})
+            versions.append(self.add_version(doc["projectId"], self.add_model(doc["projectId"], "object_data"),
+                                             doc["objectId"], "object_data.json"))
+        path = os.path.join(root, "model_objects.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                doc = json.load(f)
+            self.seed_objects(doc["project_id"], {o["id"]: o for o in doc["objects"]})
+            self.add_model(doc["project_id"], doc["model_id"], model_id=doc["model_id"])
+            versions.append(self.add_version(doc["project_id"], doc["model_id"], doc["objects"][0]["id"],
+                                             doc.get("version_message"), version_id=doc.get("version_id")))
+        backups = os.path.join(root, "speckle_backups")
+        for name in sorted(os.listdir(backups)) if os.path.isdir(backups) else []:
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(backups, name), encoding="utf-8") as f:
+                doc = json.load(f)
+            pid, mid = doc["projectId"], doc.get("modelId") or "backups"
+            root_id = self.seed_json(pid, doc["object"]["data"])
+            self.add_model(pid, mid, model_id=mid)
+            versions.append(self.add_version(pid, mid, root_id, doc.get("commitMessage") or name))
+        return versions
+
+    # -- subscriptions --
+
+    def serve_subscriptions(self, ws: _WebSocket, protocol: str) -> None:
+        """Run one websocket connection until the client goes away."""
+        def keep_alive() -> None:
+            while not ws.closed:
+                ws.send({"type": "ka"} if protocol == "graphql-ws" else {"type": "ping"})
+                time.sleep(self.keep_alive)
+
+        try:
+            while True:
+                msg = ws.receive()
+                if msg is None:
+                    break
+                kind = msg.get("type")
+                if kind == "connection_init":
+                    ws.send({"type": "connection_ack"})
+                    threading.Thread(target=keep_alive, daemon=True).start()
+                elif kind in ("start", "subscribe"):
+                    payload = msg.get("payload") or {}
+                    variables = payload.get("variables") or {}
+                    document = parse(payload.get("query", ""))
+                    project_id = variables.get("projectId") or variables.get("id")
+                    with self._lock:
+                        self._subs.setdefault(project_id, []).append((ws, msg["id"], protocol, document, variables))
+                elif kind in ("stop", "complete"):
+                    self._unsubscribe(ws, msg.get("id"))
+                elif kind == "ping":
+                    ws.send({"type": "pong"})
+                elif kind == "connection_terminate":
+                    break
+        except (OSError, ValueError, struct.error):
+            pass
+        finally:
+            ws.closed = True
+            self._unsubscribe(ws, None)
+
+    def _unsubscribe(self, ws: _WebSocket, op_id: Optional[str]) -> None:
+        with self._lock:
+            for pid, subs in self._subs.items():
+                self._subs[pid] = [s for s in subs if not (s[0] is ws and (op_id is None or s[1] == op_id))]
+
+    def close_subscriptions(self) -> None:
+        """Drop every websocket (a listener should reconnect and catch up)."""
+        with self._lock:
+            sockets = {id(s[0]): s[0] for subs in self._subs.values() for s in subs}
+        for ws in sockets.values():
+            ws.close()
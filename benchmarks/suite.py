@@ -0,0 +1,387 @@
+"""
+Offline benchmark suite: the script workflows against a local mock Speckle server
+
+Runs without app.speckle.systems or a token (benchmarks.mock_server stands in
+for GraphQL, subscriptions and the object API), seeded with the repository's
+fixtures and a synthetic tower, and times
+
+  transform.*     build_tower: copy-on-write modules + batched transforms (3, 8)
+  send.*          duplicate.send through a ServerTransport, chunked upload() (3, 8)
+  receive.*       specklepy operations.receive, batched REST resolve (3, 5)
+  export.*        object.data + resolve + json.dump, streamed jsonl export (5)
+  incremental.*   tag every module, then again after a one-module edit (7);
+                  the derived root id is checked against specklepy's own serializer
+  subscription.*  version created -> backup on disk, live through the listener (6, 7)
+  fixtures.*      object.data + resolve of every fixture version
+
+Each benchmark runs `--repeat` times; the median, min, max and a few counters
+(objects, MB, requests) go to a JSON file that `--compare` diffs against another.
+
+    python -m benchmarks.suite                                # -> benchmarks/results/<time>_<commit>.json
+    python -m benchmarks.suite --modules 200 --latency-ms 20 --only send,receive
+    python -m benchmarks.suite --compare old.json new.json    # exit 1 on a regression
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from specklepy.api import operations
+from specklepy.logging import metrics
+from specklepy.objects.base import Base
+from specklepy.objects.geometry.mesh import Mesh
+from specklepy.serialization.base_object_serializer import BaseObjectSerializer
+from specklepy.transports.memory import MemoryTransport
+from specklepy.transports.server import ServerTransport
+
+from benchmarks.mock_server import MockSpeckleServer
+from speckle_tools.backup import BackupPipeline, make_writer
+from speckle_tools.client import SpeckleSession
+from speckle_tools.incremental import IncrementalProcessor, tag_properties
+from speckle_tools.duplicate import send as send_shared
+from speckle_tools.formats import JsonlWriter
+from speckle_tools.listener import Checkpoint, VersionListener
+from speckle_tools.metrics import METRICS
+from speckle_tools.queries import Q_OBJECT_DATA
+from speckle_tools.resolve import resolve_object
+from speckle_tools.stream import server_records
+from speckle_tools.tower import build_tower, stack_rule
+from speckle_tools.upload import upload
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+PROJECT = "bench-project"
+TOKEN = "mock-token"
+DEFAULT_THRESHOLD = 0.10
+
+# -----------------------
+# Fixtures
+# -----------------------
+
+def make_module(vertices: int) -> Base:
+    """One BrepX-like element: a wavy grid mesh with about `vertices` vertices, in mm."""
+    side = max(2, int(vertices ** 0.5))
+    xs, ys = np.meshgrid(np.linspace(0, 10000, side), np.linspace(0, 10000, side))
+    v = np.stack([xs, ys, 500 * np.sin(xs / 900) * np.cos(ys / 700)], axis=-1).reshape(-1, 3)
+    i = np.arange(side - 1)[:, None] * side + np.arange(side - 1)[None, :]
+    quads = np.stack([i, i + 1, i + side + 1, i + side], axis=-1).reshape(-1, 4)
+    faces = np.hstack([np.full((len(quads), 1), 4), quads]).ravel()
+    element = Base()
+    element.displayValue = [Mesh(vertices=v.ravel().tolist(), faces=faces.tolist(), units="mm")]
+    element.units = "mm"
+    element.properties = {"Designer": "Benchmark"}
+    return element
+
+
+def make_tower(modules: int, vertices: int) -> Base:
+    return build_tower(make_module(vertices), modules, stack_rule(16000, 3.0), [{"Collection": "Modules"}],
+                       tower_tag="bench", units="mm")
+
+
+def tag_modules(tower: Base, rows: List[dict]) -> Base:
+    """What speckle_tools.incremental.tag_properties does, done on the Base objects."""
+    for collection in tower.elements:
+        for module in collection.elements:
+            for key, value in rows[(int(module.Module) - 1) % len(rows)].items():
+                setattr(module, key, value)
+                module.properties[key] = value
+    return tower
+
+
+def specklepy_id(base: Base) -> str:
+    return BaseObjectSerializer(write_transports=[MemoryTransport()]).write_json(base)[0]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                             text=True, timeout=10)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                               capture_output=True, text=True, timeout=30)
+        return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "") if out.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+# -----------------------
+# Runner
+# -----------------------
+
+class Suite:
+    def __init__(self, server: MockSpeckleServer, args):
+        self.server = server
+        self.args = args
+        self.session = SpeckleSession(server.url, TOKEN)
+        self.results: Dict[str, dict] = {}
+        self.tmp = tempfile.mkdtemp(prefix="speckle-bench-")
+        self._runs = 0
+
+    def selected(self, name: str) -> bool:
+        only = self.args.only
+        return not only or any(name.startswith(prefix) for prefix in only)
+
+    def bench(self, name: str, fn: Callable[[], Optional[dict]], repeat: Optional[int] = None) -> None:
+        """Time `fn` (returning extra metrics or None) `repeat` times."""
+        if not self.selected(name):
+            return
+        runs, extra = [], {}
+        for _ in range(repeat or self.args.repeat):
+            before = sum(self.server.requests.values())
+            t = time.perf_counter()
+            extra = fn() or {}
+            runs.append(time.perf_counter() - t)
+            extra["requests"] = sum(self.server.requests.values()) - before
+        self.results[name] = {"seconds": statistics.median(runs), "min": min(runs), "max": max(runs),
+                              "runs": runs, **extra}
+        print(f"  {name:<28} {statistics.median(runs) * 1000:10.1f} ms   "
+              + "  ".join(f"{k} {v:,.3g}" if isinstance(v, float) else f"{k} {v:,}" for k, v in extra.items()))
+
+    def fresh_project(self) -> str:
+        """A new empty project id, so sends can't skip objects uploaded by an earlier run."""
+        self._runs += 1
+        return f"{PROJECT}-{self._runs}"
+
+    # -- benchmarks --
+
+    def run(self) -> Dict[str, dict]:
+        a = self.args
+        print(f"🏗 Tower: {a.modules} modules x ~{a.vertices:,} vertices")
+        tower = make_tower(a.modules, a.vertices)
+        template = make_module(a.vertices)
+
+        self.bench("transform.build_tower",
+                   lambda: build_tower(template, a.modules, stack_rule(16000, 3.0), tower_tag="bench", units="mm")
+                   and None)
+
+        def send_transport():
+            pid = self.fresh_project()
+            send_shared(tower, transports=[ServerTransport(stream_id=pid, token=TOKEN, url=self.server.url)],
+                        use_default_cache=False)
+            return {"objects": len(self.server.project(pid)["objects"])}
+
+        def send_chunked():
+            pid = self.fresh_project()
+            upload(tower, self.session, pid, journal_dir=None, report_every=None, use_default_cache=False)
+            return {"objects": len(self.server.project(pid)["objects"])}
+
+        self.bench("send.server_transport", send_transport)
+        self.bench("send.chunked_upload", send_chunked)
+
+        # receive / export read the tower back from one seeded project
+        root_id = self.server.seed_base(PROJECT, tower)
+        objects = self.server.project(PROJECT)["objects"]
+        size_mb = sum(len(t) for t in objects.values()) / 1e6
+
+        def receive_specklepy():
+            transport = ServerTransport(stream_id=PROJECT, token=TOKEN, url=self.server.url)
+            operations.receive(root_id, remote_transport=transport, local_transport=MemoryTransport())
+            return {"objects": len(objects), "mb": size_mb}
+
+        def receive_resolve():
+            data = self.session.execute(Q_OBJECT_DATA, projectId=PROJECT, objectId=root_id)["project"]["object"]["data"]
+            resolve_object(self.server.url, PROJECT, TOKEN, data)
+            return {"objects": len(objects), "mb": size_mb}
+
+        self.bench("receive.specklepy", receive_specklepy)
+        self.bench("receive.resolve", receive_resolve)
+
+        def export_json():
+            data = self.session.execute(Q_OBJECT_DATA, projectId=PROJECT, objectId=root_id)["project"]["object"]["data"]
+            data = resolve_object(self.server.url, PROJECT, TOKEN, data)
+            path = os.path.join(self.tmp, "object_data_resolved.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"projectId": PROJECT, "objectId": root_id, "data": data}, f, indent=2, default=str)
+            return {"mb_written": os.path.getsize(path) / 1e6}
+
+        def export_stream():
+            path = os.path.join(self.tmp, "object_data.jsonl.gz")
+            with JsonlWriter(path) as w:
+                for rec in server_records(self.session, PROJECT, root_id, {"objectId": root_id}):
+                    w.write(rec)
+            return {"mb_written": os.path.getsize(path) / 1e6}
+
+        self.bench("export.json", export_json)
+        self.bench("export.stream_jsonl", export_stream)
+
+        if self.selected("incremental"):
+            rows = [{"Designer": "Bench A"}, {"Designer": "Bench B"}]
+            process = tag_properties(rows)
+            before = IncrementalProcessor(self.session, PROJECT, process)
+            derived = before.run(root_id, upload=False).root_id
+            expected = specklepy_id(tag_modules(make_tower(a.modules, a.vertices), rows))
+            if derived != expected:
+                print(f"  ⚠ incremental root {derived} != specklepy {expected}")
+            tower.elements[0].elements[0].Note = "bench edit"
+            edited_id = self.server.seed_base(PROJECT, tower)
+            del tower.elements[0].elements[0].Note
+
+            def incremental_first():
+                res = IncrementalProcessor(self.session, PROJECT, process).run(root_id, upload=False)
+                return {"processed": res.processed, "fetched": res.fetched}
+
+            def incremental_edit():
+                proc = IncrementalProcessor(self.session, PROJECT, process)
+                proc.state.mapping, proc.state.patches = dict(before.state.mapping), dict(before.state.patches)
+                res = proc.run(edited_id, upload=False)
+                return {"processed": res.processed, "reused": res.reused, "fetched": res.fetched}
+
+            self.bench("incremental.first_run", incremental_first)
+            self.bench("incremental.one_module_edit", incremental_edit)
+
+        if self.selected("subscription"):
+            self.subscription(root_id, resolve=False)
+            self.subscription(root_id, resolve=True)
+
+        if self.selected("fixtures"):
+            versions = self.server.seed_fixtures(REPO_ROOT)
+
+            def fixtures():
+                for ver in versions:
+                    pid = next(p for p, d in self.server.projects.items() if ver["id"] in d["versions"])
+                    data = self.session.execute(Q_OBJECT_DATA, projectId=pid,
+                                                objectId=ver["referencedObject"])["project"]["object"]["data"]
+                    resolve_object(self.server.url, pid, TOKEN, data)
+                return {"versions": len(versions)}
+
+            self.bench("fixtures.export", fixtures)
+        return self.results
+
+    def subscription(self, root_id: str, resolve: bool) -> None:
+        """Latency from version.create on the server to the backup being written, live events only."""
+        name = "subscription.backup" + ("_resolved" if resolve else "")
+        if not self.selected(name):
+            return
+        # a project of its own: the listener's catch-up overlap would replay versions of an earlier run
+        pid = self.fresh_project()
+        self.server.project(pid)["objects"].update(self.server.project(PROJECT)["objects"])
+        model_id = self.server.add_model(pid, "tower")
+        count = self.args.events
+        created: Dict[str, float] = {}
+        latencies: List[float] = []
+
+        async def main() -> float:
+            done = asyncio.Event()
+            listener: Optional[VersionListener] = None
+
+            def written(evt: dict) -> None:
+                listener.done(evt)
+                latencies.append(time.perf_counter() - created[evt["version"]["id"]])
+                if len(latencies) == count:
+                    done.set()
+
+            pipeline = BackupPipeline(pid, f"{self.server.url}/graphql", TOKEN,
+                                      make_writer(os.path.join(self.tmp, "backups"), "json"),
+                                      resolve_children=resolve, on_written=written)
+            listener = VersionListener(pid, self.server.ws_url, TOKEN, pipeline.submit, checkpoint=Checkpoint())
+            await pipeline.start()
+            task = asyncio.create_task(listener.run())
+            while not listener.connected:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)  # subscription registered
+            t = time.perf_counter()
+            for i in range(count):
+                sent = time.perf_counter()
+                ver = await asyncio.to_thread(self.server.add_version, pid, model_id, root_id, f"bench {i}")
+                created[ver["id"]] = sent
+                await asyncio.sleep(self.args.event_gap_ms / 1000)
+            await asyncio.wait_for(done.wait(), timeout=120)
+            total = time.perf_counter() - t
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await pipeline.stop(drain=False)
+            return total
+
+        total = asyncio.run(main())
+        lat = sorted(latencies)
+        self.results[name] = {"seconds": statistics.median(lat), "min": lat[0], "max": lat[-1], "runs": lat,
+                              "p95": lat[min(len(lat) - 1, int(0.95 * len(lat)))], "events": count,
+                              "events_per_s": count / total}
+        print(f"  {name:<28} {statistics.median(lat) * 1000:10.1f} ms   p95 {self.results[name]['p95'] * 1000:.1f} ms"
+              f"  {count / total:.1f} events/s")
+
+# -----------------------
+# Compare
+# -----------------------
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Print new vs base per benchmark; returns the number of regressions beyond `threshold`."""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"base {base['meta'].get('commit')} ({base['meta'].get('created')})  ->  "
+          f"new {new['meta'].get('commit')} ({new['meta'].get('created')})")
+    if base["meta"].get("params") != new["meta"].get("params"):
+        print(f"⚠ different parameters: {base['meta'].get('params')} vs {new['meta'].get('params')}")
+    regressions = 0
+    for name in sorted(set(base["benchmarks"]) | set(new["benchmarks"])):
+        b, n = base["benchmarks"].get(name), new["benchmarks"].get(name)
+        if b is None or n is None:
+            print(f"  {name:<28} {'only in ' + ('new' if b is None else 'base'):>30}")
+            continue
+        ratio = n["seconds"] / b["seconds"] if b["seconds"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, regressions = "❌ slower", regressions + 1
+        elif ratio < 1 - threshold:
+            flag = "✅ faster"
+        print(f"  {name:<28} {b['seconds'] * 1000:10.1f} ms -> {n['seconds'] * 1000:10.1f} ms  {ratio:5.2f}x  {flag}")
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+# -----------------------
+# Main
+# -----------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a mock Speckle server")
+    parser.add_argument("--modules", type=int, default=50, help="modules in the synthetic tower")
+    parser.add_argument("--vertices", type=int, default=5000, help="vertices per module mesh")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (the median is kept)")
+    parser.add_argument("--events", type=int, default=20, help="versions pushed in the subscription benchmark")
+    parser.add_argument("--event-gap-ms", type=float, default=20.0, help="pause between pushed versions")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay the mock adds to every request")
+    parser.add_argument("--only", type=lambda s: [p for p in s.split(",") if p],
+                        help="comma-separated name prefixes, e.g. send,receive.resolve")
+    parser.add_argument("--output", help=f"results file (default: {os.path.relpath(RESULTS_DIR, REPO_ROOT)}/<time>_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, threshold=args.threshold) else 0)
+
+    metrics.disable()  # no analytics calls from specklepy while offline
+    commit = git_commit()
+    params = {k: getattr(args, k) for k in ("modules", "vertices", "repeat", "events", "event_gap_ms", "latency_ms")}
+    with MockSpeckleServer(latency=args.latency_ms / 1000) as server:
+        print(f"🧪 Mock Speckle server on {server.url}")
+        results = Suite(server, args).run()
+        routes = dict(server.requests)
+
+    created = datetime.now(timezone.utc)
+    out = args.output or os.path.join(RESULTS_DIR, f"{created:%Y-%m-%d_%H-%M-%S}_{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    doc = {
+        "meta": {"commit": commit, "created": created.isoformat(), "python": platform.python_version(),
+                 "platform": platform.platform(), "numpy": np.__version__, "params": params, "requests": routes},
+        "benchmarks": results,
+        "metrics": METRICS.snapshot(),  # stage timings, bytes, ... summed over every run
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    print(f"💾 Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the Team 01.1 Speckle scripts.
+
+The numbered scripts in the repository root are the entry points; the modules
+in this package hold the reusable pieces they import.
+"""
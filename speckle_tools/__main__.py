@@ -0,0 +1,7 @@
+"""`python -m speckle_tools ...`: the speckle-tools command (speckle_tools.cli) without installing."""
+
+import sys
+
+from speckle_tools.cli import main
+
+sys.exit(main())
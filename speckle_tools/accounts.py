@@ -0,0 +1,108 @@
+"""
+Local account cache, so a script doesn't look its account up on every start
+
+    server_url, token, account = default_account()   # cached dict, no specklepy import
+    account = cached_account(server_url, token)      # user + server info of a token seen before
+    save_account(client.account)                     # after authenticating
+
+get_default_account() imports specklepy and reads its accounts database, and
+authenticating with a bare token costs two GraphQL round trips (active user +
+server info). Both results are kept in .speckle_cache/accounts.json for
+ACCOUNT_TTL_S seconds (SPECKLE_ACCOUNT_TTL overrides it, 0 = no caching).
+The file holds tokens, so it is created readable by its owner only.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Optional, Tuple
+
+from speckle_tools.store import _atomic_write
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".speckle_cache")
+ACCOUNTS_FILENAME = "accounts.json"
+ACCOUNT_TTL_S = 24 * 3600
+
+
+def _ttl() -> float:
+    try:
+        return float(os.environ.get("SPECKLE_ACCOUNT_TTL", ACCOUNT_TTL_S))
+    except ValueError:
+        return ACCOUNT_TTL_S
+
+
+def _key(server_url: str, token: str) -> str:
+    """Tokens are never used as keys in the clear."""
+    return f"{server_url.rstrip('/')} {hashlib.sha256(token.encode()).hexdigest()[:16]}"
+
+
+def _path() -> str:
+    return os.path.join(os.environ.get("SPECKLE_TOOLS_CACHE", DEFAULT_CACHE_DIR), ACCOUNTS_FILENAME)
+
+
+def _load() -> dict:
+    try:
+        with open(_path(), encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _fresh(entry: Optional[dict]) -> bool:
+    return bool(entry) and time.time() - entry.get("cachedAt", 0) < _ttl()
+
+
+def _as_dict(account) -> dict:
+    return account if isinstance(account, dict) else account.model_dump(mode="json")
+
+
+def cached_account(server_url: str, token: str) -> Optional[dict]:
+    """The cached account (specklepy Account as a dict) for this server + token, if still fresh."""
+    entry = _load().get("accounts", {}).get(_key(server_url, token))
+    return entry["account"] if _fresh(entry) else None
+
+
+def save_account(account, default: bool = False) -> None:
+    """Remember `account` (specklepy Account or its dict); `default` marks it as the default account."""
+    if _ttl() <= 0:
+        return
+    account = _as_dict(account)
+    server_url, token = (account.get("serverInfo") or {}).get("url"), account.get("token")
+    if not server_url or not token:
+        return
+    data = _load()
+    key = _key(server_url, token)
+    data.setdefault("accounts", {})[key] = {"account": account, "cachedAt": time.time()}
+    if default:
+        data["default"] = key
+    try:
+        _atomic_write(_path(), json.dumps(data, indent=2))
+    except OSError as e:
+        print(f"⚠ Could not write the account cache: {e}")
+
+
+def default_account() -> Tuple[str, str, dict]:
+    """(server_url, token, account dict) of the local default account, from the cache while it is fresh."""
+    data = _load()
+    entry = data.get("accounts", {}).get(data.get("default"))
+    if _fresh(entry):
+        account = entry["account"]
+    else:
+        from specklepy.api.credentials import get_default_account
+
+        account = get_default_account()
+        if account is None:
+            raise RuntimeError("No local Speckle account: add one in Speckle Manager or set SPECKLE_TOKEN")
+        account = _as_dict(account)
+        save_account(account, default=True)
+    return account["serverInfo"]["url"].rstrip("/"), account["token"], account
+
+
+def clear() -> None:
+    """Forget every cached account."""
+    try:
+        os.remove(_path())
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,339 @@
+"""
+Pipelined backup worker for the projectVersionsUpdated listener
+
+    subscription --> submit() --> [job queue] --> N fetch workers --> [write queue] --> writer
+
+- `submit` never waits on HTTP: it dedupes the versionId (against versions
+  queued, in flight or written; a failed or dropped one is accepted again, e.g.
+  from the listener's catch-up) and enqueues the event
+- fetch workers resolve referencedObject and object.data over one pooled
+  AsyncSpeckleSession (speckle_tools.client)
+  (optionally also every child in the closure, see speckle_tools.resolve,
+  optionally projected, e.g. metadata only, see speckle_tools.projection)
+- a single writer stage runs the (blocking) file write in a thread
+- every stage is timed; `report()` prints count / mean / p95 / max per stage,
+  and the same timings, event counts, queue depths, bytes written and the lag
+  from a version's createdAt to its backup on disk go to speckle_tools.metrics
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from speckle_tools.client import AsyncSpeckleSession
+from speckle_tools.formats import extension, write_backup
+from speckle_tools.metrics import METRICS
+from speckle_tools.projection import Projection
+from speckle_tools.queries import Q_OBJECT_DATA, Q_VERSION_REFERENCED_OBJECT
+from speckle_tools.resolve import DEFAULT_BATCH_SIZE, resolve_object_async
+
+# writer(payload, received_at) -> path written
+BackupWriter = Callable[[dict, datetime], str]
+
+# backup file names / manifests use Central European Time
+CET = timezone(timedelta(hours=1))
+
+
+class StageStats:
+    """Collects durations (seconds) per pipeline stage."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.samples.setdefault(stage, []).append(seconds)
+        METRICS.observe("backup_stage_seconds", seconds, stage=stage)
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for stage, values in self.samples.items():
+            ordered = sorted(values)
+            out[stage] = {
+                "count": len(values),
+                "mean_ms": 1000 * sum(values) / len(values),
+                "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                "max_ms": 1000 * ordered[-1],
+            }
+        return out
+
+
+def build_backup_payload(project_id: str, evt: dict, version_info: dict, obj: dict,
+                         received_at: datetime, projection: Optional[Projection] = None) -> dict:
+    ver_meta = evt.get("version") or {}
+    author = version_info.get("authorUser") or {}
+    return {
+        "projectId": project_id,
+        "modelId": evt.get("modelId"),
+        "versionId": ver_meta.get("id"),
+        "rootObjectId": version_info["referencedObject"],
+        "commitMessage": ver_meta.get("message"),
+        "createdAt": ver_meta.get("createdAt"),
+        "receivedAt": received_at.isoformat(),
+        "author": {
+            "id": author.get("id"),
+            "name": author.get("name"),
+        },
+        "object": {
+            "id": obj.get("id"),
+            "speckleType": obj.get("speckleType"),
+            "data": obj.get("data"),
+        },
+        # None = full object; otherwise which members were left out
+        "projection": projection.to_dict() if projection is not None else None,
+    }
+
+
+def _lag_seconds(created_at: Optional[str], now: datetime) -> Optional[float]:
+    """Seconds from a version's createdAt (ISO, as the server sends it) to `now`."""
+    if not created_at:
+        return None
+    try:
+        return (now - datetime.fromisoformat(created_at.replace("Z", "+00:00"))).total_seconds()
+    except ValueError:
+        return None
+
+
+def _safe_timestamp(dt: datetime) -> str:
+    """Filesystem-safe timestamp."""
+    return dt.strftime("%Y-%m-%d_%H-%M-%S")
+
+
+def make_writer(backup_dir: str, fmt: str = "store") -> BackupWriter:
+    """
+    Writer for `backup_dir`: "store" puts payloads into a deduplicated BackupStore
+    (whole objects only, see BackupPipeline's `projection`), any
+    speckle_tools.formats format writes one timestamped file per version.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    if fmt == "store":
+        from speckle_tools.store import BackupStore
+
+        store = BackupStore(backup_dir)
+
+        def write_store(payload: dict, received_at: datetime) -> str:
+            return store.put(payload, received_at.astimezone(CET))
+
+        write_store.deduplicated = True
+        return write_store
+
+    ext = extension(fmt)  # fail fast on a typo
+
+    def write_file(payload: dict, received_at: datetime) -> str:
+        stamp = _safe_timestamp(received_at.astimezone(CET))
+        filepath = os.path.join(backup_dir, f"{stamp}{ext}")
+        if os.path.exists(filepath):
+            # several versions can land in the same second now that backups run concurrently
+            filepath = os.path.join(backup_dir, f"{stamp}_{payload.get('versionId')}{ext}")
+        return write_backup(payload, filepath, fmt)
+
+    return write_file
+
+
+class BackupPipeline:
+    """
+    Args:
+        project_id: Speckle project the events belong to (events carrying their own
+            "projectId", as VersionListener's do, override it)
+        graphql_url: HTTP GraphQL endpoint, e.g. https://app.speckle.systems/graphql
+        token: personal access token
+        writer: blocking function that persists one payload, run in a thread
+        fetch_workers: concurrent HTTP workers
+        queue_size: max pending events before backpressure kicks in
+        on_full: "wait" (slow the intake down) or "drop_oldest"
+        dedupe_size: how many recent versionIds (queued, in flight or written) to remember
+        report_every: seconds between stats printouts (0 = only on stop)
+        resolve_children: also download the closure and replace reference stubs
+        children_concurrency: object download requests in flight per backup
+        on_written: called with the event once its backup is on disk (e.g. VersionListener.done)
+        projection: keep only part of every object, e.g. "metadata" (no displayValue /
+            mesh buffers, which are then never downloaded); see speckle_tools.projection.
+            Not with the deduplicated store, which keeps objects by content id
+    """
+
+    def __init__(self, project_id: Optional[str], graphql_url: str, token: str, writer: BackupWriter,
+                 fetch_workers: int = 4, queue_size: int = 64, on_full: str = "wait",
+                 dedupe_size: int = 10_000, report_every: float = 0.0,
+                 resolve_children: bool = False, children_concurrency: int = 4,
+                 on_written: Optional[Callable[[dict], None]] = None, projection=None):
+        if on_full not in ("wait", "drop_oldest"):
+            raise ValueError(f"on_full must be 'wait' or 'drop_oldest', got {on_full!r}")
+        self.project_id = project_id
+        self.graphql_url = graphql_url
+        self.token = token
+        self.writer = writer
+        self.fetch_workers = fetch_workers
+        self.on_full = on_full
+        self.dedupe_size = dedupe_size
+        self.report_every = report_every
+        self.resolve_children = resolve_children
+        self.children_concurrency = children_concurrency
+        self.on_written = on_written
+        self.projection = Projection.parse(projection)
+        if self.projection is not None and getattr(writer, "deduplicated", False):
+            raise ValueError("A projection can't be combined with the deduplicated store (stripped objects "
+                             "would replace whole ones); pick a file format such as jsonl.zst")
+        self.server_url = graphql_url.rsplit("/graphql", 1)[0]
+
+        self.jobs: asyncio.Queue = asyncio.Queue(queue_size)
+        self.writes: asyncio.Queue = asyncio.Queue(max(1, fetch_workers * 2))
+        self.stats = StageStats()
+        self.counts = {"received": 0, "duplicates": 0, "dropped": 0, "written": 0, "failed": 0}
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+        self._session: Optional[AsyncSpeckleSession] = None
+        self._label = project_id or "*"  # metric label; "*" = events carry their own project
+
+    def _count(self, key: str) -> None:
+        self.counts[key] += 1
+        METRICS.inc("backup_events_total", result=key, project=self._label)
+
+    # -- lifecycle --
+
+    async def start(self) -> None:
+        self._session = await AsyncSpeckleSession(
+            self.server_url, self.token, max_connections=self.fetch_workers * max(1, self.children_concurrency),
+        ).start()
+
+        self._tasks = [asyncio.create_task(self._fetch_worker(i)) for i in range(self.fetch_workers)]
+        self._tasks.append(asyncio.create_task(self._write_worker()))
+        METRICS.gauge("backup_queue_depth", self.jobs.qsize, queue="jobs", project=self._label)
+        METRICS.gauge("backup_queue_depth", self.writes.qsize, queue="writes", project=self._label)
+        if self.report_every:
+            self._tasks.append(asyncio.create_task(self._report_loop()))
+
+    async def stop(self, drain: bool = True) -> None:
+        """Finish queued work (if `drain`), then shut the workers and HTTP client down."""
+        if drain:
+            await self.jobs.join()
+            await self.writes.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in ("jobs", "writes"):
+            METRICS.remove("backup_queue_depth", queue=queue, project=self._label)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.report()
+
+    # -- intake --
+
+    async def submit(self, evt: dict, received_at: Optional[datetime] = None) -> bool:
+        """Queue one projectVersionsUpdated payload. Returns False if it was a duplicate."""
+        self._count("received")
+        version_id = (evt.get("version") or {}).get("id")
+        if not version_id:
+            return False
+        if version_id in self._seen:
+            self._count("duplicates")
+            return False
+        self._seen[version_id] = None
+        if len(self._seen) > self.dedupe_size:
+            self._seen.popitem(last=False)
+
+        job = {"evt": evt, "received_at": received_at or datetime.now(timezone.utc), "t0": time.perf_counter()}
+        if self.on_full == "drop_oldest" and self.jobs.full():
+            dropped = self.jobs.get_nowait()
+            self.jobs.task_done()
+            self._count("dropped")
+            dropped_id = (dropped["evt"].get("version") or {}).get("id")
+            self._forget(dropped_id)
+            print(f"⚠ Queue full, dropped version {dropped_id}")
+        await self.jobs.put(job)
+        return True
+
+    def _forget(self, version_id: Optional[str]) -> None:
+        """Accept `version_id` again: it was dropped or failed, so a replay should retry it."""
+        self._seen.pop(version_id, None)
+
+    # -- stages --
+
+    async def _fetch_worker(self, n: int) -> None:
+        while True:
+            job = await self.jobs.get()
+            version_id = job["evt"]["version"]["id"]
+            project_id = job["evt"].get("projectId") or self.project_id
+            try:
+                t = time.perf_counter()
+                self.stats.record("queue_wait", t - job["t0"])
+
+                res = await self._session.execute(
+                    Q_VERSION_REFERENCED_OBJECT, projectId=project_id, versionId=version_id,
+                )
+                version_info = res["project"]["version"]
+                if not version_info or not version_info.get("referencedObject"):
+                    raise RuntimeError(f"Could not resolve referencedObject for version {version_id}")
+                self.stats.record("version_query", time.perf_counter() - t)
+
+                t = time.perf_counter()
+                res = await self._session.execute(
+                    Q_OBJECT_DATA, projectId=project_id, objectId=version_info["referencedObject"],
+                )
+                obj = res["project"]["object"]
+                if not obj or "data" not in obj:
+                    raise RuntimeError(f"Could not fetch object.data for object {version_info['referencedObject']}")
+                self.stats.record("object_fetch", time.perf_counter() - t)
+
+                if self.resolve_children:
+                    t = time.perf_counter()
+                    obj = dict(obj, data=await resolve_object_async(
+                        self._session.http, self.server_url, project_id, obj["data"],
+                        DEFAULT_BATCH_SIZE, self.children_concurrency, self.projection,
+                    ))
+                    self.stats.record("children_fetch", time.perf_counter() - t)
+                elif self.projection is not None:
+                    obj = dict(obj, data=self.projection.apply(obj["data"]))
+
+                job["payload"] = build_backup_payload(project_id, job["evt"], version_info, obj,
+                                                      job["received_at"], self.projection)
+                await self.writes.put(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._count("failed")
+                self._forget(version_id)
+                print(f"❌ Backup failed for version {version_id}: {e}")
+            finally:
+                self.jobs.task_done()
+
+    async def _write_worker(self) -> None:
+        while True:
+            job = await self.writes.get()
+            try:
+                t = time.perf_counter()
+                outpath = await asyncio.to_thread(self.writer, job["payload"], job["received_at"])
+                now = time.perf_counter()
+                self.stats.record("write", now - t)
+                self.stats.record("end_to_end", now - job["t0"])
+                METRICS.inc("backup_written_bytes_total", os.path.getsize(outpath), project=self._label)
+                lag = _lag_seconds((job["evt"].get("version") or {}).get("createdAt"), datetime.now(timezone.utc))
+                if lag is not None:
+                    METRICS.observe("backup_lag_seconds", lag, project=self._label)
+                self._count("written")
+                print(f"✅ Backup written: {outpath} ({1000 * (now - job['t0']):.0f} ms)")
+                if self.on_written is not None:
+                    self.on_written(job["evt"])
+            except Exception as e:
+                self._count("failed")
+                self._forget(job["evt"]["version"]["id"])
+                print(f"❌ Backup write failed for version {job['evt']['version']['id']}: {e}")
+            finally:
+                job.pop("payload", None)
+                self.writes.task_done()
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_every)
+            self.report()
+
+    def report(self) -> None:
+        c = self.counts
+        print(f"📊 received {c['received']} | written {c['written']} | failed {c['failed']} | "
+              f"duplicates {c['duplicates']} | dropped {c['dropped']} | queued {self.jobs.qsize()}")
+        for stage, s in self.stats.summary().items():
+            print(f"    {stage:<14} n={s['count']:<5} mean {s['mean_ms']:8.1f} ms  "
+                  f"p95 {s['p95_ms']:8.1f} ms  max {s['max_ms']:8.1f} ms")
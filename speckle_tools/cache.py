@@ -0,0 +1,205 @@
+"""
+Persistent, size-bounded object cache for receives
+
+Speckle object ids are content hashes, so a cached object never goes stale.
+`ObjectCache` is a SQLite transport keyed by object id with LRU eviction;
+`cached_receive` puts it in front of a ServerTransport so that only objects
+missing from the cache are downloaded (none at all when the version is unchanged).
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from specklepy.api import operations
+from specklepy.logging.exceptions import SpeckleException
+from specklepy.objects.base import Base
+from specklepy.transports.abstract_transport import AbstractTransport
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".speckle_cache")
+DEFAULT_MAX_SIZE_MB = 2048
+
+# sqlite's default limit on host parameters is 999
+_QUERY_CHUNK = 900
+
+
+class ObjectCache(AbstractTransport):
+    """
+    SQLite-backed transport with a byte budget.
+
+    Reads bump an object's last-access time; after each write batch the least
+    recently used objects are deleted until the cache fits in `max_size_mb`.
+    Objects touched during the current session are never evicted, so a
+    receive in progress can't lose its own children.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+                 max_batch_size_mb: float = 10.0, name: str = "ObjectCache") -> None:
+        super().__init__()
+        self._name = name
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "objects.db")
+        self.max_bytes = int(max_size_mb * 1000 * 1000)
+        self.max_batch = int(max_batch_size_mb * 1000 * 1000)
+        self.session_start = time.time()
+        self.hits = 0
+        self.misses = 0
+        self._batch: List[tuple] = []
+        self._batch_size = 0
+        self._touched: List[tuple] = []
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            with closing(self._conn.cursor()) as c:
+                c.execute("""CREATE TABLE IF NOT EXISTS objects(
+                               hash TEXT PRIMARY KEY,
+                               content TEXT,
+                               size INTEGER,
+                               last_access REAL
+                             ) WITHOUT ROWID;""")
+                c.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON objects(last_access);")
+                c.execute("PRAGMA journal_mode='wal';")
+                c.execute("PRAGMA synchronous=NORMAL;")
+            self._conn.commit()
+        except Exception as ex:
+            raise SpeckleException(f"ObjectCache could not open {self.path}") from ex
+
+    def __repr__(self) -> str:
+        return f"ObjectCache(path: '{self.path}', max_size_mb: {self.max_bytes / 1e6:g})"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    # -- writes --
+
+    def begin_write(self) -> None:
+        self.saved_obj_count = 0
+
+    def save_object(self, id: str, serialized_object: str) -> None:
+        size = len(serialized_object)
+        self._batch.append((id, serialized_object, size, time.time()))
+        self._batch_size += size
+        if self._batch_size >= self.max_batch:
+            self._flush_batch()
+
+    def save_object_from_transport(self, id: str, source_transport: AbstractTransport) -> None:
+        self.save_object(id, source_transport.get_object(id))
+
+    def end_write(self) -> None:
+        self._flush_batch()
+        self.evict()
+
+    def _flush_batch(self) -> None:
+        if not self._batch:
+            return
+        with closing(self._conn.cursor()) as c:
+            c.executemany(
+                "INSERT OR REPLACE INTO objects(hash, content, size, last_access) VALUES(?,?,?,?)",
+                self._batch,
+            )
+        self._conn.commit()
+        self._batch = []
+        self._batch_size = 0
+
+    # -- reads --
+
+    def get_object(self, id: str) -> Optional[str]:
+        with closing(self._conn.cursor()) as c:
+            row = c.execute("SELECT content FROM objects WHERE hash = ? LIMIT 1", (id,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched.append((time.time(), id))
+        if len(self._touched) >= 1000:
+            self._flush_touched()
+        return row[0]
+
+    def has_objects(self, id_list: List[str]) -> Dict[str, bool]:
+        found = set()
+        with closing(self._conn.cursor()) as c:
+            for i in range(0, len(id_list), _QUERY_CHUNK):
+                part = id_list[i:i + _QUERY_CHUNK]
+                marks = ",".join("?" * len(part))
+                found.update(r[0] for r in c.execute(f"SELECT hash FROM objects WHERE hash IN ({marks})", part))
+        return {id: id in found for id in id_list}
+
+    def copy_object_and_children(self, id: str, target_transport: AbstractTransport) -> str:
+        raise NotImplementedError
+
+    # -- housekeeping --
+
+    def _flush_touched(self) -> None:
+        if not self._touched:
+            return
+        with closing(self._conn.cursor()) as c:
+            c.executemany("UPDATE objects SET last_access = ? WHERE hash = ?", self._touched)
+        self._conn.commit()
+        self._touched = []
+
+    def size_bytes(self) -> int:
+        with closing(self._conn.cursor()) as c:
+            return c.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least-recently-used objects (older than this session) until under budget."""
+        self._flush_touched()
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        removed, freed = [], 0
+        with closing(self._conn.cursor()) as c:
+            rows = c.execute(
+                "SELECT hash, size FROM objects WHERE last_access < ? ORDER BY last_access",
+                (self.session_start,),
+            )
+            for obj_id, size in rows:
+                if freed >= excess:
+                    break
+                removed.append((obj_id,))
+                freed += size
+            c.executemany("DELETE FROM objects WHERE hash = ?", removed)
+        self._conn.commit()
+        return len(removed)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._flush_batch()
+            self._flush_touched()
+            self._conn.close()
+            self._conn = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def missing_children(cache: ObjectCache, obj_id: str) -> Optional[List[str]]:
+    """Closure ids of `obj_id` that are not cached, or None if the root itself is missing."""
+    root = cache.get_object(obj_id)
+    if root is None:
+        return None
+    closure = json.loads(root).get("__closure") or {}
+    found = cache.has_objects(list(closure))
+    return [k for k, ok in found.items() if not ok]
+
+
+def cached_receive(obj_id: str, remote_transport: AbstractTransport,
+                   cache: Optional[ObjectCache] = None) -> Base:
+    """
+    `operations.receive` with `ObjectCache` as the local transport.
+
+    The root and its full closure are checked first; if anything was evicted
+    the server transport downloads the root plus only the missing children.
+    """
+    cache = cache or ObjectCache()
+    missing = missing_children(cache, obj_id)
+    if missing is None or missing:
+        remote_transport.copy_object_and_children(id=obj_id, target_transport=cache)
+    return operations.receive(obj_id=obj_id, remote_transport=remote_transport, local_transport=cache)
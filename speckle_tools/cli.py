@@ -0,0 +1,448 @@
+"""
+speckle-tools: one entry point for the numbered scripts
+
+    speckle-tools create-model "homework/session04/team_01.1"     # 1_CreateModel.py
+    speckle-tools build-tower --count 200 --properties tower_properties.csv
+    speckle-tools export --project 08c875bbe4 --object e8f99c85... --stream
+    speckle-tools subscribe --project 08c875bbe4
+    speckle-tools backup --format jsonl.zst --metrics-port 9464
+    speckle-tools store list                                        # 9_BackupStore.py
+    speckle-tools daemon start | status | stop
+
+(or `python -m speckle_tools ...` without installing). A subcommand imports
+its script only once it is chosen, so dispatch and --help cost no more than
+argparse; the account comes from the local cache (speckle_tools.accounts,
+--refresh-account drops it). create-model, build-tower and store take the
+script's own arguments; export, subscribe and backup set the script's
+config constants from their options.
+
+With a daemon running (`daemon start`), create-model, build-tower, export and
+store run inside it: specklepy, gql and numpy are imported once, and the
+shared session (speckle_tools.client.connect) stays authenticated and
+connected between invocations. Each request carries the caller's working
+directory and SPECKLE_* environment (token, cache settings), which the command
+runs with, and --refresh-account drops the daemon's sessions too. Output is
+streamed back; requests are served one at a time, and the daemon exits after
+DAEMON_IDLE_S without one.
+subscribe and backup run until stopped, and runs asking for a profile or a
+metrics exporter need their own process, so those always run locally, as
+does everything with --no-daemon.
+"""
+
+import argparse
+import importlib.util
+import io
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from multiprocessing.connection import Client, Listener
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROG = "speckle-tools"
+
+DAEMON_STATE_FILENAME = "daemon.json"
+DAEMON_LOG_FILENAME = "daemon.log"
+DAEMON_IDLE_S = 30 * 60
+DAEMON_START_TIMEOUT_S = 30
+# environment a daemon run takes from the calling shell
+ENV_PREFIX = "SPECKLE"
+
+# subcommand -> (script, help, may run in the daemon)
+SCRIPTS = {
+    "create-model": ("1_CreateModel.py", "create one or many models in a project", True),
+    "build-tower": ("8_TowerGenerator.py", "generate a stacked tower and send it as a version", True),
+    "export": ("5_HW-exportJSON-GQL2.py", "export an object (and its children) to JSON", True),
+    "subscribe": ("6_HW-Subscription.py", "print a project's version updates as they happen", False),
+    "backup": ("7_HW-Listening.py", "back up every new version of a project", False),
+    "store": ("9_BackupStore.py", "list / restore / convert backups", True),
+}
+# these take the script's own command line
+PASS_THROUGH = ("create-model", "build-tower", "store")
+
+# -----------------------
+# Scripts
+# -----------------------
+
+def _load_script(filename: str):
+    """Import a numbered script from the repository root (a fresh module every time, so constants start clean)."""
+    path = os.path.join(REPO_ROOT, filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{filename} not found in {REPO_ROOT} (the CLI runs the repository's scripts)")
+    name = "speckle_script_" + re.sub(r"\W", "_", os.path.splitext(filename)[0])
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _config(command: str, args: argparse.Namespace) -> Dict[str, object]:
+    """Script constants set by the options of `export` / `subscribe` / `backup`."""
+    if command == "export":
+        config = {"PROJECT_ID": args.project, "OBJECT_ID": args.object, "PROJECTION": args.projection}
+        if args.no_resolve:
+            config["RESOLVE_CHILDREN"] = False
+        if args.stream:
+            config["STREAM_EXPORT"] = True
+    elif command == "subscribe":
+        config = {"PROJECT_ID": args.project}
+        if args.no_reconnect:
+            config["LONG_RUNNING"] = False
+    elif command == "backup":
+        config = {"PROJECT_ID": args.project, "BACKUP_DIRNAME": args.dir, "BACKUP_FORMAT": args.format,
+                  "BACKUP_PROJECTION": args.projection, "INCREMENTAL_TARGET_MODEL_ID": args.incremental_model,
+                  "METRICS_PORT": args.metrics_port, "METRICS_LOG_FILENAME": args.metrics_log,
+                  "PROFILE": args.profile}
+        if args.project:
+            config["CHECKPOINT_FILENAME"] = f".listener_checkpoint_{args.project}.json"
+        if args.resolve_children:
+            config["RESOLVE_CHILDREN"] = True
+    else:
+        config = {}
+    return {k: v for k, v in config.items() if v is not None}
+
+
+def run_script(command: str, argv: List[str], config: Optional[Dict[str, object]] = None) -> int:
+    """Run a subcommand's script in this process; returns its exit code."""
+    filename = SCRIPTS[command][0]
+    module = _load_script(filename)
+    for name, value in (config or {}).items():
+        setattr(module, name, value)
+    saved = sys.argv
+    sys.argv = [f"{PROG} {command}"] + list(argv)
+    try:
+        code = module.main()
+    except SystemExit as e:
+        code = e.code
+    finally:
+        sys.argv = saved
+    if code is None or isinstance(code, int):
+        return code or 0
+    print(code, file=sys.stderr)
+    return 1
+
+# -----------------------
+# Daemon
+# -----------------------
+
+def _cache_dir() -> str:
+    from speckle_tools.accounts import DEFAULT_CACHE_DIR
+
+    return os.environ.get("SPECKLE_TOOLS_CACHE", DEFAULT_CACHE_DIR)
+
+
+def _read_state() -> Optional[dict]:
+    import json
+
+    try:
+        with open(os.path.join(_cache_dir(), DAEMON_STATE_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _connect():
+    """Connection to the running daemon, or None (a stale state file is refused at once on localhost)."""
+    state = _read_state()
+    if not state:
+        return None
+    host, port = state["address"]
+    try:
+        return Client((host, port), authkey=bytes.fromhex(state["authkey"]))
+    except (OSError, EOFError, ValueError):
+        return None
+    except Exception as e:  # AuthenticationError: a daemon of someone else's
+        print(f"⚠ Daemon at {host}:{port} refused the connection: {e}", file=sys.stderr)
+        return None
+
+
+def _request(message: dict) -> Optional[object]:
+    conn = _connect()
+    if conn is None:
+        return None
+    with conn:
+        conn.send(message)
+        return conn.recv()
+
+
+class _Remote(io.TextIOBase):
+    """stdout / stderr of a request, streamed back to the calling process."""
+
+    def __init__(self, conn, kind: str):
+        self.conn = conn
+        self.kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.conn.send((self.kind, text))
+        return len(text)
+
+
+def _caller_env() -> Dict[str, str]:
+    return {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+
+
+@contextmanager
+def _environment(env: Dict[str, str]):
+    """The SPECKLE_* variables set to exactly `env` for the duration (the daemon's own come back after)."""
+    saved = _caller_env()
+    for key in saved:
+        del os.environ[key]
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key in _caller_env():
+            del os.environ[key]
+        os.environ.update(saved)
+
+
+def _drop_sessions() -> None:
+    """Forget cached accounts and close the shared sessions, so the next command looks its account up again."""
+    from speckle_tools.accounts import clear
+    from speckle_tools.client import _sessions
+
+    clear()
+    for session in list(_sessions.values()):
+        session.close()
+
+
+def run_remote(command: str, argv: List[str], config: Dict[str, object],
+               refresh_account: bool = False) -> Optional[int]:
+    """Run a subcommand in the daemon, streaming its output; None when no daemon is running."""
+    conn = _connect()
+    if conn is None:
+        return None
+    with conn:
+        conn.send({"op": "run", "command": command, "argv": argv, "config": config, "cwd": os.getcwd(),
+                   "env": _caller_env(), "refresh_account": refresh_account})
+        while True:
+            try:
+                kind, value = conn.recv()
+            except EOFError:
+                print("⚠ The daemon went away mid-command", file=sys.stderr)
+                return 1
+            if kind == "exit":
+                return value
+            stream = sys.stdout if kind == "out" else sys.stderr
+            stream.write(value)
+            stream.flush()
+
+
+def serve(idle: float = DAEMON_IDLE_S) -> None:
+    """Run the daemon in this process until `daemon stop` or `idle` seconds without a request."""
+    import json
+    import secrets
+
+    from speckle_tools.store import _atomic_write
+
+    t = time.perf_counter()
+    # the point of the daemon: pay for the imports and the authentication once
+    import numpy  # noqa: F401
+    import specklepy.api.operations  # noqa: F401
+
+    from speckle_tools.client import connect
+
+    try:
+        session = connect()
+        print(f"✓ Connected to {session.server_url}")
+    except Exception as e:
+        print(f"⚠ No session yet ({e}); commands will connect themselves")
+    print(f"✓ Warm in {time.perf_counter() - t:.2f} s")
+
+    authkey = secrets.token_bytes(32)
+    listener = Listener(("127.0.0.1", 0), authkey=authkey)
+    state_path = os.path.join(_cache_dir(), DAEMON_STATE_FILENAME)
+    state = {"pid": os.getpid(), "address": list(listener.address), "authkey": authkey.hex()}
+    _atomic_write(state_path, json.dumps(state))  # owner-only: the key lets anyone run commands
+    print(f"✓ Daemon {os.getpid()} listening on {listener.address[0]}:{listener.address[1]}", flush=True)
+
+    started, served = time.time(), 0
+    last = [time.time()]
+    stop = threading.Event()
+
+    def watchdog() -> None:
+        while not stop.wait(min(idle, 60)):
+            if time.time() - last[0] >= idle:
+                print(f"Idle for {idle:.0f} s, stopping", flush=True)
+                _request({"op": "stop"})  # wakes the accept() below
+                return
+
+    threading.Thread(target=watchdog, daemon=True).start()
+    try:
+        while not stop.is_set():
+            try:
+                conn = listener.accept()
+            except Exception as e:  # a client with the wrong key
+                print(f"⚠ {e}", flush=True)
+                continue
+            with conn:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    continue
+                last[0] = time.time()
+                op = message.get("op")
+                if op == "stop":
+                    stop.set()
+                    conn.send({"pid": os.getpid()})
+                elif op == "status":
+                    conn.send({"pid": os.getpid(), "uptime": time.time() - started, "served": served,
+                               "idle": time.time() - last[0], "idle_timeout": idle})
+                elif op == "run":
+                    served += 1
+                    _serve_run(conn, message)
+                    last[0] = time.time()
+    finally:
+        stop.set()
+        listener.close()
+        current = _read_state()
+        if current and current.get("pid") == os.getpid():
+            os.remove(state_path)
+        print("Daemon stopped", flush=True)
+
+
+def _serve_run(conn, message: dict) -> None:
+    command, argv = message["command"], message["argv"]
+    print(f"→ {command} {' '.join(argv) or message.get('config') or ''}", flush=True)
+    t = time.perf_counter()
+    cwd = os.getcwd()
+    out, err = _Remote(conn, "out"), _Remote(conn, "err")
+    try:
+        os.chdir(message.get("cwd") or cwd)
+        with redirect_stdout(out), redirect_stderr(err), _environment(message.get("env") or {}):
+            try:
+                if message.get("refresh_account"):
+                    _drop_sessions()
+                code = run_script(command, argv, message.get("config"))
+            except BaseException:  # the daemon outlives any one command
+                traceback.print_exc()
+                code = 1
+        conn.send(("exit", code))
+    except (OSError, EOFError):
+        print("⚠ Client went away", flush=True)
+    finally:
+        os.chdir(cwd)
+    print(f"  done in {time.perf_counter() - t:.2f} s", flush=True)
+
+
+def start_daemon(idle: float) -> int:
+    status = _request({"op": "status"})
+    if status is not None:
+        print(f"✓ Daemon already running (pid {status['pid']})")
+        return 0
+    os.makedirs(_cache_dir(), exist_ok=True)
+    log_path = os.path.join(_cache_dir(), DAEMON_LOG_FILENAME)
+    detach = ({"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+              if os.name == "nt" else {"start_new_session": True})
+    with open(log_path, "a", encoding="utf-8") as log:
+        proc = subprocess.Popen([sys.executable, "-m", "speckle_tools", "daemon", "serve", "--idle", str(idle)],
+                                cwd=REPO_ROOT, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                                **detach)
+    deadline = time.time() + DAEMON_START_TIMEOUT_S
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            print(f"❌ Daemon exited with code {proc.returncode}, see {log_path}")
+            return 1
+        state = _read_state()
+        if state and state.get("pid") == proc.pid:
+            print(f"✓ Daemon started (pid {proc.pid}), log: {log_path}")
+            return 0
+        time.sleep(0.1)
+    print(f"❌ Daemon not ready after {DAEMON_START_TIMEOUT_S} s, see {log_path}")
+    return 1
+
+
+def daemon_command(args: argparse.Namespace) -> int:
+    if args.action == "serve":
+        serve(args.idle)
+        return 0
+    if args.action == "start":
+        return start_daemon(args.idle)
+    if args.action == "stop":
+        reply = _request({"op": "stop"})
+        print(f"✓ Daemon {reply['pid']} stopped" if reply else "No daemon running")
+        return 0
+    status = _request({"op": "status"})
+    if status is None:
+        print("No daemon running")
+        return 1
+    print(f"Daemon {status['pid']}: up {status['uptime'] / 60:.1f} min, {status['served']} command(s) served, "
+          f"idle {status['idle']:.0f} s (stops after {status['idle_timeout']:.0f} s)")
+    return 0
+
+# -----------------------
+# Command line
+# -----------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=PROG, description="Speckle tools for the Team 01.1 workflows.")
+    parser.add_argument("--no-daemon", action="store_true", help="run in this process even if a daemon is running")
+    parser.add_argument("--refresh-account", action="store_true", help="look the account up again (drops the cache)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in PASS_THROUGH:
+        script, help_text, _ = SCRIPTS[name]
+        # everything after the subcommand goes to the script, --help included
+        sub.add_parser(name, help=f"{help_text} ({script})", add_help=False)
+
+    p = sub.add_parser("export", help=f"{SCRIPTS['export'][1]} ({SCRIPTS['export'][0]})")
+    p.add_argument("--project", help="project id")
+    p.add_argument("--object", help="object id")
+    p.add_argument("--no-resolve", action="store_true", help="keep child references instead of the full tree")
+    p.add_argument("--stream", action="store_true", help="stream every object to object_data.jsonl.gz")
+    p.add_argument("--projection", help='"metadata" or a comma-separated list of members to keep')
+
+    p = sub.add_parser("subscribe", help=f"{SCRIPTS['subscribe'][1]} ({SCRIPTS['subscribe'][0]})")
+    p.add_argument("--project", help="project id")
+    p.add_argument("--no-reconnect", action="store_true", help="exit when the WebSocket drops")
+
+    p = sub.add_parser("backup", help=f"{SCRIPTS['backup'][1]} ({SCRIPTS['backup'][0]})")
+    p.add_argument("--project", help="project id")
+    p.add_argument("--dir", help="backup directory (relative to the repository)")
+    p.add_argument("--format", help="store, json, jsonl.gz, jsonl.zst or spkb")
+    p.add_argument("--resolve-children", action="store_true", help="back up the full tree of every version")
+    p.add_argument("--projection", help='"metadata" or a comma-separated list of members to keep')
+    p.add_argument("--incremental-model", help="model id receiving incrementally recomputed versions")
+    p.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    p.add_argument("--metrics-log", help="JSON-lines metrics file (relative to the repository)")
+    p.add_argument("--profile", choices=("cprofile", "py-spy"), help="profile the whole run")
+
+    p = sub.add_parser("daemon", help="keep a warm, authenticated process for repeated commands")
+    p.add_argument("action", choices=("start", "status", "stop", "serve"))
+    p.add_argument("--idle", type=float, default=DAEMON_IDLE_S, help="stop after this many seconds without a command")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args, script_argv = parser.parse_known_args(argv)
+    if script_argv and args.command not in PASS_THROUGH:
+        parser.error(f"unrecognized arguments: {' '.join(script_argv)}")
+    if args.command == "daemon":
+        return daemon_command(args)
+    if args.refresh_account:
+        from speckle_tools.accounts import clear
+
+        clear()
+
+    config = _config(args.command, args)
+    # profilers and metrics exporters belong to one run, not to the daemon
+    local_only = any(a.startswith(("--profile", "--metrics")) for a in script_argv)
+    if SCRIPTS[args.command][2] and not args.no_daemon and not local_only:
+        code = run_remote(args.command, script_argv, config, args.refresh_account)
+        if code is not None:
+            return code
+    return run_script(args.command, script_argv, config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+One shared, pooled connection layer for the scripts
+
+    session = connect()                      # default account, reused per process
+    session.execute(Q_MODELS, projectId=...) # parsed documents + variables
+    for model in session.paginate(Q_MODELS, ("project", "models"), projectId=...): ...
+    session.client                           # specklepy SpeckleClient (model/version API)
+    session.transport(project_id)            # ServerTransport for send / receive
+
+- GraphQL goes through one gql session that stays connected, so every query
+  reuses the same keep-alive HTTP connection pool instead of opening a new one
+- documents live in speckle_tools.queries, parsed once at import
+- list fields are walked with their cursor (`paginate`), never a fixed `limit`
+- `AsyncSpeckleSession` is the asyncio flavour (httpx pool), used by the listener
+- every query is timed (graphql_request_seconds{operation}) and every response
+  counted with its size (http_received_bytes_total), see speckle_tools.metrics
+- the default account and the user / server info behind a token are cached
+  locally for a day (speckle_tools.accounts), so starting up costs no account
+  database read and one round trip less
+"""
+
+import os
+from typing import AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+import httpx
+import requests
+from gql import Client
+from gql.transport.httpx import HTTPXAsyncTransport
+from gql.transport.requests import RequestsHTTPTransport
+from graphql import DocumentNode
+from requests.adapters import HTTPAdapter
+
+from speckle_tools.accounts import cached_account, default_account, save_account
+from speckle_tools.metrics import METRICS, httpx_hooks, requests_hooks
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60
+DEFAULT_RETRIES = 3
+
+_sessions: Dict[Tuple[str, str], "SpeckleSession"] = {}
+
+
+def _dig(result: dict, path: Sequence[str]) -> dict:
+    for key in path:
+        result = result[key] if result else None
+    return result or {}
+
+
+def _next_page(page: dict, variables: dict, page_size: int) -> Optional[dict]:
+    """Variables for the following page, or None once the list is exhausted."""
+    cursor = page.get("cursor")
+    items = page.get("items") or []
+    if not cursor or not items or len(items) < page_size or cursor == variables.get("cursor"):
+        return None
+    return dict(variables, cursor=cursor)
+
+
+def _operation(document: DocumentNode) -> str:
+    """Name of the document's first operation, for metric labels."""
+    for definition in document.definitions:
+        name = getattr(definition, "name", None)
+        if name is not None:
+            return name.value
+    return "anonymous"
+
+
+def resolve_account(server_url: Optional[str] = None, token: Optional[str] = None):
+    """
+    (server_url, token, account): explicit values, else SPECKLE_TOKEN / the
+    default local account (cached, see speckle_tools.accounts).
+    """
+    token = token or os.environ.get("SPECKLE_TOKEN")
+    if server_url and token:
+        return server_url.rstrip("/"), token, None
+
+    default_url, default_token, account = default_account()
+    return (server_url or default_url).rstrip("/"), token or default_token, account
+
+# -----------------------
+# Sync
+# -----------------------
+
+class SpeckleSession:
+    """
+    Args:
+        server_url: e.g. https://app.speckle.systems
+        token: personal access token
+        account: specklepy Account or its cached dict, if there is one (saves a lookup when `client` is used)
+        pool_size: keep-alive connections kept per host
+        retries: retries on 429 / 5xx with exponential backoff
+    """
+
+    def __init__(self, server_url: str, token: str, account=None, pool_size: int = DEFAULT_POOL_SIZE,
+                 retries: int = DEFAULT_RETRIES, timeout: int = DEFAULT_TIMEOUT):
+        self.server_url = server_url.rstrip("/")
+        self.token = token
+        self.account = account
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+        self._gql = Client(
+            transport=RequestsHTTPTransport(url=f"{self.server_url}/graphql", headers=self.headers,
+                                            timeout=timeout, retries=retries),
+            fetch_schema_from_transport=False,
+        )
+        self._gql_session = self._gql.connect_sync()
+        # RequestsHTTPTransport only mounts an adapter when retrying; size the pool either way
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=self._gql.transport.session.get_adapter("https://").max_retries)
+        for prefix in ("http://", "https://"):
+            self._gql.transport.session.mount(prefix, adapter)
+        self._gql.transport.session.hooks["response"].extend(requests_hooks("graphql")["response"])
+
+        self.rest = requests.Session()
+        self.rest.headers.update(self.headers)
+        for prefix in ("http://", "https://"):
+            self.rest.mount(prefix, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                                max_retries=retries))
+        self.rest.hooks["response"].extend(requests_hooks("rest")["response"])
+
+        self._client = None
+        self._transports: Dict[str, object] = {}
+
+    @classmethod
+    def from_account(cls, account=None, **kwargs) -> "SpeckleSession":
+        if account is None:
+            server_url, token, account = default_account()
+            return cls(server_url, token, account=account, **kwargs)
+        return cls(account.serverInfo.url, account.token, account=account, **kwargs)
+
+    # -- GraphQL --
+
+    def execute(self, document: DocumentNode, **variables) -> dict:
+        with METRICS.span("graphql_request", operation=_operation(document)):
+            return self._gql_session.execute(document, variable_values=variables)
+
+    def paginate(self, document: DocumentNode, path: Sequence[str], page_size: int = DEFAULT_PAGE_SIZE,
+                 **variables) -> Iterator[dict]:
+        """
+        Yield every item of a cursor-paginated list. `document` takes $limit and
+        $cursor; `path` leads to the `{cursor, items}` object in the result.
+        """
+        variables = dict(variables, limit=page_size, cursor=None)
+        while variables is not None:
+            page = _dig(self.execute(document, **variables), path)
+            yield from page.get("items") or []
+            variables = _next_page(page, variables, page_size)
+
+    # -- specklepy --
+
+    @property
+    def client(self):
+        """Authenticated SpeckleClient, created on first use."""
+        if self._client is None:
+            from specklepy.api.client import SpeckleClient
+            from specklepy.api.credentials import Account
+
+            self._client = SpeckleClient(host=self.server_url)
+            account = self.account or cached_account(self.server_url, self.token)
+            if account is not None:
+                # one round trip (active user) instead of two
+                self._client.authenticate_with_account(
+                    Account.model_validate(account) if isinstance(account, dict) else account)
+            else:
+                self._client.authenticate_with_token(self.token)
+                save_account(self._client.account)
+        return self._client
+
+    def transport(self, project_id: str):
+        """ServerTransport for a project, one per project per session."""
+        if project_id not in self._transports:
+            from specklepy.transports.server import ServerTransport
+
+            self._transports[project_id] = ServerTransport(stream_id=project_id, client=self.client)
+        return self._transports[project_id]
+
+    def close(self) -> None:
+        self._gql.close_sync()
+        self.rest.close()
+        for key, session in list(_sessions.items()):
+            if session is self:
+                del _sessions[key]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect(server_url: Optional[str] = None, token: Optional[str] = None) -> SpeckleSession:
+    """Shared session for this server + token; created once per process."""
+    server_url, token, account = resolve_account(server_url, token)
+    key = (server_url, token)
+    if key not in _sessions:
+        _sessions[key] = SpeckleSession(server_url, token, account=account)
+    return _sessions[key]
+
+# -----------------------
+# Async
+# -----------------------
+
+class AsyncSpeckleSession:
+    """
+    asyncio flavour of `SpeckleSession`: one gql session and one httpx pool
+    (`http`, for REST calls such as /api/getobjects) shared by every task.
+    """
+
+    def __init__(self, server_url: str, token: str, max_connections: int = DEFAULT_POOL_SIZE,
+                 timeout: int = DEFAULT_TIMEOUT):
+        self.server_url = server_url.rstrip("/")
+        self.token = token
+        self.headers = {"Authorization": f"Bearer {token}"}
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._gql = Client(
+            transport=HTTPXAsyncTransport(url=f"{self.server_url}/graphql", headers=self.headers,
+                                          limits=limits, timeout=timeout, event_hooks=httpx_hooks("graphql")),
+            fetch_schema_from_transport=False,
+        )
+        self._gql_session = None
+        self.http = httpx.AsyncClient(base_url=self.server_url, headers=self.headers, limits=limits, timeout=timeout,
+                                      event_hooks=httpx_hooks("rest"))
+
+    async def start(self) -> "AsyncSpeckleSession":
+        if self._gql_session is None:
+            self._gql_session = await self._gql.connect_async(reconnecting=False)
+        return self
+
+    async def execute(self, document: DocumentNode, **variables) -> dict:
+        if self._gql_session is None:
+            await self.start()
+        with METRICS.span("graphql_request", operation=_operation(document)):
+            return await self._gql_session.execute(document, variable_values=variables)
+
+    async def paginate(self, document: DocumentNode, path: Sequence[str], page_size: int = DEFAULT_PAGE_SIZE,
+                       **variables) -> AsyncIterator[dict]:
+        variables = dict(variables, limit=page_size, cursor=None)
+        while variables is not None:
+            page = _dig(await self.execute(document, **variables), path)
+            for item in page.get("items") or []:
+                yield item
+            variables = _next_page(page, variables, page_size)
+
+    async def close(self) -> None:
+        if self._gql_session is not None:
+            await self._gql.close_async()
+            self._gql_session = None
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
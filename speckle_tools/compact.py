@@ -0,0 +1,268 @@
+"""
+Mesh compaction before send
+
+    report = compact(root, quantize=0.1)     # lengths in the root's units (here: 0.1 mm)
+    report.print()
+
+For every displayValue mesh under `root`:
+- weld vertices that fall in the same `tolerance` grid cell and carry the same
+  colour / normal / texture coordinate
+- drop faces left with fewer than 3 distinct vertices, zero-area triangles and
+  faces repeating the vertices of an earlier face (any start, either winding)
+- drop vertices no face uses any more
+- optionally round the coordinates to a `quantize` step, which shortens every
+  number in the JSON the server receives
+
+Each mesh is compacted with a few NumPy passes. New buffers are assigned,
+never edited in place (module copies share theirs, see speckle_tools.duplicate),
+and identical results are shared again so copies still upload once.
+"""
+
+import hashlib
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from speckle_tools.geometry import UNIT_SCALE, _children, _face_starts, _get, _is_mesh, _members, _set
+from speckle_tools.transform import MESH_BUFFERS, _as_xyz
+
+# default weld tolerance, metres
+WELD_TOLERANCE_M = 1e-6
+
+# per-vertex attribute buffers and their width
+VERTEX_ATTRIBUTES = {"colors": 1, "vertexNormals": 3, "textureCoordinates": 2}
+
+
+class CompactReport:
+    """Counts and payload sizes before / after compaction."""
+
+    def __init__(self):
+        self.meshes = 0
+        self.skipped = 0
+        self.vertices = [0, 0]
+        self.faces = [0, 0]
+        self.degenerate = 0
+        self.duplicates = 0
+        self.bytes = [0, 0]  # JSON size of the mesh buffers, shared buffers counted once
+
+    def print(self) -> None:
+        (v0, v1), (f0, f1), (b0, b1) = self.vertices, self.faces, self.bytes
+        if not self.meshes:
+            print("No meshes to compact")
+            return
+        change = 100.0 * (b1 / b0 - 1) if b0 else 0.0
+        print(f"🗜 Compacted {self.meshes} meshes: vertices {v0:,} → {v1:,}, faces {f0:,} → {f1:,} "
+              f"({self.degenerate:,} degenerate, {self.duplicates:,} duplicate)")
+        print(f"    mesh buffers {b0 / 1e6:,.2f} MB → {b1 / 1e6:,.2f} MB ({abs(change):.0f}% {'smaller' if change <= 0 else 'larger'})"
+              + (f", {self.skipped} meshes left as they were" if self.skipped else ""))
+
+# -----------------------
+# One mesh
+# -----------------------
+
+def _quantizer(step: Optional[float]):
+    """Round to multiples of `step`; powers of ten round to decimals so the JSON stays short."""
+    if not step:
+        return None
+    decimals = -math.log10(step)
+    if abs(decimals - round(decimals)) < 1e-9:
+        d = int(round(decimals))
+        return lambda a: np.round(a, d) if d > 0 else np.round(a / step) * step
+    return lambda a: np.round(a / step) * step
+
+
+def _attributes(mesh, n: int) -> Optional[Dict[str, np.ndarray]]:
+    """Per-vertex attribute arrays, or None when one doesn't line up with the vertices."""
+    out = {}
+    for name, width in VERTEX_ATTRIBUTES.items():
+        values = _get(mesh, name)
+        if not values:
+            continue
+        if len(values) != n * width:
+            return None
+        out[name] = np.asarray(values).reshape(n, width)
+    return out
+
+
+def _unique_rows(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """First index of every distinct row and each row's group, rows compared as raw bytes."""
+    rows = np.ascontiguousarray(rows)
+    view = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(view, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def _compact_faces(f: np.ndarray, remap: np.ndarray, xyz: np.ndarray, report: CompactReport) -> np.ndarray:
+    """Remapped faces list without degenerate or repeated faces, grouped by vertex count."""
+    starts = _face_starts(f)
+    counts = f[starts]
+    counts = np.where(counts < 3, counts + 3, counts)  # legacy encoding: 0 = triangle, 1 = quad
+    out = []
+    for n in np.unique(counts).tolist():
+        first = starts[counts == n] + 1
+        rows = remap[f[first[:, None] + np.arange(n)]]
+        # collapse welded neighbours: keep a corner only if it differs from the next one round the loop
+        keep = rows != np.roll(rows, -1, axis=1)
+        distinct = keep.sum(axis=1)
+        ok = distinct >= 3
+        # triangles, including bigger faces welded down to three corners: drop zero-area ones
+        tri = ok & (distinct == 3)
+        if tri.any():
+            corners = rows[tri][keep[tri]].reshape(-1, 3)
+            a, b, c = xyz[corners[:, 0]], xyz[corners[:, 1]], xyz[corners[:, 2]]
+            cross = np.cross(b - a, c - a)
+            ok[tri] = (cross * cross).sum(axis=1) > 0.0
+        report.degenerate += int((~ok).sum())
+        rows, keep, distinct = rows[ok], keep[ok], distinct[ok]
+        if not len(rows):
+            continue
+        # same vertices, any start or winding: one face
+        key = np.sort(np.where(keep, rows, -1), axis=1)
+        first_seen, _ = _unique_rows(np.hstack([distinct[:, None], key]))
+        first_seen.sort()
+        report.duplicates += len(rows) - len(first_seen)
+        rows, keep, distinct = rows[first_seen], keep[first_seen], distinct[first_seen]
+        table = np.hstack([distinct[:, None], rows])
+        mask = np.hstack([np.ones((len(rows), 1), dtype=bool), keep])
+        out.append(table[mask])
+    return np.concatenate(out) if out else np.zeros(0, dtype=np.int64)
+
+
+def _compact_mesh(mesh, tolerance: float, quantize, report: CompactReport) -> Optional[Dict[str, np.ndarray]]:
+    vertices, faces = _get(mesh, "vertices"), _get(mesh, "faces") or []
+    if len(vertices) % 3:
+        return None
+    xyz = _as_xyz(vertices)
+    attrs = _attributes(mesh, len(xyz))
+    if attrs is None:
+        return None
+    f = faces if isinstance(faces, np.ndarray) else np.fromiter(faces, dtype=np.int64, count=len(faces))
+    if f.size and (f.max() >= len(xyz)):
+        return None
+
+    if quantize is not None:
+        xyz = quantize(xyz)
+    # weld: same grid cell and same attributes
+    cells = np.floor(xyz / tolerance) if tolerance > 0 else xyz
+    # + 0.0 turns -0.0 into 0.0, which compares equal but has other bytes
+    key = np.hstack([cells] + [a.astype(np.float64) for a in attrs.values()]) + 0.0
+    first, inverse = _unique_rows(key)
+    # number the welded vertices in the order they first appear
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    remap = rank[inverse]
+    keep = first[order]
+
+    new_faces = _compact_faces(f, remap, xyz[keep], report) if f.size else f
+    # drop vertices no face uses any more
+    if new_faces.size:
+        starts = _face_starts(new_faces)
+        is_index = np.ones(new_faces.size, dtype=bool)
+        is_index[starts] = False
+        used = np.zeros(len(keep), dtype=bool)
+        used[new_faces[is_index]] = True
+        if not used.all():
+            renumber = np.cumsum(used) - 1
+            new_faces = new_faces.copy()
+            new_faces[is_index] = renumber[new_faces[is_index]]
+            keep = keep[used]
+
+    report.vertices[0] += len(xyz)
+    report.vertices[1] += len(keep)
+    out_xyz = xyz[keep].ravel()
+    if all(type(v) is int for v in vertices) and np.array_equal(out_xyz, np.rint(out_xyz)):
+        out_xyz = out_xyz.astype(np.int64)  # integer input stays integer: "1.0" is a longer JSON number than "1"
+    out = {"vertices": out_xyz, "faces": new_faces}
+    for name, values in attrs.items():
+        out[name] = values[keep].ravel()
+    return out
+
+# -----------------------
+# Whole tree
+# -----------------------
+
+def _face_count(faces) -> int:
+    if faces is None or not len(faces):
+        return 0
+    f = faces if isinstance(faces, np.ndarray) else np.fromiter(faces, dtype=np.int64, count=len(faces))
+    return len(_face_starts(f))
+
+
+def _buffer_bytes(buffers: Dict[int, list]) -> int:
+    return sum(len(json.dumps(b, separators=(",", ":"))) for b in buffers.values())
+
+
+def _meshes(root) -> List:
+    found, seen = [], set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if _is_mesh(obj):
+            found.append(obj)
+            continue
+        for name, value in _members(obj):
+            if name not in MESH_BUFFERS:
+                stack.extend(_children(value))
+    return found
+
+
+def compact(root, tolerance: Optional[float] = None, quantize: Optional[float] = None,
+            units: Optional[str] = None, measure: bool = True) -> CompactReport:
+    """
+    Compact every mesh under `root` in place (see module docstring).
+
+    Args:
+        tolerance: weld distance; default WELD_TOLERANCE_M
+        quantize: round coordinates to this step (None = keep full precision)
+        units: units of `tolerance` / `quantize`, default the root's units (else metres)
+        measure: also report the JSON size of the mesh buffers before / after
+    """
+    units = units or _get(root, "units") or "m"
+    report = CompactReport()
+    before: Dict[int, list] = {}
+    after: Dict[int, list] = {}
+    shared: Dict[Tuple[str, bytes], list] = {}
+
+    def share(name: str, array: np.ndarray) -> list:
+        """One list per distinct buffer, so module copies keep sharing theirs."""
+        values = array.tolist()
+        digest = hashlib.blake2b(array.tobytes(), digest_size=16).digest()
+        return shared.setdefault((name, str(array.dtype).encode() + digest), values)
+
+    for mesh in _meshes(root):
+        if measure:
+            for name in MESH_BUFFERS:
+                value = _get(mesh, name)
+                if value:
+                    before[id(value)] = value
+        mesh_units = _get(mesh, "units") or units
+        scale = UNIT_SCALE.get(units, 1.0) / UNIT_SCALE.get(mesh_units, 1.0)
+        tol = (tolerance * scale) if tolerance is not None else WELD_TOLERANCE_M / UNIT_SCALE.get(mesh_units, 1.0)
+        report.faces[0] += _face_count(_get(mesh, "faces"))
+        result = _compact_mesh(mesh, tol, _quantizer(quantize * scale) if quantize else None, report)
+        if result is None:
+            report.skipped += 1
+            n = len(_get(mesh, "vertices")) // 3
+            report.vertices[0] += n
+            report.vertices[1] += n
+            report.faces[1] += _face_count(_get(mesh, "faces"))
+        else:
+            report.meshes += 1
+            report.faces[1] += _face_count(result["faces"])
+            for name, array in result.items():
+                _set(mesh, name, share(name, array))
+        if measure:
+            for name in MESH_BUFFERS:
+                value = _get(mesh, name)
+                if value:
+                    after[id(value)] = value
+
+    if measure:
+        report.bytes = [_buffer_bytes(before), _buffer_bytes(after)]
+    return report
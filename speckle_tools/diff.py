@@ -0,0 +1,357 @@
+"""
+Version diff by content hash
+
+Speckle ids are hashes of an object's content *including its children's ids*,
+so two subtrees with the same id are identical and are never descended into.
+The diff walks both object graphs level by level, only loading the children
+whose ids differ, and reports:
+
+- added / removed objects (with the size of the subtree they carry)
+- modified objects with the properties that changed (`Designer`, `Module`, ...)
+
+Both sides come from an `ObjectSource`: a backup payload already in memory
+(`TreeSource`) or a server version fetched lazily in batches (`ServerSource`).
+"""
+
+import asyncio
+import functools
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from speckle_tools.resolve import DATA_CHUNK_TYPE, DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY, REFERENCE_TYPE, fetch_objects_async
+from speckle_tools.store import STORE_REF, split_tree
+
+# bookkeeping fields that change with every child edit but say nothing themselves
+IGNORED_KEYS = {"id", "__closure", "totalChildrenCount"}
+# numeric lists longer than this are summarised instead of printed
+MAX_SHOWN_VALUES = 8
+
+# -----------------------
+# Sources
+# -----------------------
+
+class ObjectSource:
+    """Anything that can hand out raw objects (children as references) by id."""
+
+    root_id: str
+
+    def get_many(self, ids: List[str]) -> Dict[str, dict]:
+        raise NotImplementedError
+
+
+class TreeSource(ObjectSource):
+    """A fully expanded object tree, e.g. `payload["object"]["data"]` of a backup."""
+
+    def __init__(self, data: dict):
+        self.objects: Dict[str, dict] = {}
+        ref = split_tree(data, self.objects.__setitem__)
+        if not (isinstance(ref, dict) and STORE_REF in ref):
+            raise ValueError("The backup's object data has no Speckle id")
+        self.root_id = ref[STORE_REF]
+
+    def get_many(self, ids: List[str]) -> Dict[str, dict]:
+        return {i: self.objects[i] for i in ids if i in self.objects}
+
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context():
+    """Loading the CA bundle costs ~35 ms, so every client shares one context."""
+    return httpx.create_ssl_context()
+
+
+class ServerSource(ObjectSource):
+    """
+    Objects of one project, downloaded on demand with batched /api/getobjects
+    calls. An `ObjectCache` (speckle_tools.cache) is read first and filled as we go.
+    """
+
+    def __init__(self, server_url: str, project_id: str, token: str, root_id: str, cache=None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY):
+        self.server_url = server_url
+        self.project_id = project_id
+        self.token = token
+        self.root_id = root_id
+        self.cache = cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.downloaded = 0
+
+    def get_many(self, ids: List[str]) -> Dict[str, dict]:
+        out: Dict[str, dict] = {}
+        missing = []
+        for obj_id in ids:
+            text = self.cache.get_object(obj_id) if self.cache is not None else None
+            if text is None:
+                missing.append(obj_id)
+            else:
+                out[obj_id] = json.loads(text)
+        if missing:
+            fetched = asyncio.run(self._fetch(missing))
+            self.downloaded += len(fetched)
+            if self.cache is not None:
+                self.cache.begin_write()
+                for obj_id, obj in fetched.items():
+                    self.cache.save_object(obj_id, json.dumps(obj))
+                self.cache.end_write()
+            out.update(fetched)
+        return out
+
+    async def _fetch(self, ids: List[str]) -> Dict[str, dict]:
+        async with httpx.AsyncClient(headers={"Authorization": f"Bearer {self.token}"}, timeout=60,
+                                     verify=_ssl_context()) as http:
+            return await fetch_objects_async(http, self.server_url, self.project_id, ids,
+                                             self.batch_size, self.concurrency)
+
+# -----------------------
+# Object anatomy
+# -----------------------
+
+def _ref_id(value) -> Optional[str]:
+    if isinstance(value, dict):
+        if value.get("speckle_type") == REFERENCE_TYPE and "referencedId" in value:
+            return value["referencedId"]
+        if len(value) == 1 and STORE_REF in value:
+            return value[STORE_REF]
+    return None
+
+
+def _children(value, key: str) -> Iterable[Tuple[str, str]]:
+    """(property, child id) for every reference directly under one property."""
+    ref = _ref_id(value)
+    if ref is not None:
+        yield key, ref
+    elif isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            return
+        for v in value:
+            yield from _children(v, key)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            yield from _children(v, key)
+
+
+def _has_refs(value) -> bool:
+    return next(iter(_children(value, "")), None) is not None
+
+
+def split_object(obj: dict) -> Tuple[Dict[str, object], Dict[str, List[str]]]:
+    """Plain properties vs. child ids grouped by the property holding them."""
+    props: Dict[str, object] = {}
+    children: Dict[str, List[str]] = {}
+    for key, value in obj.items():
+        if key in IGNORED_KEYS:
+            continue
+        if _has_refs(value):
+            for k, ref in _children(value, key):
+                children.setdefault(k, []).append(ref)
+        else:
+            props[key] = value
+    return props, children
+
+
+def label(obj: dict, obj_id: str = "") -> str:
+    if not obj:
+        return obj_id[:10] or "?"
+    for key in ("name", "Module", "applicationId"):
+        if obj.get(key):
+            return str(obj[key])
+    return obj.get("speckle_type", "?").split(".")[-1]
+
+
+def _show(value):
+    if isinstance(value, list) and len(value) > MAX_SHOWN_VALUES:
+        return f"[{len(value)} values]"
+    return value
+
+
+def _count(n: int, noun: str) -> str:
+    return f"{n} {noun}" + ("" if n == 1 else "s")
+
+
+# -----------------------
+# Diff
+# -----------------------
+
+class VersionDiff:
+    """Result of `diff_sources`; the lists hold one dict per object."""
+
+    def __init__(self):
+        self.added: List[dict] = []
+        self.removed: List[dict] = []
+        self.modified: List[dict] = []
+        self.stats = {"compared": 0, "pruned": 0, "loaded": 0}
+
+    @property
+    def identical(self) -> bool:
+        return not (self.added or self.removed or self.modified)
+
+    def to_dict(self) -> dict:
+        return {"added": self.added, "removed": self.removed, "modified": self.modified, "stats": self.stats}
+
+    def print(self) -> None:
+        s = self.stats
+        print(f"🔍 {_count(s['compared'], 'object')} compared, {_count(s['pruned'], 'identical subtree')} skipped, "
+              f"{_count(s['loaded'], 'object')} loaded")
+        if self.identical:
+            print("✓ No differences")
+            return
+        for e in self.added:
+            print(f"  + {e['path']}  ({e['speckle_type']}, {_count(e['objects'], 'object')})")
+        for e in self.removed:
+            print(f"  - {e['path']}  ({e['speckle_type']}, {_count(e['objects'], 'object')})")
+        for e in self.modified:
+            print(f"  ~ {e['path']}" + (f"  ({e['note']})" if e.get("note") else ""))
+            for prop, (old, new) in e["changes"].items():
+                print(f"      {prop}: {_show(old)!r} -> {_show(new)!r}")
+
+
+def _pair(old_ids: List[str], new_ids: List[str], old_objs: Dict[str, dict],
+          new_objs: Dict[str, dict]) -> Tuple[List[Tuple[str, str]], List[str], List[str]]:
+    """
+    Match the differing children of one property. applicationId first, then
+    name / Module label, then position among the same speckle_type. Children
+    whose content isn't available (unresolved backups) are paired by position.
+    """
+    pairs = []
+    olds, news = list(old_ids), list(new_ids)
+    for key in (lambda o: o.get("applicationId"), lambda o: o and label(o), lambda o: o.get("speckle_type")):
+        by_key: Dict[object, List[str]] = {}
+        for i in news:
+            k = key(new_objs.get(i, {}))
+            if k:
+                by_key.setdefault(k, []).append(i)
+        rest = []
+        for i in olds:
+            k = key(old_objs.get(i, {}))
+            if k and by_key.get(k):
+                match = by_key[k].pop(0)
+                news.remove(match)
+                pairs.append((i, match))
+            else:
+                rest.append(i)
+        olds = rest
+    unknown_old = [i for i in olds if i not in old_objs]
+    unknown_new = [i for i in news if i not in new_objs]
+    for a, b in zip(unknown_old, unknown_new):
+        olds.remove(a)
+        news.remove(b)
+        pairs.append((a, b))
+    return pairs, olds, news
+
+
+def _load(source: ObjectSource, memo: Dict[str, dict], ids: Iterable[str]) -> int:
+    missing = [i for i in dict.fromkeys(ids) if i not in memo]
+    if not missing:
+        return 0
+    found = source.get_many(missing)
+    memo.update(found)
+    return len(found)
+
+
+def _subtree_size(source: ObjectSource, memo: Dict[str, dict], obj_id: str) -> Tuple[int, int]:
+    """
+    (objects in the subtree of `obj_id`, objects loaded to count them). A `__closure`
+    is taken as is; without one (resolved trees) the children are walked, a level at a time.
+    """
+    seen = set()
+    loaded = 0
+    level = [obj_id]
+    while level:
+        loaded += _load(source, memo, level)
+        below = []
+        for i in level:
+            if i in seen:
+                continue
+            seen.add(i)
+            obj = memo.get(i)
+            if obj is None:
+                continue
+            if obj.get("__closure"):
+                seen.update(obj["__closure"])
+                continue
+            below.extend(c for ids in split_object(obj)[1].values() for c in ids if c not in seen)
+        level = below
+    return len(seen), loaded
+
+
+def diff_sources(old: ObjectSource, new: ObjectSource, old_root: Optional[str] = None,
+                 new_root: Optional[str] = None) -> VersionDiff:
+    """Compare two object graphs, skipping every subtree whose id is the same on both sides."""
+    result = VersionDiff()
+    old_objs: Dict[str, dict] = {}
+    new_objs: Dict[str, dict] = {}
+    old_root, new_root = old_root or old.root_id, new_root or new.root_id
+    result.stats["compared"] += 1
+    if old_root == new_root:
+        result.stats["pruned"] += 1
+        return result
+    result.stats["loaded"] += _load(old, old_objs, [old_root]) + _load(new, new_objs, [new_root])
+    frontier = [("", old_root, new_root)]
+
+    while frontier:
+        # 1) compare the pairs of this level, collect their differing children
+        level = []
+        for path, a_id, b_id in frontier:
+            a, b = old_objs.get(a_id), new_objs.get(b_id)
+            if a is None or b is None:
+                result.modified.append({"path": path or "root", "old_id": a_id, "new_id": b_id,
+                                        "speckle_type": (a or b or {}).get("speckle_type"),
+                                        "changes": {}, "note": "content not available"})
+                continue
+            path = path or label(b)
+            a_props, a_children = split_object(a)
+            b_props, b_children = split_object(b)
+            changes = {k: (a_props.get(k), b_props.get(k))
+                       for k in sorted(a_props.keys() | b_props.keys()) if a_props.get(k) != b_props.get(k)}
+            entry = {"path": path, "old_id": a_id, "new_id": b_id, "speckle_type": b.get("speckle_type"),
+                     "changes": changes}
+            result.modified.append(entry)
+
+            for prop in sorted(a_children.keys() | b_children.keys()):
+                olds, news = a_children.get(prop, []), b_children.get(prop, [])
+                common = set(olds) & set(news)
+                result.stats["compared"] += len(common)
+                result.stats["pruned"] += len(common)
+                olds = [i for i in olds if i not in common]
+                news = [i for i in news if i not in common]
+                if olds or news:
+                    level.append((entry, prop, olds, news, len(a_children.get(prop, [])),
+                                  len(b_children.get(prop, []))))
+
+        # 2) load all of them in one batch per side
+        result.stats["loaded"] += _load(old, old_objs, (i for _, _, olds, _, _, _ in level for i in olds))
+        result.stats["loaded"] += _load(new, new_objs, (i for _, _, _, news, _, _ in level for i in news))
+
+        # 3) match them up into the next level
+        next_frontier = []
+        for entry, prop, olds, news, n_old, n_new in level:
+            path = entry["path"]
+            if any(o.get("speckle_type") == DATA_CHUNK_TYPE
+                   for o in (*(old_objs.get(i, {}) for i in olds), *(new_objs.get(i, {}) for i in news))):
+                # chunked arrays (vertices, faces, ...) are values, not objects
+                entry["changes"][prop] = (f"[{n_old} chunks]", f"[{n_new} chunks]")
+                continue
+
+            pairs, removed, added = _pair(olds, news, old_objs, new_objs)
+            for side, source, objs, ids in (("removed", old, old_objs, removed), ("added", new, new_objs, added)):
+                for i in ids:
+                    o = objs.get(i, {})
+                    size, loaded = _subtree_size(source, objs, i)
+                    result.stats["loaded"] += loaded
+                    getattr(result, side).append({"path": f"{path}/{prop}/{label(o, i)}", "id": i,
+                                                  "speckle_type": o.get("speckle_type"), "objects": size})
+            for a_child, b_child in pairs:
+                result.stats["compared"] += 1
+                next_frontier.append((f"{path}/{prop}/{label(new_objs.get(b_child), b_child)}", a_child, b_child))
+        frontier = next_frontier
+
+    # objects that only differ through their children are just noise in the report
+    result.modified = [e for e in result.modified if e["changes"] or e.get("note")]
+    return result
+
+
+def diff_payloads(old_payload: dict, new_payload: dict) -> VersionDiff:
+    """Diff two backup payloads (speckle_tools.backup / formats.read_backup)."""
+    return diff_sources(TreeSource(old_payload["object"]["data"]), TreeSource(new_payload["object"]["data"]))
@@ -0,0 +1,143 @@
+"""
+Copy-on-write duplication of Speckle objects
+
+- `share_copy` clones the Base / list / dict skeleton of an object but keeps
+  numeric buffers (vertices, faces, colors, vertexNormals, ...) shared by
+  reference, so N module copies cost N small shells instead of N deepcopies
+- `SharingSerializer` / `send` chunk and hash each shared buffer once per send
+  and reuse its DataChunk ids for every other object that points at it
+
+Shared buffers must never be edited in place: assign a new list instead
+(`apply_transform` in speckle_tools.transform already does this).
+"""
+
+import copy
+from typing import Dict, List, Optional, Tuple
+
+from specklepy.transports.sqlite import SQLiteTransport
+from specklepy.logging.exceptions import SpeckleException
+from specklepy.objects.base import Base
+from specklepy.serialization.base_object_serializer import BaseObjectSerializer
+from specklepy.transports.abstract_transport import AbstractTransport
+
+from speckle_tools.transform import _is_number_list
+
+
+def share_copy(obj, memo: Optional[dict] = None):
+    """
+    Structural copy of `obj` that shares every flat numeric list with the original.
+
+    Base objects, dicts (e.g. `properties`) and lists of objects are new, so
+    setting attributes or properties on the copy never touches the source.
+    """
+    if memo is None:
+        memo = {}
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    key = id(obj)
+    if key in memo:
+        return memo[key]
+
+    if isinstance(obj, list):
+        if _is_number_list(obj):
+            return obj
+        out = []
+        memo[key] = out
+        out.extend(share_copy(item, memo) for item in obj)
+        return out
+    if isinstance(obj, dict):
+        out = {}
+        memo[key] = out
+        for k, v in obj.items():
+            out[k] = share_copy(v, memo)
+        return out
+    if isinstance(obj, Base):
+        clone = copy.copy(obj)
+        memo[key] = clone
+        for name, value in obj.__dict__.items():
+            clone.__dict__[name] = share_copy(value, memo)
+        return clone
+    return obj
+
+
+class _ChunkRefs(list):
+    """Already-serialized chunk ids standing in for a shared buffer."""
+
+
+class SharingSerializer(BaseObjectSerializer):
+    """
+    BaseObjectSerializer that remembers the DataChunk ids of every chunkable
+    buffer it has written. When another object points at the same list, the
+    stored references are reused: no re-chunking, re-hashing or re-upload.
+    """
+
+    def __init__(self, write_transports: Optional[List[AbstractTransport]] = None,
+                 read_transport: Optional[AbstractTransport] = None) -> None:
+        super().__init__(write_transports=write_transports, read_transport=read_transport)
+        # id(list) -> (list, chunk ids); the list is kept alive so ids can't be reused
+        self._chunk_memo: Dict[int, Tuple[list, List[str]]] = {}
+        self.reused_buffers = 0
+
+    def _traverse_base(self, base: Base) -> Tuple[str, Dict]:
+        if not self.write_transports or not base._chunkable:
+            return super()._traverse_base(base)
+
+        buffers = {}
+        for prop in base._chunkable:
+            value = base.__dict__.get(prop)
+            if isinstance(value, list) and value:
+                buffers[prop] = value
+        swapped = {
+            prop: value for prop, value in buffers.items()
+            if self._chunk_memo.get(id(value), (None,))[0] is value
+        }
+
+        own_chunkable = base.__dict__.get("_chunkable")
+        if swapped:
+            # Serialize the reused props as plain ref lists (same JSON as the chunk path).
+            # Member names are resolved up front: computed props like Mesh.vertices_count
+            # would choke on the stand-in list.
+            props = base.get_serializable_attributes()
+            base.__dict__["get_serializable_attributes"] = lambda: list(props)
+            base.__dict__["_chunkable"] = {k: v for k, v in base._chunkable.items() if k not in swapped}
+            for prop, value in swapped.items():
+                base.__dict__[prop] = _ChunkRefs(self._chunk_memo[id(value)][1])
+            self.reused_buffers += len(swapped)
+        try:
+            obj_id, builder = super()._traverse_base(base)
+        finally:
+            if swapped:
+                base.__dict__.update(swapped)
+                del base.__dict__["get_serializable_attributes"]
+                if own_chunkable is None:
+                    del base.__dict__["_chunkable"]
+                else:
+                    base.__dict__["_chunkable"] = own_chunkable
+
+        for prop, value in buffers.items():
+            if prop not in swapped and isinstance(builder.get(prop), list):
+                refs = [r["referencedId"] for r in builder[prop] if isinstance(r, dict) and "referencedId" in r]
+                self._chunk_memo[id(value)] = (value, refs)
+        return obj_id, builder
+
+    def traverse_value(self, obj, detach: bool = False):
+        if isinstance(obj, _ChunkRefs):
+            return [self.detach_helper(ref_id=ref_id) for ref_id in obj]
+        return super().traverse_value(obj, detach)
+
+
+def send(base: Base, transports: Optional[List[AbstractTransport]] = None,
+         use_default_cache: bool = True) -> str:
+    """Drop-in for `operations.send` that serializes shared buffers only once."""
+    if not transports and not use_default_cache:
+        raise SpeckleException(
+            "You need to provide at least one transport: cannot send with an empty"
+            " transport list and no default cache"
+        )
+    transports = list(transports or [])
+    if use_default_cache:
+        transports.insert(0, SQLiteTransport())
+
+    serializer = SharingSerializer(write_transports=transports)
+    obj_id, _ = serializer.write_json(base=base)
+    return obj_id
@@ -0,0 +1,202 @@
+"""
+One process backing up many projects
+
+    config (JSON) --> N VersionListeners, `per_connection` projects per websocket
+                  --> one BackupPipeline (shared fetch workers + HTTP pool)
+                  --> per-project writer (own directory / format)
+
+- subscriptions are multiplexed: one websocket carries up to `per_connection`
+  projectVersionsUpdated operations, so 300 projects are 6 connections, not 300
+- catch-up queries of every connection share one AsyncSpeckleSession
+- per-project filters (model ids, commit-message regex) run before anything is fetched
+- per project the process only keeps a small checkpoint and a lazily created writer
+
+Config:
+
+    {
+      "defaults": {"format": "store", "dir": "speckle_backups/{project}"},
+      "projects": [
+        {"id": "128262a20c", "name": "tower"},
+        {"id": "a1b2c3d4e5", "models": ["f00ba47"], "message_filter": "^release", "format": "jsonl.zst"}
+      ]
+    }
+"""
+
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from speckle_tools.backup import BackupPipeline, BackupWriter, make_writer
+from speckle_tools.client import AsyncSpeckleSession
+from speckle_tools.formats import extension
+from speckle_tools.listener import Checkpoint, VersionListener, http_url
+
+DEFAULT_DIR = "speckle_backups/{project}"
+DEFAULT_PER_CONNECTION = 50
+
+
+class ProjectConfig:
+    """One watched project: where its backups go and which versions count."""
+
+    def __init__(self, id: str, name: Optional[str] = None, dir: str = DEFAULT_DIR, format: str = "store",
+                 models: Optional[List[str]] = None, message_filter: Optional[str] = None):
+        if format != "store":
+            extension(format)  # fail fast on a typo
+        self.id = id
+        self.name = name or id
+        self.dir = dir.format(project=id, name=self.name)
+        self.format = format
+        self.models = set(models) if models else None
+        self.message_filter = re.compile(message_filter) if message_filter else None
+
+    def accepts(self, evt: dict) -> bool:
+        if self.models is not None and evt.get("modelId") not in self.models:
+            return False
+        if self.message_filter is not None:
+            message = (evt.get("version") or {}).get("message") or ""
+            if not self.message_filter.search(message):
+                return False
+        return True
+
+
+def load_listener_config(path: str) -> List[ProjectConfig]:
+    """Projects from a JSON config; relative backup dirs are relative to the config file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    defaults = data.get("defaults") or {}
+    base = os.path.dirname(os.path.abspath(path))
+    projects = []
+    for entry in data.get("projects") or []:
+        entry = {"id": entry} if isinstance(entry, str) else entry
+        if not entry.get("id"):
+            raise ValueError(f"Project without an id in {path}: {entry}")
+        cfg = ProjectConfig(**{**defaults, **entry})
+        cfg.dir = os.path.join(base, cfg.dir)
+        projects.append(cfg)
+    if len({p.id for p in projects}) != len(projects):
+        raise ValueError(f"Duplicate project ids in {path}")
+    return projects
+
+
+class FanInListener:
+    """
+    Args:
+        projects: from `load_listener_config`
+        ws_url: e.g. wss://app.speckle.systems/graphql
+        token: personal access token
+        checkpoint_dir: one small checkpoint file per project goes here (None = memory only)
+        per_connection: subscriptions multiplexed over one websocket
+        fetch_workers / queue_size / on_full / report_every / resolve_children / projection: see BackupPipeline
+            (a projection needs every project on a file format, not "store")
+        keep_alive_timeout / backoff_max / heartbeat_every: see VersionListener
+    """
+
+    def __init__(self, projects: List[ProjectConfig], ws_url: str, token: str,
+                 checkpoint_dir: Optional[str] = None, per_connection: int = DEFAULT_PER_CONNECTION,
+                 fetch_workers: int = 8, queue_size: int = 256, on_full: str = "wait",
+                 report_every: float = 0.0, resolve_children: bool = False, projection=None,
+                 keep_alive_timeout: float = 60.0, backoff_max: float = 300.0, heartbeat_every: float = 0.0):
+        if not projects:
+            raise ValueError("No projects to listen to")
+        stored = [p.name for p in projects if p.format == "store"]
+        if projection is not None and stored:
+            raise ValueError(f"A projection can't be combined with the deduplicated store (projects: "
+                             f"{', '.join(stored[:5])}{', ...' if len(stored) > 5 else ''}); "
+                             f"give them a file format such as jsonl.zst")
+        self.projects: Dict[str, ProjectConfig] = {p.id: p for p in projects}
+        self.ws_url = ws_url
+        self.token = token
+        self.checkpoint_dir = checkpoint_dir
+        self.per_connection = max(1, per_connection)
+        self.keep_alive_timeout = keep_alive_timeout
+        self.backoff_max = backoff_max
+        self.heartbeat_every = heartbeat_every
+        self.filtered = 0
+
+        self._writers: Dict[str, BackupWriter] = {}
+        self._listeners: Dict[str, VersionListener] = {}
+        self.pipeline = BackupPipeline(
+            project_id=None,
+            graphql_url=f"{http_url(ws_url)}/graphql",
+            token=token,
+            writer=self._write,
+            fetch_workers=fetch_workers,
+            queue_size=queue_size,
+            on_full=on_full,
+            report_every=report_every,
+            resolve_children=resolve_children,
+            projection=projection,
+            on_written=self._done,
+        )
+
+    # -- routing --
+
+    def _checkpoint(self, project_id: str) -> Checkpoint:
+        if not self.checkpoint_dir:
+            return Checkpoint()
+        return Checkpoint(os.path.join(self.checkpoint_dir, f".listener_checkpoint_{project_id}.json"))
+
+    def _write(self, payload: dict, received_at: datetime) -> str:
+        # runs in the pipeline's single writer thread, so creating writers here is race-free
+        pid = payload["projectId"]
+        if pid not in self._writers:
+            cfg = self.projects[pid]
+            self._writers[pid] = make_writer(cfg.dir, cfg.format)
+        return self._writers[pid](payload, received_at)
+
+    def _done(self, evt: dict) -> None:
+        listener = self._listeners.get(evt.get("projectId"))
+        if listener is not None:
+            listener.done(evt)
+
+    async def _handle(self, evt: dict, received_at: datetime) -> bool:
+        pid = evt["projectId"]
+        if not self.projects[pid].accepts(evt):
+            self.filtered += 1
+            self._done(evt)  # nothing to back up, but don't catch it up again either
+            return False
+        ver = evt.get("version") or {}
+        print(f"🔔 {self.projects[pid].name}: version {ver.get('id')} on model {evt.get('modelId')}"
+              + (" (catch-up)" if evt.get("type") == "catch_up" else ""))
+        return await self.pipeline.submit(evt, received_at)
+
+    # -- main loop --
+
+    def _shards(self) -> List[List[str]]:
+        ids = list(self.projects)
+        return [ids[i:i + self.per_connection] for i in range(0, len(ids), self.per_connection)]
+
+    async def run(self) -> None:
+        """Listen on every project until cancelled."""
+        if self.checkpoint_dir:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+        await self.pipeline.start()
+        async with AsyncSpeckleSession(http_url(self.ws_url), self.token) as http:
+            shards = self._shards()
+            listeners = [
+                VersionListener(
+                    project_id=ids,
+                    ws_url=self.ws_url,
+                    token=self.token,
+                    handler=self._handle,
+                    checkpoint=self._checkpoint,
+                    http=http,
+                    keep_alive_timeout=self.keep_alive_timeout,
+                    backoff_max=self.backoff_max,
+                    heartbeat_every=self.heartbeat_every,
+                )
+                for ids in shards
+            ]
+            for listener in listeners:
+                for pid in listener.project_ids:
+                    self._listeners[pid] = listener
+            print(f"👂 {len(self.projects)} project(s) over {len(listeners)} connection(s)")
+            try:
+                await asyncio.gather(*(listener.run() for listener in listeners))
+            finally:
+                await self.pipeline.stop()
+                if self.filtered:
+                    print(f"   {self.filtered} version(s) skipped by project filters")
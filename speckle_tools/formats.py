@@ -0,0 +1,339 @@
+"""
+Backup file formats
+
+- "json"       pretty-printed JSON, the original 7_HW-Listening.py format
+- "jsonl.gz"   gzip-compressed JSON lines: a header line, one line per object
+  "jsonl.zst"  (children first, see store.split_tree) and a final root line.
+               Written and read as a stream; zstd needs the `zstandard` package.
+- "spkb"       binary container: big numeric arrays (vertices, faces, colors,
+               normals, ...) stored raw so they can be memory-mapped, plus a
+               compact JSON tree pointing at them. All-integer lists are kept
+               as int32 / int64, anything else as float64 with a bit mask of
+               the items that were ints, so a restored backup serializes (and
+               hashes) exactly like the original.
+
+spkb is about fast, zero-copy access to the arrays, not size: raw float64 is
+barely smaller than the JSON text (~1.4x on the fixtures). jsonl.gz / jsonl.zst
+are the formats that shrink backups.
+
+spkb layout:
+    b"SPKB0001" | array 0 | array 1 | ... | tree JSON | index JSON | u64 index offset | u64 index length
+Every array starts on an 8-byte boundary; the index holds offset / dtype / length per array.
+"""
+
+import gzip
+import io
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from speckle_tools.store import expand_tree, split_tree
+
+FORMATS = ("json", "jsonl.gz", "jsonl.zst", "spkb")
+
+SPKB_MAGIC = b"SPKB0001"
+ARRAY_REF = "__array"
+# numeric lists shorter than this stay inline in the tree
+MIN_ARRAY_LENGTH = 16
+
+
+def extension(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown backup format {fmt!r}, expected one of {FORMATS}")
+    return "." + fmt
+
+
+def detect_format(path: str) -> str:
+    for fmt in FORMATS:
+        if path.endswith("." + fmt):
+            return fmt
+    raise ValueError(f"Can't tell the backup format of {path}")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+# -----------------------
+# JSON lines
+# -----------------------
+
+def _open_compressed(path: str, mode: str):
+    """Text stream over a gzip / zstd file ('r' or 'w')."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("jsonl.zst backups need the 'zstandard' package (pip install zstandard)") from e
+    if mode == "w":
+        raw = zstandard.ZstdCompressor(level=6).stream_writer(open(path, "wb"), closefd=True)
+    else:
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+class JsonlWriter:
+    """Streaming writer: records go straight to the compressed file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = _open_compressed(path, "w")
+
+    def write(self, record: dict) -> None:
+        self._f.write(_dumps(record))
+        self._f.write("\n")
+
+    def write_payload(self, payload: dict) -> None:
+        obj = payload.get("object") if isinstance(payload.get("object"), dict) else None
+        header = {k: v for k, v in payload.items() if k != "object"}
+        if obj is not None:
+            header["object"] = {k: v for k, v in obj.items() if k != "data"}
+        self.write({"type": "header", "payload": header})
+        if obj is not None:
+            seen = set()
+
+            def emit(obj_id: str, stripped: dict) -> None:
+                seen.add(obj_id)
+                self.write({"type": "object", "id": obj_id, "data": stripped})
+
+            root = split_tree(obj.get("data"), emit, seen.__contains__)
+            self.write({"type": "root", "data": root})
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """Yield records one at a time without loading the file."""
+    with _open_compressed(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_jsonl(path: str) -> dict:
+    header, root, objects = {}, None, {}
+    for rec in iter_jsonl(path):
+        if rec["type"] == "header":
+            header = rec["payload"]
+        elif rec["type"] == "object":
+            objects[rec["id"]] = rec["data"]
+        elif rec["type"] == "root":
+            root = rec["data"]
+    if isinstance(header.get("object"), dict):
+        header["object"]["data"] = expand_tree(root, objects.__getitem__)
+    return header
+
+# -----------------------
+# Binary container
+# -----------------------
+
+def _pad(f, align: int = 8) -> None:
+    f.write(b"\0" * (-f.tell() % align))
+
+
+_INT64 = np.iinfo(np.int64)
+_INT32 = np.iinfo(np.int32)
+
+
+_FLOAT_EXACT = 2 ** 53  # larger ints don't survive a float64
+
+
+def _too_big(values: list) -> bool:
+    """An int that the array's dtype would round: outside int64, or beyond 2**53 next to floats (kept inline)."""
+    ints = [v for v in values if isinstance(v, int)]
+    if not ints:
+        return False
+    if len(ints) == len(values):
+        return not _INT64.min <= min(ints) <= max(ints) <= _INT64.max
+    return max(abs(min(ints)), abs(max(ints))) > _FLOAT_EXACT
+
+
+def _as_array(values: list) -> np.ndarray:
+    if all(isinstance(v, int) for v in values):
+        arr = np.asarray(values, dtype=np.int64)
+        fits = not arr.size or (arr.min() >= _INT32.min and arr.max() <= _INT32.max)
+        return arr.astype("<i4" if fits else "<i8")
+    return np.asarray(values, dtype="<f8")
+
+
+class BinaryWriter:
+    """
+    spkb writer. Arrays go to the file as they are met, but the tree and index
+    are written at the end, so the payload is held in memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "wb")
+        self._f.write(SPKB_MAGIC)
+        self.index: List[dict] = []
+
+    def add_array(self, values, key: str = "") -> int:
+        """
+        Store `values` raw: as integers if every item is an int that fits in int64,
+        else as float64, plus a bit mask array ("ints") of the items that were ints.
+        """
+        arr = _as_array(values)
+        i = self._write(arr, key)
+        if arr.dtype.kind == "f":
+            was_int = np.fromiter((isinstance(v, int) for v in values), dtype=bool, count=len(values))
+            if was_int.any():
+                self.index[i]["ints"] = self._write(np.packbits(was_int), key + "#ints")
+        return i
+
+    def _write(self, arr: np.ndarray, key: str) -> int:
+        _pad(self._f)
+        self.index.append({"offset": self._f.tell(), "dtype": arr.dtype.str, "length": int(arr.size), "key": key})
+        self._f.write(arr.tobytes())
+        return len(self.index) - 1
+
+    def _strip_arrays(self, value, key: str = ""):
+        if isinstance(value, list):
+            if len(value) >= MIN_ARRAY_LENGTH and isinstance(value[0], (int, float)) and not isinstance(value[0], bool):
+                if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value) \
+                        and not _too_big(value):
+                    return {ARRAY_REF: self.add_array(value, key)}
+            return [self._strip_arrays(v, key) for v in value]
+        if isinstance(value, dict):
+            return {k: self._strip_arrays(v, k) for k, v in value.items()}
+        return value
+
+    def write_payload(self, payload: dict) -> None:
+        tree = self._strip_arrays(payload)
+        _pad(self._f)
+        tree_offset = self._f.tell()
+        tree_bytes = _dumps(tree).encode("utf-8")
+        self._f.write(tree_bytes)
+        index = {"arrays": self.index, "tree": {"offset": tree_offset, "length": len(tree_bytes)}}
+        index_bytes = _dumps(index).encode("utf-8")
+        index_offset = self._f.tell()
+        self._f.write(index_bytes)
+        self._f.write(struct.pack("<QQ", index_offset, len(index_bytes)))
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryBackup:
+    """
+    Memory-mapped spkb reader. `tree` is the payload with {"__array": i}
+    placeholders; `array(i)` is a zero-copy NumPy view into the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(SPKB_MAGIC)] != SPKB_MAGIC:
+            raise ValueError(f"{path} is not an spkb backup")
+        index_offset, index_length = struct.unpack("<QQ", self._mm[-16:])
+        self.index = json.loads(self._mm[index_offset:index_offset + index_length])
+        t = self.index["tree"]
+        self.tree = json.loads(self._mm[t["offset"]:t["offset"] + t["length"]])
+
+    @property
+    def arrays(self) -> List[dict]:
+        return self.index["arrays"]
+
+    def array(self, i: int) -> np.ndarray:
+        a = self.arrays[i]
+        return np.frombuffer(self._mm, dtype=np.dtype(a["dtype"]), count=a["length"], offset=a["offset"])
+
+    def values(self, i: int) -> list:
+        """Array `i` as a plain list, items that were ints in the original as ints again."""
+        out = self.array(i).tolist()
+        mask = self.arrays[i].get("ints")
+        if mask is not None:
+            was_int = np.unpackbits(self.array(mask), count=len(out)).astype(bool)
+            for j in np.flatnonzero(was_int).tolist():
+                out[j] = int(out[j])
+        return out
+
+    def fill(self, value):
+        """`value` (part of `tree`) with its array placeholders replaced by plain lists."""
+        if isinstance(value, dict):
+            if len(value) == 1 and ARRAY_REF in value:
+                return self.values(value[ARRAY_REF])
+            return {k: self.fill(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.fill(v) for v in value]
+        return value
+
+    def load(self) -> dict:
+        """Full payload with plain lists, as the json format would give."""
+        return self.fill(self.tree)
+
+    def close(self) -> None:
+        self.tree = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# -----------------------
+# Dispatch
+# -----------------------
+
+def write_backup(payload: dict, path: str, fmt: Optional[str] = None) -> str:
+    fmt = fmt or detect_format(path)
+    if fmt == "json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+    elif fmt == "spkb":
+        with BinaryWriter(path) as w:
+            w.write_payload(payload)
+    else:
+        with JsonlWriter(path) as w:
+            w.write_payload(payload)
+    return path
+
+
+def read_backup(path: str) -> dict:
+    fmt = detect_format(path)
+    if fmt == "json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    if fmt == "spkb":
+        with BinaryBackup(path) as b:
+            return b.load()
+    return read_jsonl(path)
+
+
+def describe(path: str) -> Dict:
+    """Cheap summary of a backup file (spkb / jsonl are not fully loaded)."""
+    fmt = detect_format(path)
+    info = {"path": path, "format": fmt, "bytes": os.path.getsize(path)}
+    if fmt == "spkb":
+        with BinaryBackup(path) as b:
+            info["arrays"] = len(b.arrays)
+            info["array_values"] = sum(a["length"] for a in b.arrays)
+            info["versionId"] = b.tree.get("versionId")
+    elif fmt.startswith("jsonl"):
+        counts: Dict[str, int] = {}
+        for rec in iter_jsonl(path):
+            counts[rec["type"]] = counts.get(rec["type"], 0) + 1
+            if rec["type"] == "header":
+                info["versionId"] = rec["payload"].get("versionId")
+        info["records"] = counts
+    return info
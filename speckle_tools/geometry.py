@@ -0,0 +1,345 @@
+"""
+Geometry statistics computed from the displayValue meshes themselves
+
+Connectors send `bbox: null` and whatever area / volume they computed. This
+pass measures the meshes instead:
+
+- n-gon `faces` lists are decoded and fan-triangulated in bulk (NumPy, no
+  per-face Python work for all-triangle / all-quad meshes)
+- every mesh of the tree goes into one vertex array and one triangle array, so
+  bbox, surface area, signed volume and centroid of all meshes come out of a
+  handful of vectorised operations (linear in the number of faces)
+- the per-mesh numbers are rolled up per element (displayValue owner) and per
+  collection, and written back onto those: `bbox` (when missing) and a
+  "Geometry" entry in `properties` (area, volume, centroid, bbox, counts).
+  The meshes themselves are left alone unless asked (`write_meshes`), so the
+  numbers aren't repeated on every displayValue of an upload
+
+Works on received `Base` trees (before `operations.send`) and on resolved JSON
+trees from backups. Values are in the units of each node's first mesh.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from specklepy.objects.base import Base
+
+from speckle_tools.transform import MESH_BUFFERS, _as_xyz, _member_names
+
+PROPERTY_KEY = "Geometry"
+
+# metres per unit
+UNIT_SCALE = {"mm": 1e-3, "cm": 1e-2, "m": 1.0, "km": 1e3, "in": 0.0254, "ft": 0.3048, "yd": 0.9144, "mi": 1609.344}
+
+# closed meshes with |volume| below this (relative to bbox volume) use the surface centroid
+_FLAT_VOLUME = 1e-9
+
+# -----------------------
+# Faces
+# -----------------------
+
+def _face_starts(f: np.ndarray) -> np.ndarray:
+    """Index of every face's vertex count in an n-gon face list."""
+    for n, codes in ((3, (3, 0)), (4, (4, 1))):
+        # one consistent stride from the start: the sequential parse gives the same faces
+        if f.size % (n + 1) == 0 and np.isin(f[::n + 1], codes).all():
+            return np.arange(0, f.size, n + 1)
+    starts = []
+    values = f.tolist()
+    i = 0
+    while i < len(values):
+        starts.append(i)
+        n = values[i]
+        i += (n + 3 if n < 3 else n) + 1  # legacy encoding: 0 = triangle, 1 = quad
+    if i != len(values):
+        raise ValueError("Malformed faces list: the last face runs past the end")
+    return np.asarray(starts, dtype=np.int64)
+
+
+def triangulate(faces: Sequence[int]) -> np.ndarray:
+    """
+    (T, 3) vertex indices for a Speckle faces list ([n, i0, .., in-1, n, ...]),
+    each n-gon split into a fan around its first vertex.
+    """
+    f = faces if isinstance(faces, np.ndarray) else np.fromiter(faces, dtype=np.int64, count=len(faces))
+    if f.size == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    starts = _face_starts(f)
+    counts = f[starts]
+    counts = np.where(counts < 3, counts + 3, counts)
+    ntri = counts - 2
+    if (ntri < 1).any():
+        raise ValueError("Malformed faces list: face with fewer than 3 vertices")
+    face = np.repeat(np.arange(len(starts)), ntri)
+    j = np.arange(len(face)) - np.repeat(np.cumsum(ntri) - ntri, ntri) + 1
+    first = starts[face] + 1
+    return np.stack([f[first], f[first + j], f[first + j + 1]], axis=1)
+
+# -----------------------
+# Stats
+# -----------------------
+
+class GeometryStats:
+    """Measures of one mesh or of a group of meshes."""
+
+    def __init__(self, bbox_min: np.ndarray, bbox_max: np.ndarray, area: float, volume: float,
+                 centroid: np.ndarray, meshes: int, triangles: int, vertices: int, units: Optional[str]):
+        self.bbox_min = bbox_min
+        self.bbox_max = bbox_max
+        self.area = area
+        self.volume = volume
+        self.centroid = centroid
+        self.meshes = meshes
+        self.triangles = triangles
+        self.vertices = vertices
+        self.units = units
+
+    def to_properties(self) -> dict:
+        return {
+            "area": self.area,
+            "volume": self.volume,
+            "centroid": self.centroid.tolist(),
+            "bboxMin": self.bbox_min.tolist(),
+            "bboxMax": self.bbox_max.tolist(),
+            "meshes": self.meshes,
+            "triangles": self.triangles,
+            "vertices": self.vertices,
+            "units": self.units,
+        }
+
+
+class _MeshTable:
+    """Per-mesh results of the bulk pass, as arrays indexed by mesh number."""
+
+    def __init__(self, meshes: List, units: List[Optional[str]]):
+        verts, tris, tri_mesh, vert_counts = [], [], [], []
+        offset = 0
+        for k, mesh in enumerate(meshes):
+            v = _as_xyz(_get(mesh, "vertices"))
+            t = triangulate(_get(mesh, "faces") or [])
+            if len(t) and t.max() >= len(v):
+                raise ValueError(f"Mesh {_get(mesh, 'id')} has faces pointing past its vertices")
+            verts.append(v)
+            tris.append(t + offset)
+            tri_mesh.append(np.full(len(t), k, dtype=np.int64))
+            vert_counts.append(len(v))
+            offset += len(v)
+
+        m = len(meshes)
+        V = np.concatenate(verts) if verts else np.zeros((0, 3))
+        T = np.concatenate(tris) if tris else np.zeros((0, 3), dtype=np.int64)
+        owner = np.concatenate(tri_mesh) if tri_mesh else np.zeros(0, dtype=np.int64)
+        self.units = units
+        self.vertices = np.asarray(vert_counts, dtype=np.int64)
+        self.triangles = np.bincount(owner, minlength=m)
+
+        a, b, c = V[T[:, 0]], V[T[:, 1]], V[T[:, 2]]
+        cross = np.cross(b - a, c - a)
+        tri_area = 0.5 * np.linalg.norm(cross, axis=1)
+        tri_vol = np.einsum("ij,ij->i", a, np.cross(b, c)) / 6.0  # signed tetrahedron to the origin
+        corner_sum = a + b + c
+        self.area = np.bincount(owner, tri_area, minlength=m)
+        self.volume = np.bincount(owner, tri_vol, minlength=m)
+        # first moments, so groups of meshes can be combined by plain sums
+        self.area_moment = np.stack([np.bincount(owner, tri_area * corner_sum[:, i] / 3.0, minlength=m)
+                                     for i in range(3)], axis=1)
+        self.volume_moment = np.stack([np.bincount(owner, tri_vol * corner_sum[:, i] / 4.0, minlength=m)
+                                       for i in range(3)], axis=1)
+
+        self.bbox_min = np.full((m, 3), np.nan)
+        self.bbox_max = np.full((m, 3), np.nan)
+        has = self.vertices > 0
+        if has.any():
+            starts = (np.cumsum(self.vertices) - self.vertices)[has]
+            self.bbox_min[has] = np.minimum.reduceat(V, starts, axis=0)
+            self.bbox_max[has] = np.maximum.reduceat(V, starts, axis=0)
+
+    def combine(self, idx: np.ndarray, units: Optional[str]) -> GeometryStats:
+        """Stats of a group of meshes, converted to `units`."""
+        scale = np.array([_unit_factor(self.units[i], units) for i in idx])
+        area = float((self.area[idx] * scale ** 2).sum())
+        volume = float((self.volume[idx] * scale ** 3).sum())
+        lo = np.nanmin(self.bbox_min[idx] * scale[:, None], axis=0)
+        hi = np.nanmax(self.bbox_max[idx] * scale[:, None], axis=0)
+        box_volume = float(np.prod(np.maximum(hi - lo, 0.0)))
+        if abs(volume) > _FLAT_VOLUME * max(box_volume, 1e-300):
+            centroid = (self.volume_moment[idx] * (scale ** 4)[:, None]).sum(axis=0) / volume
+        elif area > 0:
+            centroid = (self.area_moment[idx] * (scale ** 3)[:, None]).sum(axis=0) / area
+        else:
+            centroid = (lo + hi) / 2.0
+        return GeometryStats(lo, hi, area, volume, centroid, len(idx),
+                             int(self.triangles[idx].sum()), int(self.vertices[idx].sum()), units)
+
+
+def _unit_factor(src: Optional[str], dst: Optional[str]) -> float:
+    if not src or not dst or src == dst or src not in UNIT_SCALE or dst not in UNIT_SCALE:
+        return 1.0
+    return UNIT_SCALE[src] / UNIT_SCALE[dst]
+
+# -----------------------
+# Tree walk
+# -----------------------
+
+def _get(obj, name: str):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _set(obj, name: str, value) -> None:
+    if isinstance(obj, dict):
+        obj[name] = value
+    else:
+        setattr(obj, name, value)
+
+
+def _is_mesh(obj) -> bool:
+    v = _get(obj, "vertices")
+    return isinstance(v, list) and bool(v) and isinstance(v[0], (int, float))
+
+
+def _members(obj):
+    if isinstance(obj, dict):
+        return list(obj.items())
+    out = []
+    for name in _member_names(obj):
+        try:
+            out.append((name, getattr(obj, name, None)))
+        except Exception:
+            pass
+    return out
+
+
+class GeometryReport:
+    """Stats per measured node: meshes, elements and collections, in tree order."""
+
+    def __init__(self):
+        self.nodes: List[tuple] = []  # (object, GeometryStats)
+        self.total: Optional[GeometryStats] = None
+
+    def collections(self) -> List[tuple]:
+        return [(o, s) for o, s in self.nodes if "Collection" in str(_get(o, "speckle_type") or "")]
+
+    def print(self) -> None:
+        t = self.total
+        if t is None:
+            print("No meshes found")
+            return
+        print(f"📐 {t.meshes} meshes, {t.triangles} triangles | area {t.area:,.3f} {t.units or ''}² | "
+              f"volume {t.volume:,.3f} {t.units or ''}³")
+        for obj, s in self.collections():
+            print(f"    {str(_get(obj, 'name') or _get(obj, 'id')):<24} {s.meshes:>6} meshes  "
+                  f"area {s.area:14,.3f}  volume {s.volume:16,.3f}")
+
+
+def analyze(root, write: bool = True, write_meshes: bool = False) -> GeometryReport:
+    """
+    Measure every displayValue mesh under `root` (a Base or a resolved JSON tree)
+    and roll the numbers up to each object that owns meshes. With `write`, each
+    such object gets properties["Geometry"] and, if it has none, a `bbox`;
+    the meshes too only with `write_meshes`.
+    """
+    meshes: List = []
+    mesh_index: Dict[int, int] = {}
+    units: List[Optional[str]] = []
+    nodes: List[tuple] = []  # (object, mesh indices under it, units, is a mesh)
+
+    def visit(obj, inherited_units: Optional[str], stack: set) -> List[int]:
+        if id(obj) in stack:
+            return []
+        own_units = _get(obj, "units") if isinstance(_get(obj, "units"), str) else inherited_units
+        if _is_mesh(obj):
+            if id(obj) not in mesh_index:
+                mesh_index[id(obj)] = len(meshes)
+                meshes.append(obj)
+                units.append(own_units)
+            idx = [mesh_index[id(obj)]]
+            nodes.append((obj, idx, own_units, True))
+            return idx
+        stack.add(id(obj))
+        found: List[int] = []
+        for name, value in _members(obj):
+            if name in MESH_BUFFERS or name == "bbox":
+                continue
+            for child in _children(value):
+                found.extend(visit(child, own_units, stack))
+        stack.discard(id(obj))
+        if found:
+            found = list(dict.fromkeys(found))
+            nodes.append((obj, found, own_units, False))
+        return found
+
+    all_idx = visit(root, None, set())
+    report = GeometryReport()
+    if not meshes:
+        return report
+
+    table = _MeshTable(meshes, units)
+    for obj, idx, node_units, is_mesh in nodes:
+        node_units = node_units or units[idx[0]]
+        stats = table.combine(np.asarray(idx), node_units)
+        report.nodes.append((obj, stats))
+        if write and (write_meshes or not is_mesh):
+            _write_back(obj, stats)
+    report.total = table.combine(np.asarray(all_idx), _get(root, "units") or units[all_idx[0]])
+    return report
+
+
+def _children(value):
+    if isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            return
+        for v in value:
+            yield from _children(v)
+    elif isinstance(value, Base) or (isinstance(value, dict) and "speckle_type" in value):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _children(v)
+
+
+def _write_back(obj, stats: GeometryStats) -> None:
+    props = _get(obj, "properties")
+    if not isinstance(props, dict):
+        props = {}
+        _set(obj, "properties", props)
+    props[PROPERTY_KEY] = stats.to_properties()
+    if _get(obj, "bbox") is None and not any(math.isnan(v) for v in stats.bbox_min):
+        _set(obj, "bbox", _make_box(stats, as_dict=isinstance(obj, dict)))
+
+
+def _make_box(stats: GeometryStats, as_dict: bool):
+    """World-aligned Speckle Box around the stats' bbox."""
+    lo, hi, units = stats.bbox_min.tolist(), stats.bbox_max.tolist(), stats.units or "m"
+    if as_dict:
+        def vec(x, y, z, kind):
+            return {"speckle_type": f"Objects.Geometry.{kind}", "x": x, "y": y, "z": z, "units": units}
+
+        return {
+            "speckle_type": "Objects.Geometry.Box",
+            "basePlane": {"speckle_type": "Objects.Geometry.Plane", "origin": vec(0.0, 0.0, 0.0, "Point"),
+                          "normal": vec(0.0, 0.0, 1.0, "Vector"), "xdir": vec(1.0, 0.0, 0.0, "Vector"),
+                          "ydir": vec(0.0, 1.0, 0.0, "Vector"), "units": units},
+            **{f"{axis}Size": {"speckle_type": "Objects.Primitive.Interval", "start": lo[i], "end": hi[i]}
+               for i, axis in enumerate("xyz")},
+            "units": units,
+        }
+
+    from specklepy.objects.geometry.box import Box
+    from specklepy.objects.geometry.plane import Plane
+    from specklepy.objects.geometry.point import Point
+    from specklepy.objects.geometry.vector import Vector
+    from specklepy.objects.primitive import Interval
+
+    return Box(
+        basePlane=Plane(origin=Point(x=0.0, y=0.0, z=0.0, units=units),
+                        normal=Vector(x=0.0, y=0.0, z=1.0, units=units),
+                        xdir=Vector(x=1.0, y=0.0, z=0.0, units=units),
+                        ydir=Vector(x=0.0, y=1.0, z=0.0, units=units), units=units),
+        xSize=Interval(start=lo[0], end=hi[0]),
+        ySize=Interval(start=lo[1], end=hi[1]),
+        zSize=Interval(start=lo[2], end=hi[2]),
+        units=units,
+    )
@@ -0,0 +1,472 @@
+"""
+Incremental recompute: process only what changed since the previous version
+
+    processor = IncrementalProcessor(session, PROJECT_ID, tag_properties(rows),
+                                     state_path=".incremental/<model>.json", key="designers-v1")
+    result = processor.run(root_id)          # root object id of the new version
+    result.print()                           # result.root_id: the derived tree, uploaded
+
+Every Speckle object, detached or embedded in its parent, carries an id that
+hashes its content including its children's ids. So per model we remember
+which source id became which derived id, and on the next version
+- an element (default: anything with a displayValue) whose id was processed
+  before is reused: not processed again, and not downloaded if detached
+- a detached subtree seen before is not downloaded at all
+- only objects on the way from the root to a changed element are downloaded
+  (batched /api/getobjects, one round per tree level) and rewritten with the
+  new child ids, __closure tables and ids; the new objects are uploaded in
+  batches, root last (speckle_tools.upload)
+
+so a one-module edit on a 200-module tower downloads and processes one module,
+as long as modules are detached (speckle_tools.tower detaches them). An
+element embedded in its parent comes with it: the parent and all of its
+embedded elements are downloaded and rehashed, only `process` is skipped.
+
+`process(obj)` gets an element's raw JSON (children as references) and returns
+the new JSON. It may only change the element's own members, has to depend on
+nothing but that object (results are cached by its id), and should leave an
+already processed element as it is. Change `key` whenever the processing
+changes, so old results are dropped.
+
+`IncrementalRecompute` runs this for every version event of a listener and
+commits the derived tree as a version of a target model.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import ujson
+from specklepy.serialization.base_object_serializer import hash_obj
+
+from speckle_tools.diff import ServerSource
+from speckle_tools.metrics import METRICS
+from speckle_tools.queries import M_CREATE_VERSION, Q_VERSION_REFERENCED_OBJECT
+from speckle_tools.resolve import REFERENCE_TYPE, reference_ids
+from speckle_tools.store import _atomic_write
+from speckle_tools.tower import COLLECTION_COLUMN, MODULE_COLUMN, is_reserved
+from speckle_tools.transform import MESH_BUFFERS
+from speckle_tools.upload import ChunkedUploadTransport
+
+SOURCE_APPLICATION = "speckle_tools.incremental"
+# members that are bookkeeping, not content
+HASH_KEYS = ("id", "__closure", "totalChildrenCount")
+
+# process(obj) -> new obj, both raw JSON with children as references
+Processor = Callable[[dict], dict]
+
+
+def is_element(obj: dict) -> bool:
+    """Default unit of work: an object with a display value (BrepX, module, ...)."""
+    return "displayValue" in obj or "@displayValue" in obj
+
+
+def _is_ref(value: dict) -> bool:
+    return value.get("speckle_type") == REFERENCE_TYPE and "referencedId" in value
+
+
+def _is_node(value: dict) -> bool:
+    """An embedded Speckle object (has its own id)."""
+    return isinstance(value.get("id"), str) and "speckle_type" in value
+
+
+def _is_numbers(value: list) -> bool:
+    return bool(value) and isinstance(value[0], (int, float))
+
+
+def _refs_below(obj: dict, element: Callable[[dict], bool]) -> List[str]:
+    """Detached children reachable without entering an element or a mesh buffer."""
+    found = []
+    stack = [v for k, v in obj.items() if k not in MESH_BUFFERS and k != "__closure"]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, dict):
+            if _is_ref(v):
+                found.append(v["referencedId"])
+            elif not (_is_node(v) and element(v)):
+                stack.extend(x for k, x in v.items() if k not in MESH_BUFFERS and k != "__closure")
+        elif isinstance(v, list) and not _is_numbers(v):
+            stack.extend(v)
+    return list(dict.fromkeys(found))
+
+
+def _own_refs(obj: dict) -> List[str]:
+    return sorted(reference_ids({k: v for k, v in obj.items() if k != "__closure"}))
+
+
+def _patch(old: dict, new: dict) -> dict:
+    """Top-level members `process` changed: {"set": {...}, "unset": [...]}."""
+    return {"set": {k: v for k, v in new.items() if k not in HASH_KEYS and (k not in old or old[k] != v)},
+            "unset": [k for k in old if k not in new and k not in HASH_KEYS]}
+
+
+def _ordered(obj: dict, object_id: str, closure: Optional[Dict[str, int]]) -> dict:
+    """
+    Members in the order specklepy serializes them (id, speckle_type,
+    totalChildrenCount, the rest sorted by name, __closure), since the order is
+    part of what gets hashed, here and in every parent embedding the object.
+    """
+    new = {"id": object_id, "speckle_type": obj.get("speckle_type", "Base"),
+           "totalChildrenCount": len(closure or {})}
+    new.update((k, obj[k]) for k in sorted(obj) if k not in HASH_KEYS and k != "speckle_type")
+    if closure:
+        new["__closure"] = closure
+    return new
+
+
+def _apply(obj: dict, patch: dict, new_id: str) -> dict:
+    """`patch` applied to `obj`, laid out as _rehash left it."""
+    new = {k: v for k, v in obj.items() if k not in patch["unset"]}
+    new.update(copy.deepcopy(patch["set"]))
+    return _ordered(new, new_id, obj.get("__closure"))
+
+
+def _rehash(obj: dict, mapping: Dict[str, str]) -> dict:
+    """New id, __closure and totalChildrenCount for a changed object, hashed like specklepy does."""
+    closure: Dict[str, int] = {}
+    for ref, depth in (obj.get("__closure") or {}).items():
+        ref = mapping.get(ref, ref)
+        closure[ref] = min(depth, closure.get(ref, depth))
+    body = _ordered(obj, "", None)
+    body["totalChildrenCount"] = len(closure)
+    return _ordered(body, hash_obj(body), closure)
+
+# -----------------------
+# Processors
+# -----------------------
+
+def tag_properties(rows: List[Dict[str, str]], key: str = MODULE_COLUMN) -> Processor:
+    """
+    Set the columns of a property table (speckle_tools.tower.load_property_table)
+    on every element, as top-level members and in `properties`, like the tower
+    generator does. The row is picked by the element's `key` value: the row
+    whose `key` column matches, or, when the table has no such column, row
+    n - 1 (repeating) for module number n.
+    """
+    by_key = {str(r[key]): r for r in rows if r.get(key) not in (None, "")}
+
+    def process(obj: dict) -> dict:
+        props = obj.get("properties") if isinstance(obj.get("properties"), dict) else {}
+        value = obj.get(key, props.get(key))
+        if value is None:
+            return obj
+        row = by_key.get(str(value))
+        if row is None and not by_key and str(value).isdigit() and rows:
+            row = rows[(int(value) - 1) % len(rows)]
+        if row is None:
+            return obj
+        tags = {k: v for k, v in row.items() if k not in (key, COLLECTION_COLUMN) and v not in (None, "")}
+        obj.update((k, v) for k, v in tags.items() if not is_reserved(k))
+        obj["properties"] = dict(props, **tags)
+        return obj
+
+    return process
+
+# -----------------------
+# State
+# -----------------------
+
+class IncrementalState:
+    """
+    Per model, as JSON: source id -> derived id of every object seen in the
+    latest version, the members `process` changed on each element, and the
+    derived root last committed as a version (IncrementalRecompute).
+    """
+
+    def __init__(self, path: Optional[str], key: str):
+        self.path = path
+        self.key = key
+        self.source_root: Optional[str] = None
+        self.derived_root: Optional[str] = None
+        self.committed_root: Optional[str] = None
+        self.mapping: Dict[str, str] = {}
+        self.patches: Dict[str, dict] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("key") != key:
+                print(f"⚠ Processing changed ({data.get('key')!r} -> {key!r}), {path} starts over")
+            else:
+                self.source_root = data.get("sourceRoot")
+                self.derived_root = data.get("derivedRoot")
+                self.committed_root = data.get("committedRoot", self.derived_root)
+                self.mapping = data.get("map") or {}
+                self.patches = data.get("patches") or {}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        _atomic_write(self.path, json.dumps({
+            "key": self.key, "sourceRoot": self.source_root, "derivedRoot": self.derived_root,
+            "committedRoot": self.committed_root,
+            "map": self.mapping, "patches": self.patches,
+        }, separators=(",", ":"), default=str))
+
+    def keep_only(self, ids: Set[str]) -> None:
+        """Forget objects that are no longer part of the model."""
+        self.mapping = {k: v for k, v in self.mapping.items() if k in ids}
+        self.patches = {k: v for k, v in self.patches.items() if k in ids}
+
+# -----------------------
+# Processor
+# -----------------------
+
+class IncrementalResult:
+    def __init__(self, source_root: str):
+        self.source_root = source_root
+        self.root_id = source_root
+        self.fetched = 0      # source objects downloaded
+        self.processed = 0    # elements run through `process`
+        self.reused = 0       # elements / detached subtrees taken from earlier versions
+        self.new_objects = 0  # detached objects created (and uploaded)
+        self.objects: List[dict] = []  # the created objects, when run() didn't upload them
+        self.seconds = 0.0
+
+    @property
+    def changed(self) -> bool:
+        """The derived tree differs from the source (there is something to commit)."""
+        return self.root_id != self.source_root
+
+    def print(self) -> None:
+        print(f"♻ {self.processed} element(s) processed, {self.reused} reused, {self.fetched} object(s) "
+              f"downloaded, {self.new_objects} uploaded in {self.seconds:.2f} s")
+
+
+class IncrementalProcessor:
+    """
+    Args:
+        session: SpeckleSession (speckle_tools.client)
+        project_id: project the versions belong to (derived objects go there too)
+        process: element -> processed element (see module docstring)
+        state_path: JSON file keeping the previous version's results (None = memory only)
+        key: name + version of the processing; a different key discards the state
+        element: which objects are processed (default: those with a displayValue);
+            nothing below an element is downloaded
+        cache: optional ObjectCache (speckle_tools.cache) for downloaded objects
+        upload_workers: batches uploaded in parallel
+    """
+
+    def __init__(self, session, project_id: str, process: Processor, state_path: Optional[str] = None,
+                 key: str = "v1", element: Callable[[dict], bool] = is_element, cache=None,
+                 upload_workers: int = 4):
+        self.session = session
+        self.project_id = project_id
+        self.process = process
+        self.state = IncrementalState(state_path, key)
+        self.element = element
+        self.cache = cache
+        self.upload_workers = upload_workers
+
+    def run(self, root_id: str, upload: bool = True) -> IncrementalResult:
+        """
+        Derive the tree of `root_id` from the previous one. The new objects are
+        uploaded, or with `upload` False left in result.objects for the caller to
+        upload. Nothing is remembered if processing or the upload fails.
+        """
+        t = time.perf_counter()
+        result = IncrementalResult(root_id)
+        # work on copies: the state only takes them once the new objects are on the server
+        mapping, patches = dict(self.state.mapping), dict(self.state.patches)
+        if root_id in mapping:
+            result.root_id = mapping[root_id]
+            result.reused = 1
+            return result
+
+        objects = self._fetch(root_id)
+        result.fetched = len(objects)
+        seen: Set[str] = set()
+        created: List[dict] = []
+
+        def detached(ref: str) -> str:
+            if ref in mapping:
+                result.reused += 1
+                return mapping[ref]
+            obj = objects[ref]
+            new = node(obj)
+            if new is not obj:
+                created.append(new)  # children are appended before their parents, the root last
+            mapping[ref] = new["id"]
+            return new["id"]
+
+        def value(v):
+            """`v` with changed children swapped in; the same object when nothing changed."""
+            if isinstance(v, dict):
+                if _is_ref(v):
+                    ref = detached(v["referencedId"])
+                    return v if ref == v["referencedId"] else dict(v, referencedId=ref)
+                if _is_node(v):
+                    return node(v)
+                items = {k: x if k in MESH_BUFFERS else value(x) for k, x in v.items()}
+                return v if all(items[k] is x for k, x in v.items()) else items
+            if isinstance(v, list) and not _is_numbers(v):
+                items = [value(x) for x in v]
+                return v if all(a is b for a, b in zip(items, v)) else items
+            return v
+
+        def node(obj: dict) -> dict:
+            src = obj["id"]
+            seen.add(src)
+            if self.element(obj):
+                if src in patches:
+                    result.reused += 1
+                    return _apply(obj, patches[src], mapping[src])
+                if mapping.get(src) == src:
+                    result.reused += 1
+                    return obj
+                with METRICS.span("incremental_process"):
+                    new = self.process(copy.deepcopy(obj))
+                result.processed += 1
+                if _own_refs(new) != _own_refs(obj):
+                    raise ValueError(f"process() changed the children of {src}; it may only edit the object itself")
+                if new == obj:
+                    mapping[src] = src
+                    return obj
+                patches[src] = _patch(obj, new)
+            else:
+                new = {k: x if k in MESH_BUFFERS or k == "__closure" else value(x) for k, x in obj.items()}
+                if all(new[k] is x for k, x in obj.items()):
+                    mapping[src] = src
+                    return obj
+            new = _rehash(new, mapping)
+            mapping[src] = new["id"]
+            return new
+
+        result.root_id = detached(root_id)
+        result.new_objects = len(created)
+        if upload and created:
+            self._upload(created)
+        elif not upload:
+            result.objects = created
+
+        self.state.mapping, self.state.patches = mapping, patches
+        self.state.keep_only(seen | {root_id} | set(objects[root_id].get("__closure") or {}))
+        self.state.source_root, self.state.derived_root = root_id, result.root_id
+        self.state.save()
+        result.seconds = time.perf_counter() - t
+        METRICS.inc("incremental_elements_total", result.processed, result="processed")
+        METRICS.inc("incremental_elements_total", result.reused, result="reused")
+        return result
+
+    def _fetch(self, root_id: str) -> Dict[str, dict]:
+        """Detached objects not seen before, top down, one batch per level, stopping at elements."""
+        source = ServerSource(self.session.server_url, self.project_id, self.session.token, root_id, self.cache)
+        objects: Dict[str, dict] = {}
+        level = [root_id]
+        while level:
+            with METRICS.span("incremental_fetch"):
+                fetched = source.get_many(level)
+            missing = [i for i in level if i not in fetched]
+            if missing:
+                raise RuntimeError(f"Objects missing on the server: {', '.join(missing[:5])}")
+            objects.update(fetched)
+            below = (ref for obj_id in level if not self.element(objects[obj_id])
+                     for ref in _refs_below(objects[obj_id], self.element))
+            level = list(dict.fromkeys(r for r in below if r not in objects and r not in self.state.mapping))
+        return objects
+
+    def _upload(self, objects: List[dict]) -> None:
+        transport = ChunkedUploadTransport(self.session, self.project_id, workers=self.upload_workers,
+                                           journal_dir=None, report_every=None)
+        transport.begin_write()
+        for obj in objects:  # root last
+            transport.save_object(obj["id"], ujson.dumps(obj))
+        transport.end_write()
+
+# -----------------------
+# Listener hook
+# -----------------------
+
+class IncrementalRecompute:
+    """
+    Runs an IncrementalProcessor per source model for every version event
+    (VersionListener / BackupPipeline style `submit(evt)`), one at a time, and
+    commits each derived tree as a version of `target_model_id`. Events of the
+    target model itself are ignored, so its own versions never loop back.
+    `on_done(evt)` is called once an event is handled (e.g. VersionListener.done);
+    a failed one is not, and is committed on replay even if its tree was derived.
+    """
+
+    def __init__(self, session, project_id: str, process: Processor, target_model_id: str,
+                 state_dir: Optional[str] = None, key: str = "v1", element: Callable[[dict], bool] = is_element,
+                 message: str = "Incremental recompute of {model} @ {version}",
+                 on_done: Optional[Callable[[dict], None]] = None):
+        self.session = session
+        self.project_id = project_id
+        self.process = process
+        self.target_model_id = target_model_id
+        self.state_dir = state_dir
+        self.key = key
+        self.element = element
+        self.message = message
+        self.on_done = on_done
+        self.processors: Dict[str, IncrementalProcessor] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def processor(self, model_id: str) -> IncrementalProcessor:
+        if model_id not in self.processors:
+            path = os.path.join(self.state_dir, f"{self.project_id}_{model_id}.json") if self.state_dir else None
+            self.processors[model_id] = IncrementalProcessor(self.session, self.project_id, self.process, path,
+                                                             self.key, self.element)
+        return self.processors[model_id]
+
+    def handle(self, evt: dict) -> Optional[str]:
+        """Process one version event (blocking); returns the new version id, if one was created."""
+        model_id, version_id = evt.get("modelId"), (evt.get("version") or {}).get("id")
+        if not version_id or not model_id or model_id == self.target_model_id:
+            return None
+        res = self.session.execute(Q_VERSION_REFERENCED_OBJECT, projectId=self.project_id, versionId=version_id)
+        root_id = res["project"]["version"]["referencedObject"]
+        processor = self.processor(model_id)
+        state = processor.state
+        if root_id != state.source_root:
+            result = processor.run(root_id)
+            result.print()
+            if not result.changed:
+                print(f"  nothing to commit for version {version_id}")
+                return None
+        elif state.derived_root in (root_id, state.committed_root):
+            return None  # derived and committed already (catch-up replay)
+        else:
+            print(f"  derived tree of version {version_id} was never committed, committing it now")
+        res = self.session.execute(M_CREATE_VERSION, input={
+            "projectId": self.project_id, "modelId": self.target_model_id, "objectId": state.derived_root,
+            "message": self.message.format(model=model_id, version=version_id),
+            "sourceApplication": SOURCE_APPLICATION,
+        })
+        new_id = res["versionMutations"]["create"]["id"]
+        state.committed_root = state.derived_root
+        state.save()
+        print(f"✓ Derived version {new_id} created on model {self.target_model_id}")
+        return new_id
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._worker())
+
+    async def submit(self, evt: dict, received_at=None) -> bool:
+        await self.queue.put(evt)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            evt = await self.queue.get()
+            try:
+                await asyncio.to_thread(self.handle, evt)
+            except Exception as e:
+                print(f"❌ Incremental recompute failed for version {(evt.get('version') or {}).get('id')}: {e}")
+            else:
+                if self.on_done is not None:
+                    self.on_done(evt)
+            finally:
+                self.queue.task_done()
+
+    async def stop(self, drain: bool = True) -> None:
+        if drain:
+            await self.queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,279 @@
+"""
+Flat columnar index of a Speckle model
+
+One row per object, one NumPy array per column:
+
+    id, parent_id, depth, speckle_type, applicationId, name, units,
+    area, volume, bbox_min_x .. bbox_max_z, <flattened properties...>
+
+Walks a received `Base` (or a resolved JSON tree from a backup) once. Queries
+like "every object with Designer == X" or "volume per Module" are then array
+operations (`where`, `group_sum`) instead of loops over nested dicts.
+
+Written as Parquet / Arrow IPC when `pyarrow` is installed, CSV otherwise.
+"""
+
+import csv
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from specklepy.objects.base import Base
+
+from speckle_tools.transform import MESH_BUFFERS, _member_names
+
+BASE_COLUMNS = ["id", "parent_id", "depth", "speckle_type", "applicationId", "name", "units", "area", "volume"]
+BBOX_COLUMNS = [f"bbox_{side}_{axis}" for side in ("min", "max") for axis in "xyz"]
+NUMERIC_COLUMNS = {"depth", "area", "volume", *BBOX_COLUMNS}
+
+# members that are never rows or property columns of their own
+SKIP_MEMBERS = MESH_BUFFERS | {"bbox", "__closure", "totalChildrenCount", "speckle_type", "id"}
+# helper objects (intervals, planes, materials, ...) are not rows
+HELPER_TYPE_PREFIXES = ("Objects.Primitive.", "Objects.Other.RenderMaterial", "Objects.Other.RawEncoding",
+                        "Objects.Geometry.Plane", "Objects.Geometry.Vector", "Speckle.Core.Models.DataChunk")
+
+TABLE_FORMATS = (".parquet", ".arrow", ".feather", ".csv")
+
+_LEADING_ZERO = re.compile(r"^-?0\d")
+
+# -----------------------
+# Walking the model
+# -----------------------
+
+def _speckle_type(obj) -> Optional[str]:
+    if isinstance(obj, Base):
+        return obj.speckle_type
+    if isinstance(obj, dict):
+        return obj.get("speckle_type")
+    return None
+
+
+def _members(obj) -> Iterable[Tuple[str, object]]:
+    if isinstance(obj, dict):
+        yield from obj.items()
+        return
+    for name in _member_names(obj):
+        try:
+            yield name, getattr(obj, name, None)
+        except Exception:
+            pass
+
+
+def _is_row(obj) -> bool:
+    st = _speckle_type(obj)
+    return st is not None and not st.startswith(HELPER_TYPE_PREFIXES)
+
+
+def _is_scalar(value) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _flatten(prefix: str, value, out: Dict[str, object]) -> None:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}" if prefix else str(k), v, out)
+    elif _is_scalar(value):
+        out[prefix] = value
+
+
+def _vertex_bounds(vertices) -> Optional[np.ndarray]:
+    if not isinstance(vertices, list) or len(vertices) < 3 or not isinstance(vertices[0], (int, float)):
+        return None
+    xyz = np.fromiter(vertices, dtype=np.float64, count=len(vertices) // 3 * 3).reshape(-1, 3)
+    return np.concatenate([xyz.min(axis=0), xyz.max(axis=0)])
+
+
+def _union(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return np.concatenate([np.minimum(a[:3], b[:3]), np.maximum(a[3:], b[3:])])
+
+
+def _children(value) -> Iterable:
+    if isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            return
+        for v in value:
+            yield from _children(v)
+    elif isinstance(value, (Base, dict)) and _speckle_type(value) is not None:
+        if _is_row(value):
+            yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _children(v)
+
+
+def _walk(obj, parent_id: Optional[str], depth: int, rows: List[dict], seen: set) -> Optional[np.ndarray]:
+    """Append a row for `obj` and its descendants; return `obj`'s bbox (min xyz + max xyz)."""
+    row = {"parent_id": parent_id, "depth": depth}
+    rows.append(row)
+    props: Dict[str, object] = {}
+    bounds = None
+    kids = []
+
+    for name, value in _members(obj):
+        if name in SKIP_MEMBERS:
+            if name == "vertices":
+                bounds = _union(bounds, _vertex_bounds(value))
+            continue
+        if name == "properties" and isinstance(value, dict):
+            _flatten("", value, props)
+        elif _is_scalar(value):
+            if name in BASE_COLUMNS:
+                row[name] = value
+            else:
+                props.setdefault(name, value)
+        else:
+            kids.extend(_children(value))
+
+    row["id"] = getattr(obj, "id", None) if isinstance(obj, Base) else obj.get("id")
+    row["speckle_type"] = _speckle_type(obj)
+    if isinstance(obj, Base) and getattr(obj, "applicationId", None) is not None:
+        row["applicationId"] = obj.applicationId
+    xyz = [props.get(k) for k in "xyz"]
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in xyz):
+        bounds = _union(bounds, np.array(xyz * 2, dtype=np.float64))
+    for key, value in props.items():
+        if key not in row and key not in BASE_COLUMNS:
+            row[key] = value
+
+    for kid in kids:
+        if id(kid) in seen:
+            continue
+        seen.add(id(kid))
+        bounds = _union(bounds, _walk(kid, row["id"], depth + 1, rows, seen))
+
+    if bounds is not None:
+        row.update(zip(BBOX_COLUMNS, bounds.tolist()))
+    return bounds
+
+
+def _column(name: str, values: List[object]) -> np.ndarray:
+    if name == "depth":
+        return np.asarray(values, dtype=np.int64)
+    present = [v for v in values if v is not None]
+    if name in NUMERIC_COLUMNS or (present and all(isinstance(v, (int, float)) and not isinstance(v, bool)
+                                                   for v in present)):
+        return np.array([math.nan if v is None else v for v in values], dtype=np.float64)
+    if present and len({type(v) for v in present}) > 1:
+        values = [None if v is None else str(v) for v in values]  # mixed types -> text column
+    return np.array(values, dtype=object)
+
+# -----------------------
+# Index
+# -----------------------
+
+class ObjectIndex:
+    """Column name -> equally long NumPy array."""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    @classmethod
+    def from_object(cls, root) -> "ObjectIndex":
+        """Index a received `Base` or a resolved JSON object tree."""
+        rows: List[dict] = []
+        _walk(root, None, 0, rows, {id(root)})
+        names = list(BASE_COLUMNS) + BBOX_COLUMNS
+        extra = sorted({k for r in rows for k in r} - set(names))
+        return cls({name: _column(name, [r.get(name) for r in rows]) for name in names + extra})
+
+    def __len__(self) -> int:
+        return len(self.columns["id"]) if "id" in self.columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def filter(self, mask: np.ndarray) -> "ObjectIndex":
+        return ObjectIndex({k: v[mask] for k, v in self.columns.items()})
+
+    def where(self, **equals) -> "ObjectIndex":
+        """Rows where every given column equals the value, e.g. where(Designer="Maria Sanchez")."""
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in equals.items():
+            if name not in self.columns:
+                return self.filter(np.zeros(len(self), dtype=bool))
+            mask &= self.columns[name] == value
+        return self.filter(mask)
+
+    def group_sum(self, by: str, value: str) -> Dict[object, float]:
+        """Sum of `value` per distinct `by` (rows with no `by` or NaN `value` are left out)."""
+        keys = self.columns[by]
+        vals = self.columns[value]
+        ok = np.array([k is not None and k == k for k in keys], dtype=bool) & ~np.isnan(vals)
+        uniq, inv = np.unique(keys[ok].astype(str), return_inverse=True)
+        sums = np.bincount(inv, weights=vals[ok], minlength=len(uniq))
+        return dict(zip(uniq.tolist(), sums.tolist()))
+
+    # -- files --
+
+    def write(self, path: str) -> str:
+        """Write to .parquet / .arrow / .feather (needs pyarrow) or .csv; returns the path written."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in TABLE_FORMATS:
+            raise ValueError(f"Unknown table format {ext!r}, expected one of {TABLE_FORMATS}")
+        if ext != ".csv":
+            try:
+                import pyarrow as pa
+            except ImportError:
+                path = os.path.splitext(path)[0] + ".csv"
+                print(f"⚠ pyarrow is not installed, writing CSV instead: {path}")
+                ext = ".csv"
+        if ext == ".csv":
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(self.names)
+                for row in zip(*(self._csv_values(c) for c in self.columns.values())):
+                    w.writerow(row)
+            return path
+
+        table = pa.table({k: pa.array(v.tolist()) for k, v in self.columns.items()})
+        if ext == ".parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, path)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, path)
+        return path
+
+    @staticmethod
+    def _csv_values(column: np.ndarray) -> List[object]:
+        if column.dtype == np.float64:
+            return ["" if math.isnan(v) else repr(v) for v in column.tolist()]
+        return ["" if v is None else v for v in column.tolist()]
+
+    @classmethod
+    def read(cls, path: str) -> "ObjectIndex":
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv":
+            with open(path, newline="", encoding="utf-8") as f:
+                r = csv.reader(f)
+                header = next(r)
+                data = list(zip(*r)) or [()] * len(header)
+            return cls({name: _column(name, _parse_cells(name, values)) for name, values in zip(header, data)})
+        if ext == ".parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+        else:
+            import pyarrow.feather as feather
+            table = feather.read_table(path)
+        return cls({name: _column(name, table.column(name).to_pylist()) for name in table.column_names})
+
+
+def _parse_cells(name: str, values: Iterable[str]) -> List[object]:
+    """CSV text back to values; a column only becomes numeric if every cell is a plain number."""
+    values = [None if v == "" else v for v in values]
+    if name not in NUMERIC_COLUMNS and any(v is not None and _LEADING_ZERO.match(v) for v in values):
+        return values  # "01", "007": labels, not numbers
+    try:
+        return [None if v is None else (int(v) if v.lstrip("-").isdigit() else float(v)) for v in values]
+    except ValueError:
+        return values
@@ -0,0 +1,361 @@
+"""
+Long-running projectVersionsUpdated listener that survives disconnects
+
+- reconnects with exponential backoff (plus jitter) whenever the websocket drops
+- the server's keep-alive messages are watched: a silent connection counts as dropped
+- after every (re)connect, a catch-up query backfills the versions created since
+  the last checkpoint, so nothing pushed during an outage is lost
+- the checkpoint (last processed createdAt + recent version ids + versions handed
+  out but not finished) lives in a small JSON file, so a restart also catches up;
+  catch-up starts at the oldest unfinished version, so a failed or dropped one is
+  replayed even after newer ones were written
+
+Handlers get the same `evt` dict as the subscription payload; catch-up events
+have type "catch_up". Versions already handled are not passed on twice.
+
+Connects, events, the wait between websocket messages, catch-up time and the
+lag from createdAt to an event's arrival go to speckle_tools.metrics.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Union
+
+from gql import Client
+from gql.transport.websockets import WebsocketsTransport
+
+from speckle_tools.client import AsyncSpeckleSession
+from speckle_tools.metrics import METRICS
+from speckle_tools.queries import Q_ACTIVE_MODELS, Q_VERSIONS, SUB_PROJECT_VERSIONS_UPDATED
+from speckle_tools.store import _atomic_write
+
+# handler(evt, received_at); returns False if the event was not taken (duplicate, ...)
+EventHandler = Callable[[dict, datetime], Awaitable[Optional[bool]]]
+
+# versions a bit older than the checkpoint are re-checked: writes can finish out of order
+CATCH_UP_OVERLAP = timedelta(minutes=5)
+RECENT_IDS = 1000
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_time(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class Checkpoint:
+    """
+    Newest processed version createdAt + recently processed ids + unfinished versions,
+    saved to `path` (None = memory only).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.last_created_at: Optional[datetime] = None
+        self.recent: "OrderedDict[str, None]" = OrderedDict()
+        self.pending: Dict[str, str] = {}  # version id -> createdAt, handed out but not marked yet
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("lastCreatedAt"):
+                self.last_created_at = _parse_time(data["lastCreatedAt"])
+            self.recent = OrderedDict.fromkeys(data.get("recentVersionIds") or [])
+            self.pending = dict(data.get("pendingVersions") or {})
+
+    def seen(self, version_id: str) -> bool:
+        return version_id in self.recent
+
+    def begin(self, version_id: str, created_at: Optional[str]) -> None:
+        """`version_id` was handed to the handler; until it is marked, catch-up reaches back to it."""
+        if not created_at or version_id in self.pending:
+            return
+        self.pending[version_id] = created_at
+        while len(self.pending) > RECENT_IDS:
+            self.pending.pop(next(iter(self.pending)))
+        self.save()
+
+    def resume_from(self) -> Optional[datetime]:
+        """Low-water mark: createdAt of the oldest unfinished version, else of the newest processed one."""
+        times = [_parse_time(t) for t in self.pending.values()]
+        if self.last_created_at is not None:
+            times.append(self.last_created_at)
+        return min(times, default=None)
+
+    def mark(self, version_id: str, created_at: Optional[str]) -> None:
+        self.pending.pop(version_id, None)
+        self.recent[version_id] = None
+        self.recent.move_to_end(version_id)
+        while len(self.recent) > RECENT_IDS:
+            self.recent.popitem(last=False)
+        if created_at:
+            t = _parse_time(created_at)
+            if self.last_created_at is None or t > self.last_created_at:
+                self.last_created_at = t
+        self.save()
+
+    def start_at(self, when: datetime) -> None:
+        """First run: only versions newer than `when` will be caught up."""
+        if self.last_created_at is None:
+            self.last_created_at = when
+            self.save()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        _atomic_write(self.path, json.dumps({
+            "lastCreatedAt": _format_time(self.last_created_at) if self.last_created_at else None,
+            "recentVersionIds": list(self.recent),
+            "pendingVersions": self.pending,
+        }, indent=2))
+
+
+class StageJoin:
+    """
+    Calls `done(evt)` once every stage has reported a version finished, e.g.
+    backup + recompute: `pipeline.on_written = join.reporter("backup")`.
+    A stage reporting twice (a replay) counts once.
+    """
+
+    def __init__(self, done: Callable[[dict], None], stages: Sequence[str]):
+        self.done = done
+        self.stages = set(stages)
+        self._finished: Dict[str, set] = {}
+
+    def reporter(self, stage: str) -> Callable[[dict], None]:
+        def report(evt: dict) -> None:
+            version_id = (evt.get("version") or {}).get("id")
+            finished = self._finished.setdefault(version_id, set())
+            finished.add(stage)
+            if finished >= self.stages:
+                del self._finished[version_id]
+                self.done(evt)
+
+        return report
+
+
+class VersionListener:
+    """
+    One websocket connection carrying the subscriptions of one or more projects.
+
+    Args:
+        project_id: project id, or a list of them (all multiplexed over this connection)
+        ws_url: e.g. wss://app.speckle.systems/graphql
+        token: personal access token
+        handler: coroutine called with every new version event (evt["projectId"] is set)
+        checkpoint: where progress is kept; a Checkpoint for one project, or a
+            function project_id -> Checkpoint. Handlers should call `done(evt)`
+            once an event is fully processed
+        http: AsyncSpeckleSession for the catch-up queries (created if omitted)
+        keep_alive_timeout: seconds without a server keep-alive before reconnecting
+        backoff_initial / backoff_max: reconnect delay bounds, seconds
+        heartbeat_every: seconds between status lines (0 = off)
+        catch_up_concurrency: projects backfilled at the same time after a reconnect
+    """
+
+    def __init__(self, project_id: Union[str, Sequence[str]], ws_url: str, token: str, handler: EventHandler,
+                 checkpoint: Union[Checkpoint, Callable[[str], Checkpoint], None] = None,
+                 http: Optional[AsyncSpeckleSession] = None,
+                 keep_alive_timeout: float = 60.0, backoff_initial: float = 1.0, backoff_max: float = 300.0,
+                 heartbeat_every: float = 0.0, catch_up_concurrency: int = 4):
+        self.project_ids = [project_id] if isinstance(project_id, str) else list(project_id)
+        self.ws_url = ws_url
+        self.token = token
+        self.handler = handler
+        if isinstance(checkpoint, Checkpoint):
+            if len(self.project_ids) != 1:
+                raise ValueError("Pass a project_id -> Checkpoint function when listening to several projects")
+            self.checkpoints = {self.project_ids[0]: checkpoint}
+        else:
+            self.checkpoints = {pid: checkpoint(pid) if checkpoint else Checkpoint() for pid in self.project_ids}
+        self.http = http
+        self.keep_alive_timeout = keep_alive_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.heartbeat_every = heartbeat_every
+        self.catch_up_concurrency = catch_up_concurrency
+
+        self.counts = {"connects": 0, "disconnects": 0, "live": 0, "caught_up": 0}
+        self.connected = False
+        self.last_message = time.monotonic()
+        self._own_http = http is None
+
+    @property
+    def project_id(self) -> str:
+        return self.project_ids[0]
+
+    @property
+    def checkpoint(self) -> Checkpoint:
+        return self.checkpoints[self.project_ids[0]]
+
+    # -- progress --
+
+    def _count(self, key: str, n: int = 1) -> None:
+        self.counts[key] += n
+        if key in ("live", "caught_up"):
+            METRICS.inc("listener_events_total", n, source=key)
+        else:
+            METRICS.inc(f"listener_{key}_total", n)
+
+    def done(self, evt: dict) -> None:
+        """Record an event as processed (moves its project's checkpoint forward)."""
+        ver = evt.get("version") or {}
+        checkpoint = self.checkpoints.get(evt.get("projectId") or self.project_id)
+        if ver.get("id") and checkpoint is not None:
+            checkpoint.mark(ver["id"], ver.get("createdAt"))
+
+    async def _dispatch(self, project_id: str, evt: dict) -> None:
+        version_id = (evt.get("version") or {}).get("id")
+        if not version_id or self.checkpoints[project_id].seen(version_id):
+            return
+        evt["projectId"] = project_id
+        received_at = datetime.now(timezone.utc)
+        created_at = (evt.get("version") or {}).get("createdAt")
+        self.checkpoints[project_id].begin(version_id, created_at)
+        if created_at:
+            METRICS.observe("listener_event_lag_seconds", (received_at - _parse_time(created_at)).total_seconds(),
+                            source="caught_up" if evt.get("type") == "catch_up" else "live")
+        await self.handler(evt, received_at)
+
+    # -- catch-up --
+
+    async def catch_up(self, project_id: Optional[str] = None) -> int:
+        """
+        Hand every version created since the project's checkpoint to the handler, oldest first.
+        The checkpoint's low-water mark is used, so unfinished (failed, dropped) versions come again.
+        """
+        project_id = project_id or self.project_id
+        checkpoint = self.checkpoints[project_id]
+        since = checkpoint.resume_from()
+        if since is None:
+            return 0
+        since = since - CATCH_UP_OVERLAP
+        missed = []
+        async for model in self.http.paginate(Q_ACTIVE_MODELS, ("project", "models"), projectId=project_id):
+            async for ver in self.http.paginate(Q_VERSIONS, ("project", "model", "versions"),
+                                                projectId=project_id, modelId=model["id"]):
+                if _parse_time(ver["createdAt"]) < since:
+                    break  # newest first: everything after this is older
+                if not checkpoint.seen(ver["id"]):
+                    missed.append({"id": ver["id"], "modelId": model["id"], "type": "catch_up", "version": {
+                        "id": ver["id"], "message": ver.get("message"), "createdAt": ver["createdAt"],
+                    }})
+        missed.sort(key=lambda e: e["version"]["createdAt"])
+        for evt in missed:
+            await self._dispatch(project_id, evt)
+        self._count("caught_up", len(missed))
+        if missed:
+            print(f"↺ Caught up {len(missed)} version(s) of project {project_id} created while disconnected")
+        return len(missed)
+
+    async def _catch_up_all(self) -> None:
+        sem = asyncio.Semaphore(self.catch_up_concurrency)
+
+        async def one(pid: str) -> None:
+            async with sem:
+                try:
+                    with METRICS.span("listener_catch_up"):
+                        await self.catch_up(pid)
+                except Exception as e:
+                    print(f"⚠ Catch-up of project {pid} failed (retried on the next reconnect): {e}")
+
+        await asyncio.gather(*(one(pid) for pid in self.project_ids))
+
+    # -- main loop --
+
+    async def _consume(self, session, project_id: str) -> None:
+        async for result in session.subscribe(SUB_PROJECT_VERSIONS_UPDATED, variable_values={"projectId": project_id}):
+            now = time.monotonic()
+            METRICS.observe("listener_message_wait_seconds", now - self.last_message)
+            self.last_message = now
+            evt = (result or {}).get("projectVersionsUpdated") or {}
+            self._count("live")
+            await self._dispatch(project_id, evt)
+
+    async def _listen_once(self) -> None:
+        transport = WebsocketsTransport(
+            url=self.ws_url,
+            init_payload={"Authorization": f"Bearer {self.token}"},
+            keep_alive_timeout=self.keep_alive_timeout,
+        )
+        client = Client(transport=transport, fetch_schema_from_transport=False)
+        async with client as session:
+            self.connected = True
+            self._count("connects")
+            self.last_message = time.monotonic()
+            label = self.project_id if len(self.project_ids) == 1 else f"{len(self.project_ids)} projects"
+            print(f"🔌 Connected (WS) to {self.ws_url}, listening on {label}")
+
+            # every subscription shares this connection (one operation id each)
+            subscriptions = [asyncio.create_task(self._consume(session, pid)) for pid in self.project_ids]
+            # subscribe first, then backfill: anything in between arrives twice and is deduped
+            catch_up = asyncio.create_task(self._catch_up_all())
+            try:
+                # any subscription ending means the connection is gone
+                done, _ = await asyncio.wait(subscriptions, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+            finally:
+                for task in (*subscriptions, catch_up):
+                    task.cancel()
+                await asyncio.gather(*subscriptions, catch_up, return_exceptions=True)
+                self.connected = False
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_every)
+            c = self.counts
+            state = "connected" if self.connected else "reconnecting"
+            last = max((cp.last_created_at for cp in self.checkpoints.values() if cp.last_created_at), default=None)
+            print(f"💓 {state} | live {c['live']} | caught up {c['caught_up']} | reconnects {c['disconnects']} | "
+                  f"last message {time.monotonic() - self.last_message:.0f} s ago | "
+                  f"checkpoint {_format_time(last) if last else '-'}")
+
+    async def run(self) -> None:
+        """Listen until cancelled, reconnecting forever."""
+        if self.http is None:
+            self.http = await AsyncSpeckleSession(http_url(self.ws_url), self.token).start()
+        now = datetime.now(timezone.utc)
+        for checkpoint in self.checkpoints.values():
+            checkpoint.start_at(now)
+        heartbeat = asyncio.create_task(self._heartbeat()) if self.heartbeat_every else None
+        label = self.project_id if len(self.project_ids) == 1 else f"{self.project_id}+{len(self.project_ids) - 1}"
+        METRICS.gauge("listener_connected", lambda: float(self.connected), listener=label)
+        METRICS.gauge("listener_last_message_age_seconds", lambda: time.monotonic() - self.last_message, listener=label)
+        delay = self.backoff_initial
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    await self._listen_once()
+                    print("⚠ Subscription ended by the server")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"⚠ Connection lost: {type(e).__name__}: {e}")
+                self._count("disconnects")
+                if time.monotonic() - started > self.keep_alive_timeout:
+                    delay = self.backoff_initial  # it was a healthy connection, start over
+                wait = delay * (0.5 + random.random() / 2)
+                print(f"   reconnecting in {wait:.1f} s")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, self.backoff_max)
+        finally:
+            METRICS.remove("listener_connected", listener=label)
+            METRICS.remove("listener_last_message_age_seconds", listener=label)
+            if heartbeat is not None:
+                heartbeat.cancel()
+            if self._own_http and self.http is not None:
+                await self.http.close()
+
+
+def http_url(ws_url: str) -> str:
+    """wss://host/graphql -> https://host"""
+    return ws_url.replace("wss://", "https://", 1).replace("ws://", "http://", 1).rsplit("/graphql", 1)[0]
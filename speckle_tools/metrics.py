@@ -0,0 +1,422 @@
+"""
+Counters, histograms and timing spans for the scripts
+
+    from speckle_tools.metrics import METRICS, span
+
+    with span("backup_stage", stage="object_fetch"):     # -> backup_stage_seconds{stage="object_fetch"}
+        ...
+    METRICS.inc("backup_written_bytes_total", size)
+    METRICS.gauge("backup_queue_depth", jobs.qsize)     # read whenever metrics are exported
+
+Everything lands in one process-wide registry (METRICS), which can be
+- served as Prometheus text on http://host:port/metrics (`serve`)
+- appended to a JSON-lines log every few seconds, with per-second rates (`MetricsLog`)
+- read in-process with `METRICS.snapshot()` (benchmarks)
+
+`profile("cprofile" | "py-spy", path)` records a profile of the whole run.
+Scripts switch all of it on with `add_arguments(parser)` + `instrument(args)`,
+or `instrument(port=..., log_path=..., profile=...)` from config constants.
+"""
+
+import atexit
+import bisect
+import cProfile
+import json
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple, Union
+
+# seconds; spans range from a cached lookup to a backup landing an hour late
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0, 300.0, 900.0, 3600.0)
+DEFAULT_LOG_EVERY_S = 10.0
+PROFILERS = ("cprofile", "py-spy")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _key(name: str, labels: dict) -> Tuple[str, Labels]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(name: str, labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return name
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return name + "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+# -----------------------
+# Registry
+# -----------------------
+
+class Histogram:
+    """Bucketed durations: count, sum, max and cumulative bucket counts, Prometheus style."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last one: above every bound
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate from the buckets (linear inside the bucket), like histogram_quantile()."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lo = self.bounds[i - 1] if i else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "max": self.max,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95)}
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms, keyed by name + labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], Union[float, Callable[[], float]]] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def gauge(self, name: str, fn: Callable[[], float], **labels) -> None:
+        """Register a gauge read by calling `fn` at export time (e.g. a queue's qsize)."""
+        self.set(name, fn, **labels)
+
+    def remove(self, name: str, **labels) -> None:
+        with self._lock:
+            self.gauges.pop(_key(name, labels), None)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the block into the `<name>_seconds` histogram (exceptions included)."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - t, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    # -- export --
+
+    def _gauge_values(self) -> Dict[Tuple[str, Labels], float]:
+        with self._lock:
+            gauges = list(self.gauges.items())
+        out = {}
+        for key, value in gauges:
+            try:
+                out[key] = float(value() if callable(value) else value)
+            except Exception:
+                continue  # a gauge whose owner is gone
+        return out
+
+    def snapshot(self) -> dict:
+        """Plain-dict view: {"counters": {"name{labels}": value}, "gauges": ..., "histograms": {...: summary}}."""
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {k: h.summary() for k, h in self.histograms.items()}
+        return {
+            "counters": {_format(*k): v for k, v in sorted(counters.items())},
+            "gauges": {_format(*k): v for k, v in sorted(self._gauge_values().items())},
+            "histograms": {_format(*k): v for k, v in sorted(histograms.items())},
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((k, (h.bounds, list(h.counts), h.sum, h.count)) for k, h in self.histograms.items())
+        lines = []
+        typed = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{_format(name, labels)} {_number(value)}")
+        for (name, labels), value in sorted(self._gauge_values().items()):
+            header(name, "gauge")
+            lines.append(f"{_format(name, labels)} {_number(value)}")
+        for (name, labels), (bounds, counts, total, count) in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, n in zip(bounds + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{_format(name + '_bucket', labels, (('le', le),))} {cumulative}")
+            lines.append(f"{_format(name + '_sum', labels)} {_number(total)}")
+            lines.append(f"{_format(name + '_count', labels)} {count}")
+        lines.append(f"# TYPE process_uptime_seconds gauge\nprocess_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def span(name: str, **labels):
+    """`METRICS.span`: time a block into `<name>_seconds`."""
+    return METRICS.span(name, **labels)
+
+# -----------------------
+# HTTP clients
+# -----------------------
+
+def requests_hooks(client: str = "requests", registry: Metrics = METRICS) -> dict:
+    """`hooks=` for a requests.Session: counts responses and body bytes (streamed bodies by Content-Length)."""
+
+    def on_response(r, *args, **kwargs):
+        registry.inc("http_responses_total", client=client, status=r.status_code)
+        size = r.headers.get("Content-Length") if kwargs.get("stream") else len(r.content)
+        if size:
+            registry.inc("http_received_bytes_total", int(size), client=client)
+        registry.observe("http_response_seconds", r.elapsed.total_seconds(), client=client)
+
+    return {"response": [on_response]}
+
+
+def httpx_hooks(client: str = "httpx", registry: Metrics = METRICS) -> dict:
+    """`event_hooks=` for an httpx.AsyncClient: counts responses and body bytes."""
+
+    async def on_response(response):
+        await response.aread()  # the caller reads it right after anyway
+        registry.inc("http_responses_total", client=client, status=response.status_code)
+        registry.inc("http_received_bytes_total", len(response.content), client=client)
+
+    return {"response": [on_response]}
+
+# -----------------------
+# Exporters
+# -----------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: Metrics = METRICS
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve(port: int, host: str = "127.0.0.1", registry: Metrics = METRICS) -> ThreadingHTTPServer:
+    """Serve `registry` as Prometheus text on http://host:port/metrics from a daemon thread."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📈 Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+class MetricsLog:
+    """Append a snapshot (plus per-second counter rates since the last line) to a JSONL file every `every` s."""
+
+    def __init__(self, path: str, every: float = DEFAULT_LOG_EVERY_S, registry: Metrics = METRICS):
+        self.path = path
+        self.every = every if every and every > 0 else DEFAULT_LOG_EVERY_S
+        self.registry = registry
+        self._last: Tuple[float, Dict[str, float]] = (time.monotonic(), {})
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsLog":
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._loop, name="metrics-log", daemon=True)
+        self._thread.start()
+        print(f"📈 Metrics logged to {self.path} every {self.every:g} s")
+        return self
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.every):
+            self.write()
+
+    def write(self) -> None:
+        snap = self.registry.snapshot()
+        now = time.monotonic()
+        then, previous = self._last
+        dt = max(now - then, 1e-9)
+        snap["rates"] = {k: (v - previous.get(k, 0)) / dt for k, v in snap["counters"].items()}
+        self._last = (now, snap["counters"])
+        line = {"time": datetime.now(timezone.utc).isoformat(), "interval_s": dt, **snap}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line) + "\n")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.write()  # final totals
+
+# -----------------------
+# Profiling
+# -----------------------
+
+@contextmanager
+def profile(mode: Optional[str], path: Optional[str] = None):
+    """
+    Profile the block: "cprofile" writes a pstats file (python -m pstats <path>,
+    or snakeviz), "py-spy" attaches py-spy to this process and writes a flame
+    graph SVG. None does nothing.
+    """
+    if not mode:
+        yield
+        return
+    if mode not in PROFILERS:
+        raise ValueError(f"profile must be one of {', '.join(PROFILERS)}, got {mode!r}")
+    stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    if mode == "cprofile":
+        path = path or f"profile_{stamp}.prof"
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            print(f"🔬 cProfile stats written to {path} (python -m pstats {path})")
+        return
+
+    exe = shutil.which("py-spy")
+    if exe is None:
+        print("⚠ py-spy is not installed, running without a profile (pip install py-spy)")
+        yield
+        return
+    path = path or f"profile_{stamp}.svg"
+    proc = subprocess.Popen([exe, "record", "--pid", str(os.getpid()), "--output", path, "--subprocesses"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        yield
+    finally:
+        if proc.poll() is None:
+            proc.send_signal(signal.SIGINT)  # py-spy writes its output on SIGINT
+            try:
+                proc.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            print(f"🔬 py-spy flame graph written to {path}")
+        else:
+            err = proc.stderr.read().decode(errors="replace").strip()
+            print(f"⚠ py-spy exited early (attaching may need root / ptrace permissions): {err[:300]}")
+
+# -----------------------
+# Scripts
+# -----------------------
+
+def add_arguments(parser) -> None:
+    """--metrics-port / --metrics-log / --metrics-every / --profile / --profile-out for a script's parser."""
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port (0 = any free port)")
+    group.add_argument("--metrics-log", help="append a JSON line of metrics to this file periodically")
+    group.add_argument("--metrics-every", type=float, default=DEFAULT_LOG_EVERY_S, help="seconds between metrics log lines")
+    group.add_argument("--profile", choices=PROFILERS, help="profile the run with cProfile or py-spy")
+    group.add_argument("--profile-out", help="profile output file (default: profile_<time>.prof / .svg)")
+
+
+class Instrumentation:
+    """Exporters + profiler of one run; stopped by `stop()`, on leaving a `with` block or at exit."""
+
+    def __init__(self, port: Optional[int] = None, log_path: Optional[str] = None,
+                 every: float = DEFAULT_LOG_EVERY_S, profile_mode: Optional[str] = None,
+                 profile_path: Optional[str] = None, registry: Metrics = METRICS):
+        self.server = serve(port, registry=registry) if port is not None else None
+        self.log = MetricsLog(log_path, every, registry).start() if log_path else None
+        self._profile = profile(profile_mode, profile_path)
+        self._profile.__enter__()
+        self._stopped = False
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        atexit.unregister(self.stop)
+        self._profile.__exit__(None, None, None)
+        if self.log is not None:
+            self.log.stop()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def instrument(args=None, port: Optional[int] = None, log_path: Optional[str] = None,
+               every: float = DEFAULT_LOG_EVERY_S, profile: Optional[str] = None,
+               profile_path: Optional[str] = None) -> Instrumentation:
+    """Start what `args` (from `add_arguments`) or the keywords ask for; everything is off by default."""
+    if args is not None:
+        port, log_path, every = args.metrics_port, args.metrics_log, args.metrics_every
+        profile, profile_path = args.profile, args.profile_out
+    return Instrumentation(port, log_path, every, profile, profile_path)
@@ -0,0 +1,220 @@
+"""
+Fetch only the parts of a model you need
+
+    Projection(exclude=HEAVY_MEMBERS)         # METADATA_ONLY: no displayValue / mesh buffers
+    Projection(fields=("properties", "area", "volume"))
+    Projection(skip_types=("Objects.Geometry.Mesh",))
+
+A projection is applied while the closure is walked (speckle_tools.resolve):
+references below a dropped member are never requested, so a metadata-only
+backup downloads the object tree without a single vertex or face chunk.
+
+`LazyObject` goes the other way: the whole tree is there, but children stay
+reference stubs until they are read, then come from the ObjectCache or the server.
+"""
+
+import json
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from speckle_tools.resolve import DATA_CHUNK_TYPE, REFERENCE_TYPE, fetch_objects
+from speckle_tools.transform import MESH_BUFFERS
+
+# geometry members that make up nearly all of a model's bytes
+HEAVY_MEMBERS = frozenset({"displayValue", "@displayValue", "edges", *MESH_BUFFERS})
+# always kept, so projected objects can still be labelled and diffed
+IDENTITY_MEMBERS = frozenset({"id", "speckle_type", "applicationId", "name", "units", "totalChildrenCount"})
+
+
+def _is_object(value) -> bool:
+    return isinstance(value, dict) and "speckle_type" in value
+
+
+def _holds_objects(value) -> bool:
+    """Objects, reference stubs or lists of them: the tree's edges."""
+    if isinstance(value, list):
+        return bool(value) and _is_object(value[0])
+    return _is_object(value)
+
+
+class Projection:
+    """
+    Args:
+        fields: members to keep (identity members and child objects are kept too);
+            None keeps everything not excluded
+        exclude: members to drop, with everything below them
+        skip_types: speckle_type prefixes whose objects are reduced to their identity
+            members (their children are not fetched)
+    """
+
+    def __init__(self, fields: Optional[Iterable[str]] = None, exclude: Iterable[str] = (),
+                 skip_types: Sequence[str] = ()):
+        self.fields = frozenset(fields) if fields is not None else None
+        self.exclude = frozenset(exclude)
+        self.skip_types = tuple(skip_types)
+
+    @classmethod
+    def parse(cls, spec) -> Optional["Projection"]:
+        """None / "full", "metadata", a comma-separated field list, or a Projection."""
+        if spec is None or isinstance(spec, Projection):
+            return spec
+        if spec in ("", "full"):
+            return None
+        if spec == "metadata":
+            return METADATA_ONLY
+        fields = [f.strip() for f in spec.split(",") if f.strip()]
+        # geometry is only walked into when asked for by name
+        return cls(fields=fields, exclude=HEAVY_MEMBERS - set(fields))
+
+    def to_dict(self) -> dict:
+        return {
+            "fields": sorted(self.fields) if self.fields is not None else None,
+            "exclude": sorted(self.exclude),
+            "skip_types": list(self.skip_types),
+        }
+
+    def keeps(self, member: str, value) -> bool:
+        if member in IDENTITY_MEMBERS:
+            return True
+        if member in self.exclude:
+            return False
+        return self.fields is None or member in self.fields or _holds_objects(value)
+
+    def apply(self, value):
+        """Copy of a JSON value with the projection applied to every object in it."""
+        if isinstance(value, list):
+            if value and isinstance(value[0], (int, float)):
+                return value
+            return [self.apply(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        st = value.get("speckle_type")
+        if st == REFERENCE_TYPE or st == DATA_CHUNK_TYPE:
+            return value
+        if st is not None and self.skip_types and st.startswith(self.skip_types):
+            return {k: v for k, v in value.items() if k in IDENTITY_MEMBERS}
+        if st is None:
+            return {k: self.apply(v) for k, v in value.items()}
+        return {k: self.apply(v) for k, v in value.items() if k.startswith("__") or self.keeps(k, v)}
+
+
+METADATA_ONLY = Projection(exclude=HEAVY_MEMBERS)
+
+# -----------------------
+# Lazy objects
+# -----------------------
+
+# loader(ids) -> {id: object json}
+ObjectLoader = Callable[[List[str]], Dict[str, dict]]
+
+
+def server_loader(session, project_id: str, cache=None) -> ObjectLoader:
+    """
+    Loader over a SpeckleSession's pooled REST session; with an ObjectCache,
+    cached objects are read locally and downloaded ones are added to it.
+    """
+    def load(ids: List[str]) -> Dict[str, dict]:
+        out: Dict[str, dict] = {}
+        if cache is not None:
+            for obj_id in ids:
+                text = cache.get_object(obj_id)
+                if text is not None:
+                    out[obj_id] = json.loads(text)
+        missing = [i for i in ids if i not in out]
+        if missing:
+            fetched = fetch_objects(session.rest, session.server_url, project_id, missing)
+            if cache is not None:
+                cache.begin_write()
+                for obj_id, obj in fetched.items():
+                    cache.save_object(obj_id, json.dumps(obj))
+                cache.end_write()
+            out.update(fetched)
+        return out
+
+    return load
+
+
+def _is_reference(value) -> bool:
+    return isinstance(value, dict) and value.get("speckle_type") == REFERENCE_TYPE and "referencedId" in value
+
+
+class LazyObject(Mapping):
+    """
+    Read-only view of a Speckle object whose children are fetched on first access.
+
+        root = LazyObject(data, loader)
+        root["name"]                          # no request
+        root["elements"][0]["displayValue"]   # fetches that element, then its meshes (one batch)
+
+    Fetched children are kept, so each one is requested at most once per root.
+    """
+
+    def __init__(self, data: dict, loader: ObjectLoader, _memo: Optional[dict] = None):
+        self._data = data
+        self._loader = loader
+        self._memo = {} if _memo is None else _memo
+        self._values: Dict[str, object] = {}
+
+    def __getitem__(self, key: str):
+        if key not in self._values:
+            self._values[key] = self._materialize(self._data[key])
+        return self._values[key]
+
+    def __getattr__(self, key: str):
+        if key.startswith("_"):
+            raise AttributeError(key)
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"LazyObject({self._data.get('speckle_type')}, id={self._data.get('id')})"
+
+    @property
+    def loaded(self) -> int:
+        """Objects fetched so far through this tree."""
+        return len(self._memo)
+
+    def _fetch(self, ids: List[str]) -> None:
+        missing = [i for i in dict.fromkeys(ids) if i not in self._memo]
+        if missing:
+            fetched = self._loader(missing)
+            for obj_id in missing:
+                if obj_id not in fetched:
+                    raise RuntimeError(f"Object {obj_id} not found on the server")
+                self._memo[obj_id] = fetched[obj_id]
+
+    def _wrap(self, obj: dict):
+        return LazyObject(obj, self._loader, self._memo) if _is_object(obj) else obj
+
+    def _materialize(self, value):
+        if _is_reference(value):
+            self._fetch([value["referencedId"]])
+            return self._wrap(self._memo[value["referencedId"]])
+        if isinstance(value, list):
+            if not value or isinstance(value[0], (int, float)):
+                return value
+            # all stubs of a list in one request
+            self._fetch([v["referencedId"] for v in value if _is_reference(v)])
+            out = []
+            for v in value:
+                v = self._memo[v["referencedId"]] if _is_reference(v) else v
+                if isinstance(v, dict) and v.get("speckle_type") == DATA_CHUNK_TYPE:
+                    out.extend(v.get("data") or [])
+                else:
+                    out.append(self._materialize(v) if isinstance(v, (dict, list)) else v)
+            return out
+        if isinstance(value, dict):
+            return self._wrap(value) if _is_object(value) else LazyObject(value, self._loader, self._memo)
+        return value
+
+    def to_dict(self) -> dict:
+        """The object as plain JSON, without fetching anything not already loaded."""
+        return self._data
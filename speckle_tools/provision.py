@@ -0,0 +1,157 @@
+"""
+Create many models in one run
+
+- read a manifest (CSV with name,description columns, or JSON)
+- list the project's existing models once (all pages) and skip those
+- create the rest concurrently over one AsyncSpeckleSession, with a cap on
+  requests in flight, a requests-per-second limit and retries with backoff;
+  createModel isn't idempotent, so after a transport error (e.g. a timeout)
+  the name is looked up before trying again, in case the first attempt landed
+"""
+
+import asyncio
+import csv
+import json
+import os
+import time
+from typing import Dict, List
+
+from gql.transport.exceptions import TransportQueryError
+
+from speckle_tools.client import AsyncSpeckleSession
+from speckle_tools.queries import M_CREATE_MODEL, Q_MODELS
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 5.0  # requests per second
+DEFAULT_RETRIES = 3
+
+
+def load_manifest(path: str) -> List[Dict[str, str]]:
+    """
+    Models to provision: CSV (header with name[,description]) or JSON
+    (a list of names / objects, or {"models": [...]}).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as f:
+        if ext == ".csv":
+            rows = [dict(row) for row in csv.DictReader(f)]
+        else:
+            rows = json.load(f)
+    if isinstance(rows, dict):
+        rows = rows.get("models", [])
+    if not isinstance(rows, list):
+        raise ValueError(f"Manifest {path} must be a list of models")
+    models = []
+    for row in rows:
+        row = {"name": row} if isinstance(row, str) else row
+        name = (row.get("name") or "").strip()
+        if name:
+            models.append({"name": name, "description": (row.get("description") or "").strip() or None})
+    return models
+
+
+def _key(name: str) -> str:
+    # the server treats model names case-insensitively and trims slashes / spaces
+    return name.strip().strip("/").lower()
+
+
+async def _find_model(session: AsyncSpeckleSession, project_id: str, name: str):
+    """The project's model called `name` (as the server compares names), or None."""
+    async for model in session.paginate(Q_MODELS, ("project", "models"), projectId=project_id, search=name.strip()):
+        if _key(model["name"]) == _key(name):
+            return model
+    return None
+
+
+class RateLimiter:
+    """Spaces calls at least 1 / `rate` seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+async def provision_models_async(session: AsyncSpeckleSession, project_id: str, models: List[Dict[str, str]],
+                                 concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE,
+                                 retries: int = DEFAULT_RETRIES, dry_run: bool = False) -> Dict[str, list]:
+    """
+    Returns {"existing": [...], "created": [...], "failed": [...]} with one
+    {"name", "id" | "error"} dict per model (failures are also printed as they
+    happen; the caller prints the rest).
+    """
+    existing = {}
+    async for model in session.paginate(Q_MODELS, ("project", "models"), projectId=project_id):
+        existing[_key(model["name"])] = model
+    report: Dict[str, list] = {"existing": [], "created": [], "failed": []}
+
+    todo = []
+    for m in models:
+        found = existing.get(_key(m["name"]))
+        if found is not None:
+            report["existing"].append({"name": found["name"], "id": found["id"]})
+        elif _key(m["name"]) not in {_key(t["name"]) for t in todo}:
+            todo.append(m)
+    if dry_run:
+        report["created"] = [{"name": m["name"], "id": None} for m in todo]
+        return report
+
+    sem = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+
+    async def landed(m: Dict[str, str]):
+        """The model, if an attempt that raised created it after all."""
+        try:
+            return await _find_model(session, project_id, m["name"])
+        except Exception:
+            return None  # the lookup failed too: the retry will tell
+
+    async def create(m: Dict[str, str]) -> None:
+        variables = {"input": {"projectId": project_id, "name": m["name"], "description": m.get("description")}}
+        async with sem:
+            for attempt in range(retries + 1):
+                await limiter.wait()
+                try:
+                    res = await session.execute(M_CREATE_MODEL, **variables)
+                    created = res["modelMutations"]["create"]
+                    report["created"].append({"name": created["name"], "id": created["id"]})
+                    return
+                except TransportQueryError as e:
+                    # the server answered with a GraphQL error (name taken, no access, ...): retrying won't help
+                    found = await landed(m) if attempt else None
+                    if found is not None:  # "name taken" by our own earlier attempt
+                        report["created"].append({"name": found["name"], "id": found["id"]})
+                        return
+                    report["failed"].append({"name": m["name"], "error": str(e)})
+                    print(f"❌ {m['name']}: {e}")
+                    return
+                except Exception as e:
+                    if attempt == retries:
+                        report["failed"].append({"name": m["name"], "error": str(e)})
+                        print(f"❌ {m['name']}: {e}")
+                        return
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                    found = await landed(m)
+                    if found is not None:
+                        report["created"].append({"name": found["name"], "id": found["id"]})
+                        return
+
+    await asyncio.gather(*(create(m) for m in todo))
+    return report
+
+
+def provision_models(server_url: str, token: str, project_id: str, models: List[Dict[str, str]],
+                     concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE,
+                     retries: int = DEFAULT_RETRIES, dry_run: bool = False) -> Dict[str, list]:
+    """Blocking wrapper around `provision_models_async` for the sync scripts."""
+    async def run():
+        async with AsyncSpeckleSession(server_url, token, max_connections=concurrency) as session:
+            return await provision_models_async(session, project_id, models, concurrency, rate, retries, dry_run)
+    return asyncio.run(run())
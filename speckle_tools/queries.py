@@ -0,0 +1,170 @@
+"""
+GraphQL documents and small lookups shared by the scripts
+
+Documents are parsed once here and always take variables, never f-strings.
+The helpers accept a `SpeckleSession` or `AsyncSpeckleSession`-like object
+with `execute(document, **variables)` (see speckle_tools.client).
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from gql import gql
+
+Q_LATEST_VERSION_OBJECT = gql("""
+query LatestVersionObject($projectId: String!, $modelId: String!) {
+  project(id: $projectId) {
+    model(id: $modelId) {
+      versions(limit: 1) {
+        items {
+          id
+          referencedObject
+        }
+      }
+    }
+  }
+}
+""")
+
+Q_MODELS = gql("""
+query ProjectModels($projectId: String!, $limit: Int!, $cursor: String, $search: String) {
+  project(id: $projectId) {
+    models(limit: $limit, cursor: $cursor, filter: { search: $search }) {
+      totalCount
+      cursor
+      items {
+        id
+        name
+      }
+    }
+  }
+}
+""")
+
+Q_ACTIVE_MODELS = gql("""
+query ActiveModels($projectId: String!, $limit: Int!, $cursor: String) {
+  project(id: $projectId) {
+    models(limit: $limit, cursor: $cursor, filter: { onlyWithVersions: true }) {
+      cursor
+      items {
+        id
+        name
+      }
+    }
+  }
+}
+""")
+
+Q_VERSIONS = gql("""
+query ModelVersions($projectId: String!, $modelId: String!, $limit: Int!, $cursor: String) {
+  project(id: $projectId) {
+    model(id: $modelId) {
+      versions(limit: $limit, cursor: $cursor) {
+        totalCount
+        cursor
+        items {
+          id
+          message
+          createdAt
+          referencedObject
+        }
+      }
+    }
+  }
+}
+""")
+
+# We fetch referencedObject from the Version/Commit.
+# (Speckle schema calls it "Commit" in some references, but "Version" in UI; field is referencedObject.)
+Q_VERSION_REFERENCED_OBJECT = gql("""
+query GetVersionRootObject($projectId: String!, $versionId: String!) {
+  project(id: $projectId) {
+    version(id: $versionId) {
+      id
+      referencedObject
+      message
+      createdAt
+      authorUser {
+        id
+        name
+      }
+    }
+  }
+}
+""")
+
+Q_OBJECT_DATA = gql("""
+query GetObjectData($projectId: String!, $objectId: String!) {
+  project(id: $projectId) {
+    object(id: $objectId) {
+      id
+      speckleType
+      data
+    }
+  }
+}
+""")
+
+SUB_PROJECT_VERSIONS_UPDATED = gql("""
+subscription ProjectVersionsUpdated($projectId: String!) {
+  projectVersionsUpdated(id: $projectId) {
+    id
+    modelId
+    type
+    version {
+      id
+      message
+      createdAt
+    }
+  }
+}
+""")
+
+M_CREATE_MODEL = gql("""
+mutation CreateModel($input: CreateModelInput!) {
+  modelMutations {
+    create(input: $input) {
+      id
+      name
+    }
+  }
+}
+""")
+
+M_CREATE_VERSION = gql("""
+mutation CreateVersion($input: CreateVersionInput!) {
+  versionMutations {
+    create(input: $input) {
+      id
+      referencedObject
+    }
+  }
+}
+""")
+
+
+def get_latest_ref_obj_id(session, project_id: str, model_id: str) -> str:
+    res = session.execute(Q_LATEST_VERSION_OBJECT, projectId=project_id, modelId=model_id)
+    return res["project"]["model"]["versions"]["items"][0]["referencedObject"]
+
+
+def get_version_ref_obj_id(session, project_id: str, version_id: str) -> str:
+    res = session.execute(Q_VERSION_REFERENCED_OBJECT, projectId=project_id, versionId=version_id)
+    return res["project"]["version"]["referencedObject"]
+
+
+def iter_models(session, project_id: str, search: Optional[str] = None) -> Iterator[dict]:
+    """Every model of a project (all pages), optionally filtered server-side by name."""
+    return session.paginate(Q_MODELS, ("project", "models"), projectId=project_id, search=search)
+
+
+def iter_versions(session, project_id: str, model_id: str) -> Iterator[dict]:
+    """Every version of a model, newest first."""
+    return session.paginate(Q_VERSIONS, ("project", "model", "versions"), projectId=project_id, modelId=model_id)
+
+
+def find_model_by_name(session, project_id: str, model_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """First model whose name contains `model_name` (case-insensitive), across all pages."""
+    for model in iter_models(session, project_id, search=model_name):
+        if model_name.lower() in model["name"].lower():
+            return model["id"], model["name"]
+    return None, None
@@ -0,0 +1,167 @@
+"""
+Resolve `{"speckle_type": "reference", "referencedId": ...}` stubs in object.data
+
+`object.data` from GraphQL only holds the root; detached children (meshes,
+DataChunks of vertices / faces / normals, ...) are references listed in the
+root's `__closure`. This module downloads the whole closure with batched
+REST calls (`/api/getobjects/{projectId}`, many ids per request, several
+requests in flight) and splices the children back in, flattening DataChunk
+lists into plain arrays.
+
+With a `projection` (speckle_tools.projection) the closure is walked level by
+level instead, and references below dropped members are never requested.
+"""
+
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+import requests
+
+from speckle_tools.metrics import httpx_hooks
+
+REFERENCE_TYPE = "reference"
+DATA_CHUNK_TYPE = "Speckle.Core.Models.DataChunk"
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+
+
+def reference_ids(value) -> Iterable[str]:
+    """Yield every referencedId found anywhere inside a JSON value."""
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, dict):
+            if v.get("speckle_type") == REFERENCE_TYPE and "referencedId" in v:
+                yield v["referencedId"]
+                continue
+            stack.extend(x for x in v.values() if isinstance(x, (dict, list)))
+        elif isinstance(v, list):
+            if v and isinstance(v[0], (int, float)):
+                continue
+            stack.extend(x for x in v if isinstance(x, (dict, list)))
+
+
+def resolve_references(value, objects: Dict[str, dict], memo: Optional[dict] = None):
+    """
+    Return `value` with every reference replaced by the object it points to.
+
+    Lists of DataChunks are flattened into one array. References whose object
+    is not in `objects` are left as stubs.
+    """
+    if memo is None:
+        memo = {}
+    if isinstance(value, dict):
+        if value.get("speckle_type") == REFERENCE_TYPE and "referencedId" in value:
+            ref = value["referencedId"]
+            if ref not in memo:
+                child = objects.get(ref)
+                memo[ref] = value if child is None else resolve_references(child, objects, memo)
+            return memo[ref]
+        return {k: resolve_references(v, objects, memo) for k, v in value.items()}
+    if isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            return value
+        out = []
+        for item in value:
+            r = resolve_references(item, objects, memo)
+            if isinstance(r, dict) and r.get("speckle_type") == DATA_CHUNK_TYPE:
+                out.extend(r.get("data") or [])
+            else:
+                out.append(r)
+        return out
+    return value
+
+
+def _parse_objects(endpoint: str, status_code: int, text: str) -> Dict[str, dict]:
+    """/api/getobjects answers one `id<TAB>json` line per object."""
+    if status_code != 200:
+        raise RuntimeError(f"Can't get objects from {endpoint}: HTTP {status_code} ({text[:200]})")
+    out = {}
+    for line in text.splitlines():
+        if line:
+            obj_id, obj = line.split("\t", 1)
+            out[obj_id] = json.loads(obj)
+    return out
+
+
+def fetch_objects(rest: requests.Session, server_url: str, project_id: str, ids: List[str],
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, dict]:
+    """Blocking `fetch_objects_async` on an authenticated requests session (one batch at a time)."""
+    endpoint = f"{server_url.rstrip('/')}/api/getobjects/{project_id}"
+    objects: Dict[str, dict] = {}
+    for i in range(0, len(ids), batch_size):
+        r = rest.post(endpoint, data={"objects": json.dumps(ids[i:i + batch_size])})
+        objects.update(_parse_objects(endpoint, r.status_code, r.text))
+    return objects
+
+
+async def fetch_objects_async(http: httpx.AsyncClient, server_url: str, project_id: str,
+                              ids: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                              concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, dict]:
+    """Download objects by id, `batch_size` ids per request, `concurrency` requests at a time."""
+    sem = asyncio.Semaphore(concurrency)
+    endpoint = f"{server_url.rstrip('/')}/api/getobjects/{project_id}"
+
+    async def fetch_batch(batch: List[str]) -> Dict[str, dict]:
+        async with sem:
+            r = await http.post(endpoint, data={"objects": json.dumps(batch)})
+        return _parse_objects(endpoint, r.status_code, r.text)
+
+    batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+    objects: Dict[str, dict] = {}
+    for part in await asyncio.gather(*(fetch_batch(b) for b in batches)):
+        objects.update(part)
+    return objects
+
+
+async def fetch_closure_async(http: httpx.AsyncClient, server_url: str, project_id: str, root: dict,
+                              batch_size: int = DEFAULT_BATCH_SIZE,
+                              concurrency: int = DEFAULT_CONCURRENCY, projection=None) -> Dict[str, dict]:
+    """
+    Download every descendant of `root`. The `__closure` table gives all ids up
+    front; references it doesn't list are picked up in follow-up rounds.
+
+    With a `projection`, the closure can't be trusted (it lists the geometry
+    too): only references the projected objects still hold are followed, and
+    the returned objects are projected.
+    """
+    objects: Dict[str, dict] = {}
+    requested = set()
+    if projection is not None:
+        pending = list(dict.fromkeys(reference_ids(projection.apply(root))))
+    else:
+        pending = list(root.get("__closure") or {}) or list(dict.fromkeys(reference_ids(root)))
+    while pending:
+        requested.update(pending)
+        fetched = await fetch_objects_async(http, server_url, project_id, pending, batch_size, concurrency)
+        if projection is not None:
+            fetched = {k: projection.apply(v) for k, v in fetched.items()}
+        objects.update(fetched)
+        pending = list(dict.fromkeys(
+            ref for obj in fetched.values() for ref in reference_ids(obj) if ref not in requested
+        ))
+    return objects
+
+
+async def resolve_object_async(http: httpx.AsyncClient, server_url: str, project_id: str, root: dict,
+                               batch_size: int = DEFAULT_BATCH_SIZE,
+                               concurrency: int = DEFAULT_CONCURRENCY, projection=None) -> dict:
+    objects = await fetch_closure_async(http, server_url, project_id, root, batch_size, concurrency, projection)
+    if projection is not None:
+        root = projection.apply(root)
+    return resolve_references(root, objects)
+
+
+def resolve_object(server_url: str, project_id: str, token: str, root: dict,
+                   batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                   projection=None) -> dict:
+    """Blocking wrapper around `resolve_object_async` for the sync scripts."""
+    async def run():
+        async with httpx.AsyncClient(headers={"Authorization": f"Bearer {token}"}, timeout=60,
+                                     event_hooks=httpx_hooks("rest")) as http:
+            return await resolve_object_async(http, server_url, project_id, root, batch_size, concurrency,
+                                              projection)
+    return asyncio.run(run())
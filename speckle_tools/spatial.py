@@ -0,0 +1,257 @@
+"""
+Spatial and id indexes over a received model
+
+    ids = index_ids(source_base)                 # id / applicationId -> object, one walk
+    template = ids[TARGET_GEOMETRY_ID]
+
+    index = SpatialIndex.from_object(tower)      # element bboxes from the meshes (speckle_tools.geometry)
+    index.in_band(16000, 32000)                  # elements reaching into a height band
+    index.query(lo, hi)                          # elements whose bbox meets a box
+    index.nearest((x, y, z), k=3)
+    index.overlaps()                             # bbox clash candidates, sort-and-sweep
+
+- the boxes live in two (n, 3) NumPy arrays; a bounding volume hierarchy
+  (median splits along the longest axis, small leaves tested vectorised)
+  answers box and nearest-neighbour queries in O(log n) per hit
+- `overlaps` sorts once along the axis the box centres spread furthest on
+  (height, for a tower) and only compares boxes whose intervals on it meet:
+  O(n log n + pairs) instead of testing all n² pairs
+- boxes are axis-aligned (broad phase): an overlap means "worth a closer look"
+"""
+
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from speckle_tools.geometry import GeometryReport, _children, _get, _is_mesh, _members, _unit_factor, analyze
+
+LEAF_SIZE = 8
+
+# -----------------------
+# Id index
+# -----------------------
+
+def index_ids(root) -> Dict[str, object]:
+    """Every object under `root` (Base or JSON) by id and by applicationId, in one walk."""
+    out: Dict[str, object] = {}
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        for key in ("id", "applicationId"):
+            value = _get(obj, key)
+            if isinstance(value, str) and value:
+                out.setdefault(value, obj)
+        if _is_mesh(obj):
+            continue  # nothing to find inside the buffers
+        for _, value in _members(obj):
+            stack.extend(_children(value))
+    return out
+
+# -----------------------
+# Spatial index
+# -----------------------
+
+def _display(obj) -> list:
+    value = _get(obj, "displayValue")
+    if value is None:
+        value = _get(obj, "@displayValue")
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _element_boxes(report: GeometryReport, units: Optional[str]) -> Tuple[List, np.ndarray, np.ndarray]:
+    """Elements (displayValue owners, plus meshes that belong to none) and their boxes."""
+    owned = {id(m) for obj, _ in report.nodes for m in _display(obj)}
+    items, lo, hi = [], [], []
+    for obj, stats in report.nodes:
+        if not _display(obj) and not (_is_mesh(obj) and id(obj) not in owned):
+            continue
+        f = _unit_factor(stats.units, units)
+        items.append(obj)
+        lo.append(stats.bbox_min * f)
+        hi.append(stats.bbox_max * f)
+    if not items:
+        return [], np.zeros((0, 3)), np.zeros((0, 3))
+    return items, np.array(lo), np.array(hi)
+
+
+class SpatialIndex:
+    """
+    Bounding volume hierarchy over axis-aligned boxes.
+
+    Args:
+        lo, hi: (n, 3) box corners
+        items: the object behind each box (defaults to its row number)
+    """
+
+    def __init__(self, lo: np.ndarray, hi: np.ndarray, items: Optional[Sequence] = None,
+                 leaf_size: int = LEAF_SIZE):
+        self.lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3)
+        self.hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3)
+        self.items = list(items) if items is not None else list(range(len(self.lo)))
+        if not (len(self.lo) == len(self.hi) == len(self.items)):
+            raise ValueError("lo, hi and items must have the same length")
+        self.leaf_size = max(1, leaf_size)
+        self._build()
+
+    @classmethod
+    def from_object(cls, root, units: Optional[str] = None) -> "SpatialIndex":
+        """Index the elements under a Base / JSON tree by the bboxes of their meshes."""
+        report = analyze(root, write=False)
+        units = units or _get(root, "units") or (report.total.units if report.total else None)
+        items, lo, hi = _element_boxes(report, units)
+        index = cls(lo, hi, items)
+        index.units = units
+        return index
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    # -- build --
+
+    def _build(self) -> None:
+        n = len(self.lo)
+        self.order = np.arange(n)
+        # node arrays: box, [start, end) range into `order`, children (-1 = leaf)
+        node_lo, node_hi, ranges, children = [], [], [], []
+        centers = (self.lo + self.hi) / 2.0
+
+        def add(start: int, end: int) -> int:
+            idx = self.order[start:end]
+            node_lo.append(self.lo[idx].min(axis=0) if end > start else np.full(3, np.inf))
+            node_hi.append(self.hi[idx].max(axis=0) if end > start else np.full(3, -np.inf))
+            ranges.append((start, end))
+            children.append([-1, -1])
+            return len(ranges) - 1
+
+        root = add(0, n)
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            start, end = ranges[node]
+            if end - start <= self.leaf_size:
+                continue
+            idx = self.order[start:end]
+            axis = int(np.argmax(node_hi[node] - node_lo[node]))
+            mid = (end - start) // 2
+            part = np.argpartition(centers[idx, axis], mid)
+            self.order[start:end] = idx[part]
+            left, right = add(start, start + mid), add(start + mid, end)
+            children[node] = [left, right]
+            stack.extend((left, right))
+
+        self._node_lo = np.array(node_lo).reshape(-1, 3)
+        self._node_hi = np.array(node_hi).reshape(-1, 3)
+        self._ranges = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+        self._children = np.array(children, dtype=np.int64).reshape(-1, 2)
+
+    # -- queries --
+
+    def query_indices(self, lo: Sequence[float], hi: Sequence[float]) -> np.ndarray:
+        """Rows whose box meets [lo, hi] (touching counts)."""
+        lo = np.asarray(lo, dtype=np.float64)
+        hi = np.asarray(hi, dtype=np.float64)
+        if not len(self.items):
+            return np.zeros(0, dtype=np.int64)
+        found = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if (self._node_lo[node] > hi).any() or (self._node_hi[node] < lo).any():
+                continue
+            left, right = self._children[node]
+            if left < 0:
+                start, end = self._ranges[node]
+                idx = self.order[start:end]
+                hit = ((self.lo[idx] <= hi) & (self.hi[idx] >= lo)).all(axis=1)
+                found.append(idx[hit])
+            else:
+                stack.extend((left, right))
+        return np.sort(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def query(self, lo: Sequence[float], hi: Sequence[float]) -> List:
+        return [self.items[i] for i in self.query_indices(lo, hi)]
+
+    def in_band(self, low: float, high: float, axis: int = 2) -> List:
+        """Elements that reach into [low, high] along `axis` (default: height)."""
+        lo = np.full(3, -np.inf)
+        hi = np.full(3, np.inf)
+        lo[axis], hi[axis] = low, high
+        return self.query(lo, hi)
+
+    def nearest(self, point: Sequence[float], k: int = 1) -> List[Tuple[float, object]]:
+        """The k boxes closest to `point` as (distance, item), nearest first (0 = inside)."""
+        p = np.asarray(point, dtype=np.float64)
+        if not len(self.items):
+            return []
+
+        def box_distance(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+            d = np.maximum(np.maximum(lo - p, 0.0), p - hi)
+            return np.sqrt((d * d).sum(axis=-1))
+
+        best: List[Tuple[float, int]] = []  # max-heap of the k best, as (-distance, row)
+        frontier = [(float(box_distance(self._node_lo[0], self._node_hi[0])), 0)]
+        while frontier:
+            dist, node = heapq.heappop(frontier)
+            if len(best) == k and dist > -best[0][0]:
+                break
+            left, right = self._children[node]
+            if left < 0:
+                start, end = self._ranges[node]
+                idx = self.order[start:end]
+                for d, i in zip(box_distance(self.lo[idx], self.hi[idx]).tolist(), idx.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, i))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, i))
+            else:
+                for child in (left, right):
+                    heapq.heappush(frontier, (float(box_distance(self._node_lo[child], self._node_hi[child])), child))
+        return [(-d, self.items[i]) for d, i in sorted(best, key=lambda t: -t[0])]
+
+    def overlap_indices(self, tolerance: float = 0.0) -> np.ndarray:
+        """
+        (m, 2) row pairs whose boxes overlap by more than `tolerance` on every
+        axis (boxes that only touch, like stacked modules, don't count).
+        """
+        n = len(self.items)
+        if n < 2:
+            return np.zeros((0, 2), dtype=np.int64)
+        # sweep along the axis the boxes are spread out on (z for a tower), so few of them share a slab
+        axis = int(np.argmax(np.ptp(self.lo + self.hi, axis=0)))
+        rest = [k for k in range(3) if k != axis]
+        order = np.argsort(self.lo[:, axis], kind="stable")
+        lo, hi = self.lo[order], self.hi[order]
+        # for each box, the sorted boxes starting before it ends along the sweep axis
+        ends = np.searchsorted(lo[:, axis], hi[:, axis] - tolerance, side="left")
+        pairs = []
+        for i in np.nonzero(ends > np.arange(n) + 1)[0].tolist():
+            j = np.arange(i + 1, ends[i])
+            hit = ((lo[j][:, rest] < hi[i, rest] - tolerance) & (hi[j][:, rest] > lo[i, rest] + tolerance)).all(axis=1)
+            hit &= hi[j, axis] > lo[i, axis] + tolerance
+            if hit.any():
+                pairs.append(np.stack([np.full(hit.sum(), order[i]), order[j[hit]]], axis=1))
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        out = np.sort(np.concatenate(pairs), axis=1)
+        return out[np.lexsort((out[:, 1], out[:, 0]))]
+
+    def overlaps(self, tolerance: float = 0.0) -> List[Tuple[object, object]]:
+        """Pairs of items whose boxes overlap (clash candidates)."""
+        return [(self.items[a], self.items[b]) for a, b in self.overlap_indices(tolerance).tolist()]
+
+
+def label(obj) -> str:
+    """Short name for printing: name, Module property or id."""
+    props = _get(obj, "properties") if isinstance(_get(obj, "properties"), dict) else {}
+    for value in (_get(obj, "name"), _get(obj, "Module"), props.get("Module"), _get(obj, "applicationId"),
+                  _get(obj, "id")):
+        if value:
+            return str(value)
+    return f"<{_get(obj, 'speckle_type') or type(obj).__name__}>"
@@ -0,0 +1,226 @@
+"""
+Deduplicated backup store
+
+    <root>/objects/ab/abcdef...json   one file per Speckle object, named by its id
+    <root>/versions/<stamp>_<versionId>.json   small manifest per backed-up version
+
+Speckle ids are content hashes, so an object that is already in the store is
+never written again: each new version only costs the objects that changed plus
+its manifest. `restore` rebuilds the original backup payload from a manifest.
+That only holds for whole objects, so projected backups (speckle_tools.projection)
+are refused: a stripped object stored under its id would stand in for the full
+one in every later backup.
+
+Time spent serializing vs. writing objects, and objects / bytes written, are
+counted in speckle_tools.metrics.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from speckle_tools.metrics import METRICS
+
+# Marker left in a parent where a stored child object was cut out
+STORE_REF = "__ref"
+
+_SPECKLE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _is_storable(value) -> bool:
+    return (
+        isinstance(value, dict)
+        and isinstance(value.get("id"), str)
+        and _SPECKLE_ID.match(value["id"]) is not None
+        and "speckle_type" in value
+    )
+
+
+def split_tree(value, emit: Callable[[str, dict], None], is_known: Callable[[str], bool] = lambda _: False,
+               stats: Optional[Dict[str, int]] = None):
+    """
+    Walk `value` bottom-up and hand every identifiable object to `emit(id, obj)`
+    once, children before parents, with its own children already replaced by
+    {"__ref": id}. Objects for which `is_known(id)` is true are not descended into.
+    Returns `value` with the top-level objects replaced by refs as well.
+    """
+    if isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            return value
+        return [split_tree(v, emit, is_known, stats) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    if _is_storable(value):
+        obj_id = value["id"]
+        if stats is not None:
+            stats["objects"] = stats.get("objects", 0) + 1
+        if not is_known(obj_id):
+            stripped = {k: split_tree(v, emit, is_known, stats) for k, v in value.items()}
+            emit(obj_id, stripped)
+        return {STORE_REF: obj_id}
+    return {k: split_tree(v, emit, is_known, stats) for k, v in value.items()}
+
+
+def expand_tree(value, get_object: Callable[[str], dict], memo: Optional[dict] = None):
+    """Inverse of `split_tree`: splice objects back in for every {"__ref": id}."""
+    if memo is None:
+        memo = {}
+    if isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            return value
+        return [expand_tree(v, get_object, memo) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1 and STORE_REF in value:
+        obj_id = value[STORE_REF]
+        if obj_id not in memo:
+            memo[obj_id] = expand_tree(get_object(obj_id), get_object, memo)
+        return memo[obj_id]
+    return {k: expand_tree(v, get_object, memo) for k, v in value.items()}
+
+
+def _check_whole(payload: dict) -> None:
+    if payload.get("projection"):
+        raise ValueError(f"Version {payload.get('versionId')} is a projected backup; the store only keeps "
+                         "whole objects (back it up to a file format instead)")
+
+
+def _atomic_write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class BackupStore:
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.versions_dir = os.path.join(root, "versions")
+        self._known: set = set()
+
+    # -- objects --
+
+    def object_path(self, obj_id: str) -> str:
+        return os.path.join(self.objects_dir, obj_id[:2], f"{obj_id}.json")
+
+    def has_object(self, obj_id: str) -> bool:
+        if obj_id in self._known:
+            return True
+        if os.path.exists(self.object_path(obj_id)):
+            self._known.add(obj_id)
+            return True
+        return False
+
+    def get_object(self, obj_id: str) -> dict:
+        with open(self.object_path(obj_id), encoding="utf-8") as f:
+            return json.load(f)
+
+    def put_tree(self, value, stats: Optional[Dict[str, int]] = None):
+        """
+        Store every identifiable object inside `value` (bottom-up) and return
+        `value` with those objects replaced by {"__ref": id}.
+        """
+        if stats is None:
+            stats = {"objects": 0, "written": 0, "bytes": 0}
+
+        return split_tree(value, lambda obj_id, stripped: self._write_object(obj_id, stripped, stats),
+                          self.has_object, stats)
+
+    def _write_object(self, obj_id: str, stripped: dict, stats: Dict[str, int]) -> None:
+        t = time.perf_counter()
+        text = json.dumps(stripped, ensure_ascii=False, separators=(",", ":"), default=str)
+        serialized = time.perf_counter()
+        _atomic_write(self.object_path(obj_id), text)
+        METRICS.inc("store_seconds_total", serialized - t, step="serialize")
+        METRICS.inc("store_seconds_total", time.perf_counter() - serialized, step="write")
+        self._known.add(obj_id)
+        stats["written"] += 1
+        stats["bytes"] += len(text)
+
+    def expand(self, value):
+        """Inverse of `put_tree`: splice stored objects back in."""
+        return expand_tree(value, self.get_object)
+
+    # -- versions --
+
+    def put(self, payload: dict, received_at: Optional[datetime] = None) -> str:
+        """Store one backup payload (see speckle_tools.backup) and return the manifest path."""
+        _check_whole(payload)
+        stats = {"objects": 0, "written": 0, "bytes": 0}
+        manifest = dict(payload)
+        if isinstance(payload.get("object"), dict):
+            manifest["object"] = dict(payload["object"], data=self.put_tree(payload["object"].get("data"), stats))
+        return self._write_manifest(manifest, stats, received_at)
+
+    def put_records(self, records: Iterable[dict], received_at: Optional[datetime] = None) -> str:
+        """
+        Store a record stream (speckle_tools.stream / jsonl backups) one object at
+        a time, so a payload of any size never has to be in memory at once.
+        """
+        stats = {"objects": 0, "written": 0, "bytes": 0}
+        header, root = {}, None
+        written: List[str] = []
+        for rec in records:
+            if rec["type"] == "object":
+                stats["objects"] += 1
+                if not self.has_object(rec["id"]):
+                    self._write_object(rec["id"], rec["data"], stats)
+                    written.append(rec["id"])
+            elif rec["type"] == "header":
+                header = rec["payload"]
+                try:
+                    _check_whole(header)
+                except ValueError:
+                    # the header can come after the objects: take back what this call added
+                    for obj_id in written:
+                        os.remove(self.object_path(obj_id))
+                        self._known.discard(obj_id)
+                    raise
+            elif rec["type"] == "root":
+                root = rec["data"]
+        manifest = dict(header)
+        if isinstance(header.get("object"), dict):
+            manifest["object"] = dict(header["object"], data=root)
+        return self._write_manifest(manifest, stats, received_at)
+
+    def _write_manifest(self, manifest: dict, stats: Dict[str, int], received_at: Optional[datetime]) -> str:
+        manifest["store"] = stats
+        stamp = (received_at or datetime.now()).strftime("%Y-%m-%d_%H-%M-%S")
+        version_id = manifest.get("versionId") or manifest.get("version_id")  # older backups use snake_case
+        path = os.path.join(self.versions_dir, f"{stamp}_{version_id}.json")
+        _atomic_write(path, json.dumps(manifest, indent=2, ensure_ascii=False, default=str))
+        METRICS.inc("store_objects_written_total", stats["written"])
+        METRICS.inc("store_written_bytes_total", stats["bytes"])
+        return path
+
+    def list_versions(self) -> List[str]:
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(os.path.join(self.versions_dir, f) for f in os.listdir(self.versions_dir) if f.endswith(".json"))
+
+    def find_manifest(self, key: str) -> str:
+        """Accept a manifest path, a versionId or a timestamp prefix."""
+        if os.path.isfile(key):
+            return key
+        matches = [p for p in self.list_versions()
+                   if os.path.basename(p).startswith(key) or os.path.basename(p)[:-5].endswith(f"_{key}")]
+        if not matches:
+            raise FileNotFoundError(f"No backup version matching '{key}' in {self.versions_dir}")
+        return matches[-1]
+
+    def restore(self, key: str) -> dict:
+        """Rebuild the full backup payload for a version."""
+        with open(self.find_manifest(key), encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest.pop("store", None)
+        if isinstance(manifest.get("object"), dict):
+            manifest["object"]["data"] = self.expand(manifest["object"].get("data"))
+        return manifest
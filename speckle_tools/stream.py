@@ -0,0 +1,184 @@
+"""
+Streaming reads of large models, in bounded memory
+
+Every source is turned into the same record stream the jsonl backups use:
+
+    {"type": "object", "id": ..., "data": {...}}   one per object, children first,
+                                                   nested objects replaced by {"__ref": id}
+    {"type": "header", "payload": {...}}           backup payload without object.data
+    {"type": "root",   "data": ...}                object.data with its objects as refs
+
+so only one object is in memory at a time, never the whole tree.
+
+- jsonl.gz / jsonl.zst   read line by line
+- spkb                   compact tree in memory, arrays filled in per object from the mmap
+- json                   parsed incrementally with `ijson` (pip install ijson); without
+                         it the file is loaded whole, with a warning
+- the server             /objects/{projectId}/{objectId} streamed line by line
+
+Records feed `BackupStore.put_records`, `JsonlWriter.write` or any scan
+(`iter_objects`) directly.
+"""
+
+import json
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+from speckle_tools.formats import BinaryBackup, detect_format, iter_jsonl
+from speckle_tools.resolve import REFERENCE_TYPE
+from speckle_tools.store import STORE_REF, _is_storable, split_tree
+
+# raw JSON events read at a time from a .json backup
+READ_BUFFER = 64 * 1024
+
+
+def _split_events(events: Iterable[Tuple[str, object]], seen: set):
+    """
+    `split_tree` over ijson basic_parse events, as a generator: each object is
+    yielded as a record the moment its closing brace is read, and only a
+    {"__ref": id} stays behind in its parent. Returns the top-level value.
+    """
+    stack = []  # [container, pending key]
+    for event, value in events:
+        if event == "start_map":
+            stack.append([{}, ""])
+            continue
+        if event == "start_array":
+            stack.append([[], None])
+            continue
+        if event == "map_key":
+            stack[-1][1] = value
+            continue
+        if event in ("end_map", "end_array"):
+            value = stack.pop()[0]
+            if event == "end_map" and _is_storable(value):
+                if value["id"] not in seen:
+                    seen.add(value["id"])
+                    yield {"type": "object", "id": value["id"], "data": value}
+                value = {STORE_REF: value["id"]}
+        if not stack:
+            return value
+        container, key = stack[-1]
+        if key is None:
+            container.append(value)
+        else:
+            container[key] = value
+    raise ValueError("Truncated JSON document")
+
+
+def _payload_records(doc) -> Iterator[dict]:
+    """Header and root records of a split backup payload (or of any other JSON document)."""
+    if isinstance(doc, dict) and isinstance(doc.get("object"), dict):
+        obj = doc["object"]
+        yield {"type": "header", "payload": dict(doc, object={k: v for k, v in obj.items() if k != "data"})}
+        yield {"type": "root", "data": obj.get("data")}
+    else:
+        yield {"type": "header", "payload": {}}
+        yield {"type": "root", "data": doc}
+
+
+def _split_records(value, seen: set, fill: Callable = lambda v: v):
+    """Records for an in-memory value; returns the value with its objects as refs."""
+    records = []
+
+    def emit(obj_id: str, obj: dict) -> None:
+        seen.add(obj_id)
+        records.append({"type": "object", "id": obj_id, "data": obj})
+
+    value = split_tree(value, emit, seen.__contains__)
+    records.reverse()
+    while records:
+        rec = records.pop()  # let go of every record once it has been handed on
+        rec["data"] = fill(rec["data"])
+        yield rec
+    return value
+
+
+def _json_records(path: str) -> Iterator[dict]:
+    seen: set = set()
+    try:
+        import ijson
+    except ImportError:
+        print(f"⚠ ijson is not installed, loading {path} whole (pip install ijson to stream it)")
+        with open(path, encoding="utf-8") as f:
+            doc = yield from _split_records(json.load(f), seen)
+    else:
+        with open(path, "rb") as f:
+            doc = yield from _split_events(ijson.basic_parse(f, use_float=True, buf_size=READ_BUFFER), seen)
+    yield from _payload_records(doc)
+
+
+def _spkb_records(path: str) -> Iterator[dict]:
+    with BinaryBackup(path) as b:
+        # the tree is small (arrays are placeholders); each object gets its arrays as it is yielded
+        doc = yield from _split_records(b.tree, set(), b.fill)
+        doc = b.fill(doc)
+    yield from _payload_records(doc)
+
+
+def iter_backup_records(path: str) -> Iterator[dict]:
+    """Record stream (see module docstring) of a backup file of any format."""
+    fmt = detect_format(path)
+    if fmt == "json":
+        return _json_records(path)
+    if fmt == "spkb":
+        return _spkb_records(path)
+    return iter_jsonl(path)
+
+
+def iter_objects(path: str, types: Sequence[str] = ()) -> Iterator[Tuple[str, dict]]:
+    """
+    (id, object) for every object in a backup, children first, optionally only
+    those whose speckle_type starts with one of `types`. Nested objects are
+    {"__ref": id} markers.
+    """
+    types = tuple(types)
+    for rec in iter_backup_records(path):
+        if rec["type"] != "object":
+            continue
+        if types and not str(rec["data"].get("speckle_type", "")).startswith(types):
+            continue
+        yield rec["id"], rec["data"]
+
+# -----------------------
+# Server
+# -----------------------
+
+def _as_store_refs(value):
+    """Server reference stubs -> {"__ref": id}, so server objects fit the record format."""
+    if isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            return value
+        return [_as_store_refs(v) for v in value]
+    if isinstance(value, dict):
+        if value.get("speckle_type") == REFERENCE_TYPE and "referencedId" in value:
+            return {STORE_REF: value["referencedId"]}
+        return {k: _as_store_refs(v) for k, v in value.items()}
+    return value
+
+
+def iter_server_objects(session, project_id: str, object_id: str,
+                        chunk_size: int = READ_BUFFER) -> Iterator[Tuple[str, dict]]:
+    """
+    (id, object) for `object_id` and its whole closure, read off one streamed
+    /objects response (root first, then the children), one line at a time.
+    `session` is a SpeckleSession (its pooled REST session is used).
+    """
+    url = f"{session.server_url}/objects/{project_id}/{object_id}"
+    with session.rest.get(url, headers={"Accept": "text/plain"}, stream=True) as r:
+        if r.status_code != 200:
+            raise RuntimeError(f"Can't stream objects from {url}: HTTP {r.status_code}")
+        for line in r.iter_lines(chunk_size=chunk_size, decode_unicode=True):
+            if line:
+                obj_id, text = line.split("\t", 1)
+                yield obj_id, json.loads(text)
+
+
+def server_records(session, project_id: str, object_id: str, header: Optional[dict] = None) -> Iterator[dict]:
+    """
+    Record stream of a server object tree. The server sends parents before
+    children (writers here don't mind) and DataChunks stay separate objects.
+    """
+    for obj_id, obj in iter_server_objects(session, project_id, object_id):
+        yield {"type": "object", "id": obj_id, "data": _as_store_refs(obj)}
+    yield {"type": "header", "payload": header or {}}
+    yield {"type": "root", "data": {STORE_REF: object_id}}
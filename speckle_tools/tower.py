@@ -0,0 +1,132 @@
+"""
+Parametric tower builder
+
+- One template geometry (e.g. the BrepX from the source model)
+- N modules placed by a transform rule (spacing / twist, or any callable)
+- Per-module properties from a CSV / JSON table (Designer, Collection, ...)
+- Modules grouped into collections under a single "Tower" root, ready for one send;
+  every module is detached (its own object on the server), so a changed module
+  can be fetched or re-sent without the rest of the tower
+"""
+
+import csv
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from specklepy.objects.base import Base
+from specklepy.objects.models.collections.collection import Collection
+
+from speckle_tools.duplicate import share_copy
+from speckle_tools.transform import apply_transform, compose, rotation_z, translation
+
+COLLECTION_TYPE = "Speckle.Core.Models.Collections.Collection"
+DEFAULT_COLLECTION = "Modules"
+
+# Table columns that steer the build instead of becoming properties
+COLLECTION_COLUMN = "Collection"
+MODULE_COLUMN = "Module"
+# Base internals and geometry members a table column must not overwrite (kept in `properties` only)
+RESERVED_MEMBERS = {"id", "speckle_type", "applicationId", "units", "displayValue", "properties", "elements",
+                    "totalChildrenCount", "__closure"}
+
+TransformRule = Callable[[int], np.ndarray]
+
+
+def create_collection(name, elements, collection_type="Collection", detach=False):
+    if detach:
+        # specklepy's Collection detaches its elements
+        c = Collection(name=name, elements=elements)
+    else:
+        c = Base()
+        c.speckle_type = COLLECTION_TYPE
+        c.name = name
+        c.elements = elements
+    c.collectionType = collection_type
+    return c
+
+
+def stack_rule(spacing: float, twist_deg: float = 0.0) -> TransformRule:
+    """Module i (0-based) is turned by i * twist about Z, then lifted by i * spacing."""
+    def rule(i: int) -> np.ndarray:
+        if not twist_deg:
+            return translation(dz=i * spacing)
+        return compose(rotation_z(i * twist_deg), translation(dz=i * spacing))
+    return rule
+
+
+def load_property_table(path: str) -> List[Dict[str, str]]:
+    """
+    Read module properties from CSV (one row per module, header = property names)
+    or JSON (a list of objects, or {"modules": [...]}).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as f:
+        if ext == ".csv":
+            return [dict(row) for row in csv.DictReader(f)]
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("modules", [])
+    if not isinstance(data, list):
+        raise ValueError(f"Property table {path} must be a list of objects")
+    return data
+
+
+def is_reserved(name: str, obj=None) -> bool:
+    """
+    A name a property column may not be set as: one of RESERVED_MEMBERS, a
+    private / detached ("_", "@") name, or a typed member of `obj`.
+    """
+    if name in RESERVED_MEMBERS or name.startswith(("_", "@")):
+        return True
+    return isinstance(obj, Base) and name in obj.get_typed_member_names()
+
+
+def build_module(template: Base, num: int, props: Dict, matrix: Optional[np.ndarray] = None,
+                 width: int = 2) -> Base:
+    """
+    Copy-on-write copy of `template`, moved by `matrix`, tagged with `props`
+    (as members and in `properties`; reserved names only in `properties`).
+    """
+    geom = share_copy(template)
+    if matrix is not None and not np.allclose(matrix, np.eye(4)):
+        apply_transform(geom, matrix)
+
+    tags = {k: v for k, v in props.items() if k != COLLECTION_COLUMN and v not in (None, "")}
+    tags.setdefault(MODULE_COLUMN, f"{num:0{width}d}")
+    if not isinstance(getattr(geom, "properties", None), dict):
+        geom.properties = {}
+    for key, value in tags.items():
+        if not is_reserved(key, geom):
+            setattr(geom, key, value)
+        geom.properties[key] = value
+    return geom
+
+
+def build_tower(template: Base, count: int, rule: TransformRule,
+                table: Optional[List[Dict]] = None, name: str = "Tower",
+                tower_tag: Optional[str] = None, units: Optional[str] = None) -> Base:
+    """
+    Build `count` modules in one pass and return the Tower root collection.
+
+    Row i of `table` applies to module i (rows repeat if the table is shorter).
+    A "Collection" column picks the collection a module goes into; collections
+    keep the order in which they first appear.
+    """
+    table = table or [{}]
+    width = max(2, len(str(count)))
+    groups: Dict[str, List[Base]] = {}
+
+    for i in range(count):
+        row = table[i % len(table)]
+        module = build_module(template, i + 1, row, rule(i), width)
+        groups.setdefault(row.get(COLLECTION_COLUMN) or DEFAULT_COLLECTION, []).append(module)
+
+    root = create_collection(name, [create_collection(k, v, detach=True) for k, v in groups.items()], "Tower",
+                             detach=True)
+    if tower_tag:
+        root.Tower = tower_tag
+    if units:
+        root.units = units
+    return root
@@ -0,0 +1,327 @@
+"""
+Affine transforms for received Speckle objects
+
+- Build 4x4 matrices (translate, rotate, scale, mirror) and compose them
+- Apply one matrix to every displayValue mesh, point and bbox under an object
+  in a single batched NumPy operation instead of a per-vertex Python loop
+- Keep area / volume / vertexNormals / face winding consistent where possible
+"""
+
+import math
+import sys
+from typing import List, Optional, Sequence
+
+import numpy as np
+from specklepy.objects.base import Base
+from specklepy.objects.geometry.plane import Plane
+from specklepy.objects.geometry.point import Point
+from specklepy.objects.geometry.vector import Vector
+from specklepy.objects.primitive import Interval
+
+# Typed mesh buffers are handled explicitly, never walked element by element.
+MESH_BUFFERS = {"vertices", "faces", "colors", "vertexNormals", "textureCoordinates"}
+
+# -----------------------
+# Matrix builders
+# -----------------------
+
+def identity() -> np.ndarray:
+    return np.eye(4)
+
+def translation(dx: float = 0.0, dy: float = 0.0, dz: float = 0.0) -> np.ndarray:
+    m = np.eye(4)
+    m[:3, 3] = (dx, dy, dz)
+    return m
+
+def scaling(sx: float, sy: Optional[float] = None, sz: Optional[float] = None,
+            origin: Sequence[float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    """Scale about `origin`. A single factor scales uniformly."""
+    sy = sx if sy is None else sy
+    sz = sx if sz is None else sz
+    return _about(np.diag([sx, sy, sz, 1.0]), origin)
+
+def rotation(axis: Sequence[float], angle_deg: float,
+             origin: Sequence[float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    """Right-handed rotation of `angle_deg` degrees about `axis` through `origin`."""
+    a = np.asarray(axis, dtype=np.float64)
+    a = a / np.linalg.norm(a)
+    x, y, z = a
+    c, s = math.cos(math.radians(angle_deg)), math.sin(math.radians(angle_deg))
+    C = 1.0 - c
+    m = np.eye(4)
+    m[:3, :3] = [
+        [c + x * x * C, x * y * C - z * s, x * z * C + y * s],
+        [y * x * C + z * s, c + y * y * C, y * z * C - x * s],
+        [z * x * C - y * s, z * y * C + x * s, c + z * z * C],
+    ]
+    return _about(m, origin)
+
+def rotation_z(angle_deg: float, origin: Sequence[float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    return rotation((0.0, 0.0, 1.0), angle_deg, origin)
+
+def mirror(normal: Sequence[float], origin: Sequence[float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    """Reflect across the plane through `origin` with the given `normal`."""
+    n = np.asarray(normal, dtype=np.float64)
+    n = n / np.linalg.norm(n)
+    m = np.eye(4)
+    m[:3, :3] -= 2.0 * np.outer(n, n)
+    return _about(m, origin)
+
+def compose(*matrices: np.ndarray) -> np.ndarray:
+    """Combine matrices so that the first argument is applied first."""
+    out = np.eye(4)
+    for m in matrices:
+        out = np.asarray(m, dtype=np.float64) @ out
+    return out
+
+def _about(m: np.ndarray, origin: Sequence[float]) -> np.ndarray:
+    o = np.asarray(origin, dtype=np.float64)
+    if not o.any():
+        return m
+    return compose(translation(*(-o)), m, translation(*o))
+
+# -----------------------
+# Tree walk
+# -----------------------
+
+class _Targets:
+    def __init__(self):
+        self.meshes: List[Base] = []
+        self.points: List[Base] = []
+        self.boxes: List[Base] = []
+        self.measured: List[Base] = []
+
+def _is_number_list(value) -> bool:
+    return isinstance(value, list) and bool(value) and isinstance(value[0], (int, float))
+
+def _is_box(obj: Base) -> bool:
+    if getattr(obj, "basePlane", None) is not None and getattr(obj, "xSize", None) is not None:
+        return True
+    return getattr(obj, "min", None) is not None and getattr(obj, "max", None) is not None
+
+def _is_point(obj: Base) -> bool:
+    if isinstance(obj, Vector) or "Vector" in (obj.speckle_type or ""):
+        return False
+    return all(isinstance(getattr(obj, k, None), (int, float)) for k in ("x", "y", "z"))
+
+def _member_names(obj: Base) -> List[str]:
+    try:
+        return obj.get_serializable_attributes()
+    except Exception:
+        return obj.get_dynamic_member_names()
+
+def _collect(obj, targets: _Targets, seen: set) -> None:
+    if obj is None or isinstance(obj, (str, int, float, bool)) or id(obj) in seen:
+        return
+    seen.add(id(obj))
+
+    if isinstance(obj, list):
+        if _is_number_list(obj):
+            return
+        for item in obj:
+            _collect(item, targets, seen)
+        return
+    if isinstance(obj, dict):
+        for item in obj.values():
+            _collect(item, targets, seen)
+        return
+    if not isinstance(obj, Base):
+        return
+
+    if _is_box(obj):
+        targets.boxes.append(obj)
+        return
+    if _is_number_list(getattr(obj, "vertices", None)):
+        targets.meshes.append(obj)
+    elif _is_point(obj):
+        targets.points.append(obj)
+        return
+    if isinstance(getattr(obj, "area", None), (int, float)) or isinstance(getattr(obj, "volume", None), (int, float)):
+        targets.measured.append(obj)
+
+    for name in _member_names(obj):
+        if name in MESH_BUFFERS:
+            continue
+        try:
+            _collect(getattr(obj, name, None), targets, seen)
+        except Exception:
+            pass
+
+# -----------------------
+# Box helpers
+# -----------------------
+
+def _box_corners(box: Base) -> np.ndarray:
+    if getattr(box, "basePlane", None) is not None:
+        p = box.basePlane
+        o = np.array([p.origin.x, p.origin.y, p.origin.z])
+        axes = [np.array([v.x, v.y, v.z]) for v in (p.xdir, p.ydir, p.normal)]
+        sizes = [(box.xSize.start, box.xSize.end), (box.ySize.start, box.ySize.end), (box.zSize.start, box.zSize.end)]
+        return np.array([
+            o + axes[0] * sx + axes[1] * sy + axes[2] * sz
+            for sx in sizes[0] for sy in sizes[1] for sz in sizes[2]
+        ])
+    lo = np.array([box.min.x, box.min.y, box.min.z])
+    hi = np.array([box.max.x, box.max.y, box.max.z])
+    return np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+
+def _set_box_extents(box: Base, lo: np.ndarray, hi: np.ndarray) -> None:
+    """Replace the box with the world-aligned box around its transformed corners."""
+    if getattr(box, "basePlane", None) is not None:
+        units = getattr(box.basePlane, "units", None) or getattr(box, "units", None)
+        box.basePlane = Plane(
+            origin=Point(x=0.0, y=0.0, z=0.0, units=units),
+            normal=Vector(x=0.0, y=0.0, z=1.0, units=units),
+            xdir=Vector(x=1.0, y=0.0, z=0.0, units=units),
+            ydir=Vector(x=0.0, y=1.0, z=0.0, units=units),
+            units=units,
+        )
+        box.xSize = Interval(start=float(lo[0]), end=float(hi[0]))
+        box.ySize = Interval(start=float(lo[1]), end=float(hi[1]))
+        box.zSize = Interval(start=float(lo[2]), end=float(hi[2]))
+        return
+    box.min.x, box.min.y, box.min.z = (float(v) for v in lo)
+    box.max.x, box.max.y, box.max.z = (float(v) for v in hi)
+
+# -----------------------
+# Faces
+# -----------------------
+
+def flip_winding(faces: List[int]) -> List[int]:
+    """Reverse every face loop in a Speckle n-gon face list (keeps the first index)."""
+    f = np.asarray(faces, dtype=np.int64)
+    if f.size % 4 == 0 and np.all(f[::4] == 3):
+        tris = f.reshape(-1, 4)
+        return tris[:, [0, 1, 3, 2]].ravel().tolist()
+
+    out = list(faces)
+    i = 0
+    while i < len(out):
+        n = out[i]
+        if n < 3:  # legacy encoding: 0 = triangle, 1 = quad
+            n += 3
+        loop = out[i + 1:i + 1 + n]
+        out[i + 2:i + 1 + n] = loop[1:][::-1]
+        i += n + 1
+    return out
+
+# -----------------------
+# Apply
+# -----------------------
+
+def _as_xyz(values: List[float]) -> np.ndarray:
+    # fromiter with a known count is the cheapest list -> float64 conversion
+    return np.fromiter(values, dtype=np.float64, count=len(values)).reshape(-1, 3)
+
+# sys.getrefcount of a buffer referenced only by its mesh: the mesh, a local and the call's argument
+_OWNED_REFS = 3
+
+def _offset_mesh(mesh: Base, offset: Sequence[float]) -> None:
+    """
+    Move a mesh's flat xyz buffer by `offset`, for pure translations.
+
+    Only the shifted coordinates are rebuilt, one slice per non-zero axis, and a
+    buffer nothing else refers to is updated in place (the refcount check numpy's
+    ndarray.resize does). Buffers shared with other copies (speckle_tools.duplicate)
+    are copied first.
+    """
+    values = mesh.vertices
+    out = values if sys.getrefcount(values) <= _OWNED_REFS else list(values)
+    for axis, d in enumerate(offset):
+        if d:
+            out[axis::3] = [c + d for c in out[axis::3]]
+    if out is not values:
+        mesh.vertices = out
+
+def apply_transform(obj, matrix: np.ndarray) -> int:
+    """
+    Transform every mesh vertex, point and bbox under `obj` in place.
+
+    All coordinates are gathered into one (N, 3) array, multiplied once and
+    scattered back; a pure translation offsets the mesh buffers directly
+    instead. Volume is scaled by |det|, area only when the matrix is a
+    similarity (uniform scale + rotation / mirror). Mirrors flip face winding so
+    normals keep pointing outwards.
+
+    Args:
+        obj: A Base object (or list of them), e.g. a received BrepX
+        matrix: 4x4 affine matrix (see `translation`, `rotation`, `compose`, ...)
+
+    Returns:
+        Number of 3D points that were transformed
+    """
+    m = np.asarray(matrix, dtype=np.float64)
+    linear, offset = m[:3, :3], m[:3, 3]
+    translate_only = np.array_equal(linear, np.eye(3))
+
+    targets = _Targets()
+    _collect(obj, targets, set())
+
+    moved_count = 0
+    batched = targets.meshes
+    if translate_only:
+        shift = offset.tolist()
+        for mesh in targets.meshes:
+            _offset_mesh(mesh, shift)
+            moved_count += len(mesh.vertices) // 3
+        batched = []
+
+    chunks = [_as_xyz(mesh.vertices) for mesh in batched]
+    if targets.points:
+        chunks.append(np.array([[p.x, p.y, p.z] for p in targets.points], dtype=np.float64))
+    chunks.extend(_box_corners(b) for b in targets.boxes)
+    if not chunks:
+        return moved_count
+
+    sizes = [len(c) for c in chunks]
+    moved = np.concatenate(chunks)
+    if translate_only:
+        moved += offset  # skip the matmul
+    else:
+        moved = moved @ linear.T + offset
+    parts = np.split(moved, np.cumsum(sizes)[:-1])
+
+    for mesh, part in zip(batched, parts):
+        mesh.vertices = part.ravel().tolist()
+    rest = parts[len(batched):]
+    if targets.points:
+        for p, (x, y, z) in zip(targets.points, rest[0].tolist()):
+            p.x, p.y, p.z = x, y, z
+        rest = rest[1:]
+    for box, corners in zip(targets.boxes, rest):
+        _set_box_extents(box, corners.min(axis=0), corners.max(axis=0))
+
+    det = float(np.linalg.det(linear))
+    _update_normals_and_faces(targets.meshes, linear, det)
+    _update_measures(targets.measured, linear, det)
+    return moved_count + int(sum(sizes))
+
+def _update_normals_and_faces(meshes: List[Base], linear: np.ndarray, det: float) -> None:
+    with_normals = [m for m in meshes if _is_number_list(getattr(m, "vertexNormals", None))]
+    if with_normals and not np.allclose(linear, np.eye(3)):
+        normal_matrix = np.linalg.inv(linear)  # row vectors: n' = n @ inv(L)
+        chunks = [_as_xyz(m.vertexNormals) for m in with_normals]
+        moved = np.concatenate(chunks) @ normal_matrix
+        lengths = np.linalg.norm(moved, axis=1, keepdims=True)
+        moved = np.divide(moved, lengths, out=np.zeros_like(moved), where=lengths > 0)
+        for mesh, part in zip(with_normals, np.split(moved, np.cumsum([len(c) for c in chunks])[:-1])):
+            mesh.vertexNormals = part.ravel().tolist()
+
+    if det < 0:
+        for mesh in meshes:
+            if _is_number_list(getattr(mesh, "faces", None)):
+                mesh.faces = flip_winding(mesh.faces)
+
+def _update_measures(measured: List[Base], linear: np.ndarray, det: float) -> None:
+    volume_factor = abs(det)
+    scale = volume_factor ** (1.0 / 3.0)
+    gram = linear.T @ linear
+    is_similarity = scale > 0 and np.allclose(gram, np.eye(3) * scale * scale, rtol=1e-9, atol=1e-12)
+
+    for obj in measured:
+        volume = getattr(obj, "volume", None)
+        if isinstance(volume, (int, float)) and not math.isclose(volume_factor, 1.0):
+            obj.volume = volume * volume_factor
+        area = getattr(obj, "area", None)
+        if isinstance(area, (int, float)) and is_similarity and not math.isclose(scale, 1.0):
+            obj.area = area * scale * scale
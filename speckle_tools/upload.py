@@ -0,0 +1,300 @@
+"""
+Chunked, resumable uploads with progress
+
+    obj_id = upload(root, session, PROJECT_ID)       # instead of send(base=root, transports=[transport])
+
+- objects are batched while the serializer writes them (SharingSerializer, so
+  shared buffers are still serialized once), up to `batch_mb` / `batch_objects`
+- each batch asks the server which ids it already has (/api/diff) and uploads
+  only the missing ones, gzipped, `workers` batches in parallel; serializing
+  waits when too many batches are in flight, so memory stays bounded
+- ids the server has confirmed are appended to a journal per project: after a
+  failure, running the same upload again skips them without asking the server
+- the root object goes last, once every child is confirmed, so a version never
+  points at a half-uploaded tree
+- progress (objects, MB, MB/s) is printed every `report_every` seconds, and
+  batch timings, objects and bytes go to speckle_tools.metrics
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import requests
+from specklepy.logging.exceptions import SpeckleException
+from specklepy.transports.abstract_transport import AbstractTransport
+from specklepy.transports.sqlite import SQLiteTransport
+
+from speckle_tools.duplicate import SharingSerializer
+from speckle_tools.metrics import METRICS
+
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_MB = 1.0
+DEFAULT_BATCH_OBJECTS = 5000
+DEFAULT_RETRIES = 4
+DEFAULT_JOURNAL_DIR = ".upload_journal"
+REPORT_EVERY_S = 5.0
+
+# -----------------------
+# Journal
+# -----------------------
+
+class UploadJournal:
+    """Object ids known to be on the server for one project, one per line, append-only."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.ids: Set[str] = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.ids.update(line.strip() for line in f if line.strip())
+
+    def __contains__(self, obj_id: str) -> bool:
+        return obj_id in self.ids
+
+    def add(self, ids: Iterable[str]) -> None:
+        new = [i for i in ids if i not in self.ids]
+        if not new:
+            return
+        with self._lock:
+            self.ids.update(new)
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(new) + "\n")
+
+# -----------------------
+# Transport
+# -----------------------
+
+class UploadProgress:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.objects = 0         # handed over by the serializer
+        self.journaled = 0       # skipped: confirmed by an earlier run
+        self.on_server = 0       # skipped: the server already had them
+        self.uploaded = 0
+        self.bytes = 0           # JSON bytes uploaded
+        self.gzip_bytes = 0      # bytes on the wire
+        self.batches = 0
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (f"⬆ {self.uploaded:,}/{self.objects:,} objects uploaded "
+                f"({self.journaled + self.on_server:,} already there), {self.batches} batches, "
+                f"{self.bytes / 1e6:,.1f} MB ({self.gzip_bytes / 1e6:,.1f} MB gzip), "
+                f"{self.bytes / 1e6 / elapsed:,.2f} MB/s")
+
+
+class ChunkedUploadTransport(AbstractTransport):
+    """
+    Write-only transport that uploads what the serializer saves in bounded,
+    parallel batches (see module docstring). Receiving still goes through the
+    project's ServerTransport.
+    """
+
+    def __init__(self, session, project_id: str, workers: int = DEFAULT_WORKERS,
+                 batch_mb: float = DEFAULT_BATCH_MB, batch_objects: int = DEFAULT_BATCH_OBJECTS,
+                 retries: int = DEFAULT_RETRIES, journal_dir: Optional[str] = DEFAULT_JOURNAL_DIR,
+                 report_every: Optional[float] = REPORT_EVERY_S):
+        super().__init__()
+        self.session = session
+        self.project_id = project_id
+        self.workers = max(1, workers)
+        self.max_bytes = int(batch_mb * 1e6)
+        self.max_objects = max(1, batch_objects)
+        self.retries = retries
+        self.report_every = report_every
+        self.journal = UploadJournal(os.path.join(journal_dir, f"{project_id}.ids") if journal_dir else None)
+        self.progress = UploadProgress()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+        self._futures: List = []
+        self._error: Optional[BaseException] = None
+        self._last_report = 0.0
+        self._reset_batch()
+
+    @property
+    def name(self) -> str:
+        return f"ChunkedUpload({self.project_id})"
+
+    def _reset_batch(self) -> None:
+        self._batch: List[Tuple[str, str]] = []
+        self._batch_bytes = 0
+        self._held: Optional[Tuple[str, str]] = None  # latest object: the root, once writing ends
+        self._seen: Set[str] = set()  # the serializer saves a repeated chunk once per owner
+
+    # -- writing --
+
+    def begin_write(self) -> None:
+        self.progress = UploadProgress()
+        self._futures = []
+        self._error = None
+        self._reset_batch()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upload")
+
+    def save_object(self, id: str, serialized_object: str) -> None:
+        if self._error is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._raise()
+        if id in self._seen:
+            return
+        self._seen.add(id)
+        self.progress.objects += 1
+        held, self._held = self._held, (id, serialized_object)
+        if held is not None:
+            self._add(*held)
+
+    def _add(self, obj_id: str, text: str) -> None:
+        if obj_id in self.journal:
+            self.progress.journaled += 1
+            METRICS.inc("upload_objects_total", result="journaled")
+            return
+        if self._batch and (self._batch_bytes + len(text) > self.max_bytes or len(self._batch) >= self.max_objects):
+            self._submit()
+        self._batch.append((obj_id, text))
+        self._batch_bytes += len(text)
+
+    def _submit(self) -> None:
+        batch, self._batch, self._batch_bytes = self._batch, [], 0
+        self._slots.acquire()  # back-pressure: at most 2 batches per worker in flight
+        future = self._pool.submit(self._send_batch, batch)
+        future.add_done_callback(self._finished)
+        self._futures = [f for f in self._futures if not f.done()] + [future]
+
+    def _finished(self, future) -> None:
+        self._slots.release()
+        if not future.cancelled() and future.exception() is not None:
+            self._error = self._error or future.exception()
+
+    def _wait(self) -> None:
+        for future in self._futures:
+            try:
+                future.result()
+            except Exception as ex:
+                self._error = self._error or ex
+        self._futures = []
+
+    def end_write(self) -> None:
+        try:
+            if self._batch:
+                self._submit()
+            self._wait()
+            if self._error is None and self._held is not None:
+                # the root last, on its own, once everything under it is confirmed
+                self._batch = []
+                self._add(*self._held)
+                if self._batch:
+                    self._submit()
+                self._wait()
+        finally:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._error is not None:
+            self._raise()
+        if self.report_every is not None:
+            print(self.progress.line())
+
+    def _raise(self) -> None:
+        raise SpeckleException(
+            f"Upload to project {self.project_id} failed after {self.progress.uploaded:,} objects "
+            f"({self._error}); run it again to resume from the last confirmed batch", self._error)
+
+    # -- one batch --
+
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            try:
+                r = self.session.rest.post(url, **kwargs)
+            except requests.RequestException as ex:
+                if attempt == self.retries:
+                    raise
+                error = str(ex)
+            else:
+                if r.status_code == 403:
+                    raise SpeckleException(f"Invalid credentials - cannot send objects to {self.session.server_url}")
+                if r.status_code != 429 and r.status_code < 500:
+                    return r
+                if attempt == self.retries:
+                    return r
+                error = f"HTTP {r.status_code}"
+            delay = min(2 ** attempt, 30)
+            print(f"⚠ {url.rsplit('/', 2)[-2]} request failed ({error}), retrying in {delay}s")
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def _send_batch(self, batch: List[Tuple[str, str]]) -> None:
+        with METRICS.span("upload_batch"):
+            self._upload_batch(batch)
+
+    def _upload_batch(self, batch: List[Tuple[str, str]]) -> None:
+        base = self.session.server_url
+        ids = [obj_id for obj_id, _ in batch]
+        r = self._post(f"{base}/api/diff/{self.project_id}", data={"objects": json.dumps(ids)})
+        r.raise_for_status()
+        has: Dict[str, bool] = r.json()
+        missing = [(obj_id, text) for obj_id, text in batch if not has.get(obj_id)]
+
+        if missing:
+            payload = ("[" + ",".join(text for _, text in missing) + "]").encode()
+            packed = gzip.compress(payload)
+            r = self._post(f"{base}/objects/{self.project_id}",
+                           files={"batch-1": ("batch-1", packed, "application/gzip")})
+            if r.status_code != 201:
+                raise SpeckleException(f"Could not save {len(missing)} objects: HTTP {r.status_code} ({r.text[:300]})")
+        self.journal.add(ids)
+        METRICS.inc("upload_objects_total", len(batch) - len(missing), result="on_server")
+        if missing:
+            METRICS.inc("upload_objects_total", len(missing), result="uploaded")
+            METRICS.inc("upload_bytes_total", len(payload), encoding="json")
+            METRICS.inc("upload_bytes_total", len(packed), encoding="gzip")
+
+        with self._lock:
+            p = self.progress
+            p.batches += 1
+            p.on_server += len(batch) - len(missing)
+            p.uploaded += len(missing)
+            if missing:
+                p.bytes += len(payload)
+                p.gzip_bytes += len(packed)
+            now = time.monotonic()
+            if self.report_every is not None and now - self._last_report >= self.report_every:
+                self._last_report = now
+                print(p.line())
+
+    # -- AbstractTransport --
+
+    def save_object_from_transport(self, id: str, source_transport: AbstractTransport) -> None:
+        self.save_object(id, source_transport.get_object(id))
+
+    def get_object(self, id: str) -> Optional[str]:
+        return None
+
+    def has_objects(self, id_list: List[str]) -> Dict[str, bool]:
+        return {i: i in self.journal for i in id_list}
+
+    def copy_object_and_children(self, id: str, target_transport: AbstractTransport) -> str:
+        raise NotImplementedError
+
+
+def upload(base, session, project_id: str, workers: int = DEFAULT_WORKERS, batch_mb: float = DEFAULT_BATCH_MB,
+           journal_dir: Optional[str] = DEFAULT_JOURNAL_DIR, report_every: Optional[float] = REPORT_EVERY_S,
+           use_default_cache: bool = True) -> str:
+    """
+    Serialize `base` and upload it to `project_id` in resumable batches; returns
+    the root object id for `version.create`. `session` is a SpeckleSession.
+    """
+    transport = ChunkedUploadTransport(session, project_id, workers=workers, batch_mb=batch_mb,
+                                       journal_dir=journal_dir, report_every=report_every)
+    transports: List[AbstractTransport] = [transport]
+    if use_default_cache:
+        transports.insert(0, SQLiteTransport())
+    obj_id, _ = SharingSerializer(write_transports=transports).write_json(base=base)
+    return obj_id